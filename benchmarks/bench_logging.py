@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Logging overhead per generated document.
+
+Runs the section-by-section generation and the Word export for one document
+with a canned AI provider (no network) and compares the CPU time spent on
+the generating thread under three setups:
+
+    disabled  - logging.disable(), the baseline without any logging cost
+    sync      - the previous setup: FileHandler + StreamHandler + GUI handler
+                attached directly to the root logger
+    queue     - QueueHandler in the producer, batched file writes and the
+                other handlers on the QueueListener thread
+
+The difference to the baseline is the logging overhead per document.
+
+Usage:
+    python benchmarks/bench_logging.py
+    python benchmarks/bench_logging.py --documents 20 --level DEBUG
+"""
+
+import argparse
+import logging
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.ai_service import AIServiceManager
+from src.logging_setup import configure_queue_logging, shutdown_queue_logging
+from src.word_generator import WordDocumentGenerator
+
+
+class _ListHandler(logging.Handler):
+    """Stand-in for the GUI handler (keeps the formatted lines in memory)."""
+
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+
+def _canned_sections(ai: AIServiceManager) -> dict:
+    """Section text that passes the local review on the first attempt."""
+    texts = {}
+    for section in ai.section_registry.get().sections.values():
+        words = " ".join(section.content_requirements or [section.title]).split()
+        target = max(section.min_words + 5, min(section.target_words, section.max_words))
+        body = (words * (target // max(len(words), 1) + 1))[:target]
+        texts[section.title] = " ".join(body)
+    return texts
+
+
+def _make_service() -> AIServiceManager:
+    ai = AIServiceManager()
+    texts = _canned_sections(ai)
+    title_pattern = re.compile(r"Section: (.+)")
+
+    def fake_call(prompt: str) -> str:
+        m = title_pattern.search(prompt)
+        return texts.get(m.group(1).strip(), "") if m else "SCORE: 90 - ok"
+
+    ai._call_openai = fake_call
+    return ai
+
+
+def _run_documents(ai: AIServiceManager, word: WordDocumentGenerator, documents: int) -> float:
+    # CPU time of the generating thread only: work moved to the listener thread is not counted
+    start = time.thread_time()
+    for i in range(documents):
+        concept = ai.generate_technical_concept_sections("Benchmark project description", provider="openai")
+        word.create_document(concept, project_name=f"Bench {i}", description="Benchmark", skip_path_warnings=True)
+    return time.thread_time() - start
+
+
+def _configure(mode: str, logfile: str, level: int, console):
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    logging.disable(logging.NOTSET)
+    if mode == "disabled":
+        logging.disable(logging.CRITICAL)
+    elif mode == "sync":
+        file_handler = logging.FileHandler(logfile, encoding="utf-8")
+        stream_handler = logging.StreamHandler(console)
+        formatter = logging.Formatter("%(asctime)s %(levelname)s %(message)s")
+        for handler in (file_handler, stream_handler):
+            handler.setFormatter(formatter)
+            root.addHandler(handler)
+        gui_handler = _ListHandler()
+        gui_handler.setLevel(logging.INFO)
+        root.addHandler(gui_handler)
+        root.setLevel(level)
+    elif mode == "queue":
+        gui_handler = _ListHandler()
+        gui_handler.setLevel(logging.INFO)
+        gui_handler.setFormatter(logging.Formatter())
+        configure_queue_logging(logfile, extra_handlers=[gui_handler], level=level, console_stream=console)
+
+
+def _teardown(mode: str):
+    if mode == "queue":
+        shutdown_queue_logging()
+    for handler in logging.getLogger().handlers[:]:
+        logging.getLogger().removeHandler(handler)
+        handler.close()
+    logging.disable(logging.NOTSET)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Logging overhead per generated document")
+    parser.add_argument("--documents", type=int, default=10)
+    parser.add_argument("--level", default="INFO", choices=["DEBUG", "INFO", "WARNING"])
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per mode (median is reported)")
+    args = parser.parse_args()
+    level = getattr(logging, args.level)
+
+    workdir = tempfile.mkdtemp(prefix="zeta_bench_logging_")
+    logging.disable(logging.CRITICAL)
+    ai = _make_service()
+    _run_documents(ai, WordDocumentGenerator(os.path.join(workdir, "warmup")), 1)  # warm-up: section registry, regex compilation, python-docx
+
+    modes = ("disabled", "sync", "queue")
+    timings = {mode: [] for mode in modes}
+    records = {}
+    with open(os.devnull, "w", encoding="utf-8") as console:
+        # Modes are interleaved so drift (disk cache, CPU frequency) hits all of them equally
+        for run in range(args.repeat):
+            for mode in modes:
+                logfile = os.path.join(workdir, f"{mode}_{run}.log")
+                # Fresh output folder per run, so version numbering does not skew later runs
+                word = WordDocumentGenerator(os.path.join(workdir, f"{mode}_{run}"))
+                _configure(mode, logfile, level, console)
+                try:
+                    timings[mode].append(_run_documents(ai, word, args.documents) / args.documents)
+                finally:
+                    _teardown(mode)
+                if mode != "disabled":
+                    with open(logfile, encoding="utf-8") as f:
+                        records[mode] = sum(1 for _ in f) / args.documents
+    results = {mode: statistics.median(values) for mode, values in timings.items()}
+
+    baseline = results["disabled"]
+    print(f"{'mode':<10}{'ms/doc':>10}{'overhead ms/doc':>18}{'lines/doc':>12}")
+    print("-" * 50)
+    for mode, per_doc in results.items():
+        lines = f"{records[mode]:.0f}" if mode in records else "-"
+        print(f"{mode:<10}{per_doc * 1000:>10.2f}{(per_doc - baseline) * 1000:>18.2f}{lines:>12}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Import-time budget for the entry points of Zeta Proposer.
+
+Each target is imported in a fresh interpreter with ``python -X importtime``;
+the report lists the median cumulative import time over several runs (modules
+the bare interpreter loads anyway, e.g. site, are not counted), the heaviest
+third-party and standard-library imports pulled in by src/, and any module
+that must stay deferred until its feature is used but was loaded anyway.
+
+Startup budget (cumulative import time, measured on the build machine):
+
+    cli    150 ms   main.py with arguments: argparse and logging only
+    bulk   300 ms   what "main.py bulk" imports before the first spec is loaded
+    gui    400 ms   the Tk window (python-docx included, it is needed right away)
+
+Deferred in all targets: openai (~0.7 s, first OpenAI call), requests (first
+Ollama call), numpy (semantic scoring, near-duplicate detection), PIL (preview
+window), pythoncom (GUI start in main.py) and watchdog (watch mode); the CLI
+targets must not load tkinter either. The release scripts run this with
+--check before PyInstaller and abort the build if a budget is exceeded or a
+deferred module is loaded.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --check --repeat 7
+    python benchmarks/bench_startup.py --targets cli bulk --json startup.json
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DEFERRED = ("openai", "requests", "numpy", "PIL", "pythoncom", "watchdog")
+
+# name -> (import statement, budget in ms, modules that must not be loaded)
+TARGETS = {
+    "cli": ("import src.cli", 150, DEFERRED + ("tkinter",)),
+    "bulk": ("import src.cli, src.ai_service, src.bulk_pipeline, src.checkpoint_store", 300, DEFERRED + ("tkinter",)),
+    "gui": ("import src.gui", 400, DEFERRED),
+}
+
+TOP_IMPORTS = 5
+
+
+def _run_importtime(statement: str) -> List[Tuple[int, str, int]]:
+    """(depth, module, cumulative µs) per line of -X importtime output, in output order."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                          cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{statement!r} failed:\n{proc.stderr.strip()[-2000:]}")
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        stripped = name.lstrip()
+        entries.append(((len(name) - len(stripped) - 1) // 2, stripped, int(cumulative)))
+    return entries
+
+
+def _parents(entries: List[Tuple[int, str, int]]) -> Dict[str, str]:
+    """Module -> the module whose import loaded it (importtime prints children before their parent)."""
+    parents = {}
+    pending: List[Tuple[int, str]] = []
+    for depth, name, _ in entries:
+        while pending and pending[-1][0] > depth:
+            parents[pending.pop()[1]] = name
+        pending.append((depth, name))
+    return parents
+
+
+def measure(statement: str, baseline: set, repeat: int, deferred: Tuple[str, ...] = ()) -> Dict:
+    totals = []
+    for _ in range(repeat):
+        entries = _run_importtime(statement)
+        totals.append(sum(cum for depth, name, cum in entries if depth == 0 and name not in baseline))
+    modules = {name for _, name, _ in entries} - baseline
+    parents = _parents(entries)
+    # Externe Module, die direkt von src/ importiert werden: dort setzt ein Lazy-Import an
+    heaviest = sorted(((cum, name, parents.get(name)) for _, name, cum in entries
+                       if not name.startswith("src") and (parents.get(name) or "").startswith("src")),
+                      reverse=True)[:TOP_IMPORTS]
+    return {
+        "median_ms": statistics.median(totals) / 1000,
+        "min_ms": min(totals) / 1000,
+        "modules": len(modules),
+        "heaviest": [{"module": name, "imported_by": parent, "ms": cum / 1000} for cum, name, parent in heaviest],
+        "deferred_loaded": [m for m in deferred if m in modules],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--targets", nargs="+", choices=sorted(TARGETS), default=list(TARGETS))
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per target (median is reported)")
+    parser.add_argument("--check", action="store_true", help="exit 1 if a budget is exceeded or a deferred module is loaded")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    baseline = {name for _, name, _ in _run_importtime("pass")}
+    results = {}
+    violations = []
+    for target in args.targets:
+        statement, budget_ms, deferred = TARGETS[target]
+        try:
+            result = measure(statement, baseline, max(1, args.repeat), deferred)
+        except RuntimeError as e:
+            violations.append(f"{target}: import failed")
+            print(f"{target:<6} ERROR  {e}")
+            continue
+        loaded = result["deferred_loaded"]
+        result["budget_ms"] = budget_ms
+        results[target] = result
+        status = "ok" if result["median_ms"] <= budget_ms and not loaded else "OVER"
+        print(f"{target:<6} {result['median_ms']:8.1f} ms  (budget {budget_ms} ms, min {result['min_ms']:.1f} ms, "
+              f"{result['modules']} modules)  {status}")
+        for heavy in result["heaviest"]:
+            print(f"         {heavy['ms']:8.1f} ms  {heavy['module']} <- {heavy['imported_by']}")
+        if result["median_ms"] > budget_ms:
+            violations.append(f"{target}: {result['median_ms']:.1f} ms > {budget_ms} ms")
+        if loaded:
+            violations.append(f"{target}: deferred modules loaded at startup: {', '.join(loaded)}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if violations:
+        print("\nStartup budget violated:\n  " + "\n  ".join(violations))
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
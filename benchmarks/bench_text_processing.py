@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the text-processing hot paths of Zeta Proposer.
+
+Every routine measured here runs once per candidate or once per document, so
+quadratic behaviour shows up long before a bulk run finishes. Each function is
+measured at several input scales (typical -> pathological); the report lists
+ops/sec, peak allocation per call and the growth exponent between scales.
+
+Usage:
+    python benchmarks/bench_text_processing.py
+    python benchmarks/bench_text_processing.py --scales typical large --json bench.json
+"""
+
+import argparse
+import gc
+import io
+import json
+import logging
+import math
+import random
+import re
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.ai_service import AIServiceManager
+from src.docx_zip_renderer import ZipTemplate
+from src.placeholder_engine import PlaceholderEngine
+from src.section_registry import extract_key_terms
+from src.template_compiler import compile_document
+from src.text_sanitizer import TextSanitizer, clean_markdown, remove_diagrams
+
+# Scale factor = number of paragraphs per section / template elements
+SCALES = {
+    "typical": 4,
+    "large": 40,
+    "pathological": 400,
+}
+
+# Exponent above which growth between two scales is reported as super-linear
+SUPERLINEAR_EXPONENT = 1.5
+
+SECTION_TITLES = [
+    ("system_scope", "System Scope and Boundaries"),
+    ("architecture_tech_stack", "Architecture and Technology Stack"),
+    ("external_interfaces", "System-external Interfaces and Integrations"),
+    ("ci_cd", "CI/CD Pipelines"),
+    ("testing_concept", "Specific Testing Concept"),
+    ("deployment_operation", "Deployment and Operation Environment"),
+    ("ux_ui", "UX/UI Design and Prototyping"),
+]
+
+VOCABULARY = (
+    "the system uses a scalable microservice architecture with secure api gateways "
+    "deployment pipelines run automated integration tests and monitoring dashboards "
+    "stakeholders define functional requirements while the cloud infrastructure "
+    "handles containerization orchestration backup and disaster recovery "
+    "accessibility responsive design prototyping and user research guide the ui"
+).split()
+
+
+def _sentence(rng: random.Random, words: int = 18) -> str:
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words)).capitalize() + "."
+
+
+def _paragraph(rng: random.Random, sentences: int = 4) -> str:
+    return " ".join(_sentence(rng) for _ in range(sentences))
+
+
+def make_concept_response(scale: int, seed: int = 1) -> str:
+    """Combined 7-section response as returned by generate_technical_concept."""
+    rng = random.Random(seed)
+    parts = []
+    for i, (_, title) in enumerate(SECTION_TITLES, start=1):
+        parts.append(f"{i}. {title}")
+        for _ in range(scale):
+            parts.append(_paragraph(rng))
+            parts.append("")
+    return "\n".join(parts)
+
+
+def make_markdown_section(scale: int, seed: int = 2) -> str:
+    """Section text with markdown, bullets and diagram blocks mixed in."""
+    rng = random.Random(seed)
+    parts = ["## 1. System Scope and Boundaries"]
+    for i in range(scale):
+        parts.append(f"**{_sentence(rng, 4)}** {_paragraph(rng, 2)} _{_sentence(rng, 3)}_ `{rng.choice(VOCABULARY)}`")
+        parts.append(f"- {_sentence(rng, 8)}")
+        parts.append(f"* {_sentence(rng, 8)}")
+        parts.append("")
+        if i % 10 == 0:
+            parts.append("```mermaid\ngraph TD\n  A-->B\n  B-->C\n```")
+            parts.append("```dot\ndigraph G {\n  a -> b;\n  b -> c;\n}\n```")
+    return "\n".join(parts)
+
+
+def make_template_document(scale: int, seed: int = 3):
+    """Large in-memory template with placeholders in paragraphs and tables."""
+    from docx import Document
+
+    rng = random.Random(seed)
+    doc = Document()
+    doc.add_paragraph("{{project_name}} - {{date}}")
+    for i in range(scale):
+        key, _ = SECTION_TITLES[i % len(SECTION_TITLES)]
+        doc.add_paragraph(_paragraph(rng, 2))
+        if i < len(SECTION_TITLES):
+            doc.add_paragraph(f"{{{{{key}}}}}")
+    table = doc.add_table(rows=max(1, scale // 4), cols=3)
+    for row in table.rows:
+        for cell in row.cells:
+            cell.text = _sentence(rng, 6)
+    table.rows[0].cells[0].text = "{{project_name_safe}}"
+    return doc
+
+
+def legacy_section_review(content: str, content_requirements, section_config: dict):
+    """Text work of one section review before ReviewEngine: \\w+ word count plus substring coverage.
+
+    Kept as the comparison baseline for ReviewEngine.analyze (one section).
+    """
+    word_count = len(re.findall(r"\w+", content))
+    content_lower = content.lower()
+    covered = sum(1 for requirement in content_requirements
+                  if any(term in content_lower for term in extract_key_terms(requirement)))
+    score = covered / len(content_requirements)
+    word_count_config = section_config.get("word_count", {})
+    actual_words = len(content.split())
+    if actual_words >= word_count_config.get("target", 70):
+        score += 0.15
+    elif actual_words >= word_count_config.get("min", 30):
+        score += 0.05
+    return word_count, min(score, 1.0)
+
+
+def build_cases(scale: int):
+    """Return {name: (callable, input_size)} for one scale."""
+    logging.disable(logging.CRITICAL)
+    ai = AIServiceManager()
+
+    response = make_concept_response(scale)
+    section_text = make_markdown_section(scale)
+    requirements = ai._load_section_descriptions()["architecture_tech_stack"]["content_requirements"]
+    section_config = ai._load_section_descriptions()["architecture_tech_stack"]
+    template = make_template_document(scale)
+    engine = ai._get_review_engine()
+    indexer = ai._get_section_indexer()
+    sanitizer = TextSanitizer()
+    values = {key: _paragraph(random.Random(4), 3) for key, _ in SECTION_TITLES}
+    values.update({"date": "2024-01-01", "project_name": "Bench", "project_name_safe": "Bench"})
+    compiled = compile_document(template)
+    template_bytes = io.BytesIO()
+    template.save(template_bytes)
+    zip_template = ZipTemplate(template_bytes.getvalue(), {location.part for location in compiled.locations})
+    substitution = PlaceholderEngine(values)
+
+    # compile_document runs once per template file and scales with its size; render
+    # runs once per document and should stay flat (it only visits recorded locations).
+    # The first (warm-up) call substitutes the placeholders, so the measured calls time
+    # the matching: a full-tree pass for PlaceholderEngine, recorded paragraphs for render.
+    template_size = len(template.element.xpath("//w:t"))
+
+    return {
+        "SectionIndexer.split": (lambda: indexer.split(response), len(response)),
+        "_parse_concept_response": (lambda: ai._parse_concept_response(response), len(response)),
+        "legacy section review (baseline)": (
+            lambda: legacy_section_review(section_text, requirements, section_config),
+            len(section_text),
+        ),
+        # One review only needs the section under review (what _review_section_decision runs)
+        "ReviewEngine.analyze": (
+            lambda: engine.analyze(section_text, sections=("architecture_tech_stack",)),
+            len(section_text),
+        ),
+        "ReviewEngine.analyze (all sections)": (lambda: engine.analyze(section_text), len(section_text)),
+        "_extract_key_terms_from_requirement": (
+            lambda: [ai._extract_key_terms_from_requirement(r) for r in requirements],
+            len(requirements),
+        ),
+        "clean_markdown": (lambda: clean_markdown(section_text), len(section_text)),
+        "remove_diagrams": (lambda: remove_diagrams(section_text), len(section_text)),
+        "TextSanitizer.sanitize (uncached)": (lambda: sanitizer._run(section_text, "System Scope"), len(section_text)),
+        "TextSanitizer.sanitize (cached)": (lambda: sanitizer.sanitize(section_text, "System Scope"), len(section_text)),
+        "compile_document": (lambda: compile_document(template), template_size),
+        "PlaceholderEngine.substitute_tree": (lambda: substitution.substitute_tree(template.element), template_size),
+        "CompiledTemplate.render": (lambda: compiled.render(template, values), template_size),
+        "ZipTemplate.render_bytes": (lambda: zip_template.render_bytes(values), template_size),
+    }
+
+
+def measure(func, min_time: float = 0.2, max_iterations: int = 100000) -> dict:
+    """Measure ops/sec and peak allocation of a single call."""
+    func()  # warm-up (regex cache, lazy imports)
+
+    iterations = 0
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < min_time and iterations < max_iterations:
+            func()
+            iterations += 1
+            elapsed = time.perf_counter() - start
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        base_current, _ = tracemalloc.get_traced_memory()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    retained_blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+
+    return {
+        "iterations": iterations,
+        "ops_per_sec": iterations / elapsed if elapsed else float("inf"),
+        "sec_per_op": elapsed / iterations if iterations else 0.0,
+        "peak_alloc_bytes": max(0, peak - base_current),
+        "retained_blocks": retained_blocks,
+    }
+
+
+def growth_exponent(size_a: int, time_a: float, size_b: int, time_b: float) -> float:
+    """Empirical exponent k in t ~ n^k between two measurements."""
+    if size_a <= 0 or size_b <= size_a or time_a <= 0 or time_b <= 0:
+        return float("nan")
+    return math.log(time_b / time_a) / math.log(size_b / size_a)
+
+
+def run(scales, min_time: float) -> dict:
+    results = {}
+    for scale_name in scales:
+        cases = build_cases(SCALES[scale_name])
+        for name, (func, size) in cases.items():
+            stats = measure(func, min_time=min_time)
+            stats["input_size"] = size
+            results.setdefault(name, {})[scale_name] = stats
+
+    for name, by_scale in results.items():
+        ordered = [by_scale[s] for s in scales if s in by_scale]
+        exponents = [
+            growth_exponent(a["input_size"], a["sec_per_op"], b["input_size"], b["sec_per_op"])
+            for a, b in zip(ordered, ordered[1:])
+        ]
+        finite = [e for e in exponents if not math.isnan(e)]
+        by_scale["_growth_exponent"] = max(finite) if finite else None
+        by_scale["_superlinear"] = bool(finite) and max(finite) > SUPERLINEAR_EXPONENT
+    return results
+
+
+def print_report(results: dict, scales) -> None:
+    header = f"{'function':<40}{'scale':<14}{'size':>10}{'ops/sec':>14}{'peak KiB':>12}{'blocks':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, by_scale in results.items():
+        for scale_name in scales:
+            stats = by_scale.get(scale_name)
+            if not stats:
+                continue
+            print(
+                f"{name:<40}{scale_name:<14}{stats['input_size']:>10}"
+                f"{stats['ops_per_sec']:>14.1f}{stats['peak_alloc_bytes'] / 1024:>12.1f}{stats['retained_blocks']:>10}"
+            )
+        exponent = by_scale["_growth_exponent"]
+        flag = "  <-- SUPER-LINEAR" if by_scale["_superlinear"] else ""
+        if exponent is not None:
+            print(f"{'':<40}growth exponent: {exponent:.2f}{flag}")
+    print()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Microbenchmarks for text-processing hot paths")
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=list(SCALES))
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum measuring time per case in seconds")
+    parser.add_argument("--json", dest="json_path", help="Write raw results to this JSON file")
+    parser.add_argument("--fail-on-superlinear", action="store_true", help="Exit with 1 if any function grows super-linearly")
+    args = parser.parse_args()
+
+    results = run(args.scales, args.min_time)
+    print_report(results, args.scales)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json_path}")
+
+    if args.fail_on_superlinear and any(r["_superlinear"] for r in results.values()):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
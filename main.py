@@ -7,16 +7,19 @@ Version: 1.0.1
 
 import sys
 import os
+import multiprocessing
 from pathlib import Path
-import pythoncom
 
 # Add src directory to Python path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
-from src.gui import main as gui_main
-
 def main():
-    """Main entry point"""
+    """Main entry point: with arguments the headless CLI, otherwise the GUI"""
+    if len(sys.argv) > 1:
+        # Ohne Tk und pythoncom, z.B. auf Servern oder in Skripten
+        from src.cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+
     print("Starting Zeta Proposer v1.0.1...")
     print("Technical Concept Generator")
     print("=" * 40)
@@ -26,6 +29,8 @@ def main():
         output_dir = Path("output")
         output_dir.mkdir(exist_ok=True)
         
+        import pythoncom
+        from src.gui import main as gui_main
         pythoncom.CoInitialize()
         gui_main()
         pythoncom.CoUninitialize()
@@ -40,4 +45,6 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
+    # Needed for the spawned render worker processes in the frozen (PyInstaller) build
+    multiprocessing.freeze_support()
     main() 
\ No newline at end of file
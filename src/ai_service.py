@@ -1,11 +1,32 @@
 import os
-import json
-import requests
 import logging
-from typing import Dict, Any, Optional
-import openai
-from openai import OpenAI
+from typing import Dict, Any, List, Optional, Tuple
 import re
+from contextvars import ContextVar
+
+from .review_engine import ReviewEngine, TextStats
+from .section_indexer import SectionIndexer
+from .review_pipeline import ReviewBudget, ReviewContext, ReviewDecision, ReviewPipeline
+from .batch_review import BatchReviewItem, build_batch_review_prompt, parse_batch_review
+from .logging_setup import log_context, set_log_context
+from . import semantic_scorer
+from .section_registry import (
+    SECTION_DESCRIPTIONS_PATH,
+    SectionRegistry,
+    extract_key_terms,
+    extract_max_words_from_description,
+    get_word_count_tolerance,
+)
+
+# Provider-Aufrufe der laufenden Konzept-Generierung (pro Thread/Kontext), für die Bulk-Statistik
+_provider_calls: ContextVar[Optional[List[int]]] = ContextVar("provider_calls", default=None)
+
+
+def _count_provider_call():
+    counter = _provider_calls.get()
+    if counter is not None:
+        counter[0] += 1
+
 
 class AIServiceManager:
     def __init__(self):
@@ -14,6 +35,17 @@ class AIServiceManager:
         self.ollama_model = os.getenv("OLLAMA_MODEL", "llama3")
         self.logger = logging.getLogger(__name__)
         self.alignment_threshold = 0.4  # Reduziert von 0.6 auf 0.4 für weniger restriktive Bewertung
+        self.section_registry = SectionRegistry(SECTION_DESCRIPTIONS_PATH, fallback_loader=self._load_fallback_section_descriptions)
+        self._review_engine = None
+        self._section_indexer = None
+        self.semantic_alignment = False  # Lokaler TF-IDF/BM25-Scorer statt Keyword-Abdeckung (benötigt NumPy)
+        self._semantic_scorer = None
+        self.ai_review_budget = 3  # Max. KI-Reviews pro Dokument (nur für Grenzfälle)
+        self.ai_review_batched = True  # Grenzfälle am Dokumentende in einem Request prüfen
+        self.review_pipeline = ReviewPipeline()
+        self.review_pipeline.register_scorer("term_coverage", self._term_coverage_stage)
+        self.review_pipeline.register_scorer("semantic", self._semantic_stage)
+        self.review_pipeline.set_ai_reviewer(self._ai_review_stage)
         
     def _setup_openai(self):
         """Setup OpenAI client"""
@@ -21,25 +53,28 @@ class AIServiceManager:
         if not api_key:
             raise ValueError("OpenAI API key not found. Please configure it in the settings.")
         
+        # Erst beim ersten OpenAI-Aufruf importieren: das Paket allein kostet ~0.7 s Startzeit
+        from openai import OpenAI
         self.openai_client = OpenAI(api_key=api_key)
     
     def _call_openai(self, prompt: str) -> str:
         """Call OpenAI API"""
+        _count_provider_call()
         self.logger.info("Calling OpenAI API with prompt length: %d", len(prompt))
         self.logger.debug("OpenAI prompt preview: %s...", prompt[:200])
         
         if not self.openai_client:
-            self.logger.info("Setting up OpenAI client")
+            self.logger.debug("Setting up OpenAI client")
             self._setup_openai()
         if not self.openai_client:
             self.logger.error("OpenAI client could not be initialized")
             raise Exception("OpenAI client could not be initialized. Check your API key and installation.")
         
         model = os.getenv("OPENAI_MODEL", "gpt-4o")
-        self.logger.info("Using OpenAI model: %s", model)
+        self.logger.debug("Using OpenAI model: %s", model)
         
         try:
-            self.logger.info("Sending request to OpenAI API")
+            self.logger.debug("Sending request to OpenAI API")
             response = self.openai_client.chat.completions.create(
                 model=model,
                 messages=[
@@ -63,9 +98,11 @@ class AIServiceManager:
     
     def _call_ollama(self, prompt: str) -> str:
         """Call Ollama API (new /api/chat endpoint for Ollama >=0.9.x)"""
+        import requests
+        _count_provider_call()
         self.logger.info("Calling Ollama API with prompt length: %d", len(prompt))
         self.logger.debug("Ollama prompt preview: %s...", prompt[:200])
-        self.logger.info("Using Ollama model: %s", self.ollama_model)
+        self.logger.debug("Using Ollama model: %s", self.ollama_model)
         
         try:
             url = f"{self.ollama_url}/api/chat"
@@ -77,7 +114,7 @@ class AIServiceManager:
                 ],
                 "stream": False
             }
-            self.logger.info("Sending request to Ollama API at: %s", url)
+            self.logger.debug("Sending request to Ollama API at: %s", url)
             response = requests.post(url, json=payload, timeout=120)
             response.raise_for_status()
             result = response.json()
@@ -160,32 +197,24 @@ Please provide a detailed technical analysis and concept document as specified i
             raise Exception(f"Failed to generate technical concept: {str(e)}")
     
     def _parse_concept_response(self, response: str) -> Dict[str, Any]:
-        self.logger.info("AI raw response: %s", response)
+        self.logger.info("AI response length: %d characters", len(response))
+        self.logger.debug("AI raw response: %s", response)
         
-        # Parse sections
-        sections = {}
-        section_names = [
-            ("system_scope", "System scope and boundaries"),
-            ("architecture_tech_stack", "Architecture and technology stack"),
-            ("external_interfaces", "System-external interfaces and integrations"),
-            ("ci_cd", "CI/CD Pipelines"),
-            ("testing_concept", "Specific testing concept"),
-            ("deployment_operation", "Deployment and Operation environment"),
-            ("ux_ui", "UX/UI design and prototyping")
-        ]
+        # Alle Sektionsgrenzen in einem Durchlauf über die Antwort finden
+        indexer = self._get_section_indexer()
+        found = indexer.split(response)
         
-        for key, title in section_names:
-            content = self._extract_section(response, title)
+        sections = {}
+        for key, section in indexer.config.sections.items():
+            content = found.get(key)
+            if content is None:
+                self.logger.warning("Section '%s' not found in response", section.title)
+                content = f"Section '{section.title}' not found in response"
+            elif not content:
+                self.logger.warning("Section '%s' is empty", section.title)
+                content = f"Section '{section.title}' is empty"
             sections[key] = content
-            self.logger.info(f"Extracted {key}: {len(content)} chars")
-            
-            # If section extraction failed, try fallback
-            if content.startswith("Section") or content.startswith("Error") or len(content) < 50:
-                self.logger.info(f"Section {key} extraction failed, trying fallback")
-                fallback_content = self._extract_section_fallback(response, key, title)
-                if fallback_content and len(fallback_content) > 50:
-                    sections[key] = fallback_content
-                    self.logger.info(f"Fallback extracted {key}: {len(fallback_content)} chars")
+            self.logger.debug("Extracted %s: %d chars", key, len(content))
         
         return {
             "raw_response": response,
@@ -196,373 +225,148 @@ Please provide a detailed technical analysis and concept document as specified i
             }
         }
     
-    def _extract_section(self, text: str, section_name: str) -> str:
-        try:
-            self.logger.info("Extracting section: %s", section_name)
-            self.logger.info("Raw text length: %d", len(text))
-            self.logger.info("Raw text preview: %s...", text[:200])
-            
-            lines = text.split('\n')
-            section_start = -1
-            section_end = -1
-            section_name_lower = section_name.lower().strip()
-            
-            # Find section start (allow leading number and dot, ignore case)
-            for i, line in enumerate(lines):
-                line_clean = line.strip().lower()
-                # Check for exact match
-                if line_clean.startswith(section_name_lower):
-                    section_start = i
-                    self.logger.info("Found section start at line %d: %s", i, line.strip())
-                    break
-                # Check for numbered format (1. section name)
-                if line_clean.startswith(tuple(f"{n}. " for n in range(1, 10))) and section_name_lower in line_clean:
-                    section_start = i
-                    self.logger.info("Found numbered section start at line %d: %s", i, line.strip())
-                    break
-                # Check for partial match (section name contains the key words)
-                if section_name_lower in line_clean and len(line_clean) < 100:
-                    section_start = i
-                    self.logger.info("Found partial section start at line %d: %s", i, line.strip())
-                    break
-            
-            if section_start == -1:
-                self.logger.info("Section '%s' not found in response", section_name)
-                return f"Section '{section_name}' not found in response"
-            
-            # Find section end by looking for next numbered section or end of text
-            for i in range(section_start + 1, len(lines)):
-                line = lines[i].strip()
-                line_lower = line.lower()
-                if (line and len(line) < 100 and (
-                    (line[0].isdigit() and '.' in line[:5]) or
-                    any(h in line_lower for h in [
-                        'system scope and boundaries',
-                        'architecture and technology stack',
-                        'system-external interfaces and integrations',
-                        'ci/cd pipelines',
-                        'specific testing concept',
-                        'deployment and operation environment',
-                        'ux/ui design and prototyping'])
-                )):
-                    section_end = i
-                    self.logger.info("Found section end at line %d: %s", i, line.strip())
-                    break
-            
-            if section_end == -1:
-                section_end = len(lines)
-                self.logger.info("Section extends to end of text")
-            
-            # Extract the section content
-            section_content = '\n'.join(lines[section_start:section_end]).strip()
-            self.logger.info("Raw section content length: %d", len(section_content))
-            
-            # Remove the section header line itself
-            if section_content.lower().startswith(section_name_lower) or any(section_content.lower().startswith(f"{n}. {section_name_lower}") for n in range(1, 10)):
-                lines_content = section_content.split('\n')
-                if len(lines_content) > 1:
-                    section_content = '\n'.join(lines_content[1:]).strip()
-                    self.logger.info("Removed header, new content length: %d", len(section_content))
-            
-            if not section_content:
-                self.logger.info("Section '%s' is empty after processing", section_name)
-                return f"Section '{section_name}' is empty"
-            
-            self.logger.info("Final section content preview: %s...", section_content[:100])
-            return section_content
-            
-        except Exception as e:
-            self.logger.info("Error extracting section '%s': %s", section_name, str(e))
-            return f"Error extracting section '{section_name}': {str(e)}"
+    def _get_section_indexer(self) -> SectionIndexer:
+        """Return the header indexer compiled for the current section configuration."""
+        config = self.section_registry.get()
+        indexer = self._section_indexer
+        if indexer is None or indexer.config is not config:
+            indexer = SectionIndexer(config)
+            self._section_indexer = indexer
+        return indexer
     
-    def _extract_section_fallback(self, text: str, key: str, title: str) -> str:
-        """Fallback method to extract content using keywords"""
-        try:
-            self.logger.info(f"Fallback extraction for {key}")
-            
-            # Define keywords for each section
-            keywords = {
-                "system_scope": ["scope", "boundaries", "stakeholders", "system"],
-                "architecture_tech_stack": ["architecture", "technology", "stack", "framework", "components"],
-                "external_interfaces": ["interfaces", "integrations", "apis", "external", "services"],
-                "ci_cd": ["ci/cd", "continuous", "deployment", "pipeline", "automation"],
-                "testing_concept": ["testing", "test", "quality", "assurance", "coverage"],
-                "deployment_operation": ["deployment", "operation", "infrastructure", "monitoring", "scaling"],
-                "ux_ui": ["ux", "ui", "user experience", "interface", "design", "prototyping"]
-            }
-            
-            if key not in keywords:
-                return ""
-            
-            lines = text.split('\n')
-            relevant_lines = []
-            
-            for line in lines:
-                line_lower = line.lower()
-                # Check if line contains keywords for this section
-                if any(keyword in line_lower for keyword in keywords[key]):
-                    relevant_lines.append(line)
-            
-            if relevant_lines:
-                content = '\n'.join(relevant_lines).strip()
-                self.logger.info(f"Fallback found {len(relevant_lines)} relevant lines for {key}")
-                return content
+    def _get_review_engine(self) -> ReviewEngine:
+        """Return the review engine compiled for the current section configuration."""
+        config = self.section_registry.get()
+        engine = self._review_engine
+        if engine is None or engine.config is not config:
+            engine = ReviewEngine(config)
+            self._review_engine = engine
+        return engine
+    
+    def _get_semantic_scorer(self):
+        """Return the semantic scorer for the current configuration, or None if unavailable."""
+        if not semantic_scorer.is_available():
+            return None
+        config = self.section_registry.get()
+        scorer = self._semantic_scorer
+        if scorer is None or scorer.config is not config:
+            scorer = semantic_scorer.SemanticAlignmentScorer(config)
+            self._semantic_scorer = scorer
+        return scorer
+    
+    def score_alignment_batch(self, items: List[Tuple[str, str]]) -> List[Optional[float]]:
+        """Semantic alignment scores (coverage + length bonus) for many (section_key, content) pairs at once."""
+        scorer = self._get_semantic_scorer()
+        if scorer is None:
+            return [None] * len(items)
+        engine = self._get_review_engine()
+        coverage = scorer.score_batch(items)
+        scores = []
+        for (key, content), value in zip(items, coverage):
+            section = engine.config.get(key)
+            if section is None or value != value:  # NaN: no requirements for this section
+                scores.append(None)
             else:
-                self.logger.info(f"Fallback found no relevant lines for {key}")
-                return ""
-                
-        except Exception as e:
-            self.logger.info(f"Fallback extraction failed for {key}: {str(e)}")
-            return ""
+                scores.append(min(float(value) + engine.length_bonus(section, engine.analyze(content, sections=(key,))), 1.0))
+        return scores
     
-
-
-    def _review_section(self, key, content, original_content=None, check_dot_block=True):
-        """Review a section based on dynamic descriptions from the file."""
-        self.logger.info("Reviewing section: %s", key)
-        self.logger.info("Content length: %d characters", len(content))
+    def _semantic_alignment_score(self, section, content: str, stats: TextStats) -> Optional[float]:
+        scorer = self._get_semantic_scorer()
+        if scorer is None:
+            self.logger.warning("Semantic alignment requested but NumPy is not installed, using keyword coverage")
+            return None
+        coverage = scorer.score(section.key, content)
+        if coverage is None:
+            return None
+        return min(coverage + ReviewEngine.length_bonus(section, stats), 1.0)
+    
+    def register_review_scorer(self, name: str, scorer):
+        """Add a pluggable scorer (ReviewContext -> score in [0, 1] or None) after the built-in stages."""
+        self.review_pipeline.register_scorer(name, scorer)
+    
+    def _term_coverage_stage(self, ctx: ReviewContext) -> Optional[float]:
+        return self._check_content_alignment(ctx.content, ctx.section.description, ctx.section.key, stats=ctx.stats)
+    
+    def _semantic_stage(self, ctx: ReviewContext) -> Optional[float]:
+        if not getattr(self, 'semantic_alignment', False):
+            return None
+        return self._semantic_alignment_score(ctx.section, ctx.content, ctx.stats)
+    
+    def _ai_review_stage(self, ctx: ReviewContext):
+        if not ctx.provider:
+            return None, "no provider for AI review"
+        score, reason = self._review_section_with_ai(ctx.section.title, ctx.section.description, ctx.content, ctx.provider)
+        if reason.startswith("[REVIEW ERROR]"):
+            return None, reason
+        return min(max(score, 0), 100) / 100.0, reason
+    
+    def _review_section(self, key, content, original_content=None, check_dot_block=True, provider=None, budget: Optional[ReviewBudget] = None):
+        """Review a section with the cost-ordered review pipeline (length, coverage, scorers, AI)."""
+        decision = self._review_section_decision(key, content, provider=provider, budget=budget)
+        return decision.accepted, decision.reason
+    
+    def _review_section_decision(self, key, content, provider=None, budget: Optional[ReviewBudget] = None, defer_ai: bool = False) -> ReviewDecision:
+        self.logger.debug("Reviewing section: %s", key)
+        self.logger.debug("Content length: %d characters", len(content))
         self.logger.debug("Content preview: %s...", content[:200])
         
         try:
-            self.logger.info("Loading section descriptions")
-            section_descriptions = self._load_section_descriptions()
-            if key not in section_descriptions:
+            engine = self._get_review_engine()
+            section = engine.config.get(key)
+            if section is None:
                 self.logger.error("Unknown section key: %s", key)
-                return False, f"Unknown section key: {key}"
-            
-            section_data = section_descriptions[key]
-            description = section_data.get('description', '')
-            self.logger.info("Section description length: %d characters", len(description))
-            
-            # Check if we have JSON format with word_count configuration
-            if isinstance(section_data, dict) and "word_count" in section_data:
-                # Use JSON configuration directly
-                word_count_config = section_data.get("word_count", {})
-                min_words = word_count_config.get("min", 30)
-                max_words = word_count_config.get("max", 100)
-                
-                self.logger.info("Using JSON word count config: min=%d, max=%d", min_words, max_words)
-            else:
-                # Fallback to old method
-                max_words = self._extract_max_words_from_description(description)
-                if max_words:
-                    min_words, max_words_with_tolerance = self._get_word_count_tolerance(max_words)
-                    self.logger.info("Word count tolerance: min=%d, max=%d", min_words, max_words_with_tolerance)
-                    max_words = max_words_with_tolerance
-                else:
-                    self.logger.info("No word count requirement found in description")
-                    min_words, max_words = 150, 325  # Default values
-            
-            # Calculate word count (moved outside if/else block)
-            words = len(re.findall(r"\w+", content))
-            self.logger.info("Actual word count: %d", words)
-                
-            if words < min_words or words > max_words:
-                self.logger.warning("Section length out of bounds: %d words (min %d, max %d)", words, min_words, max_words)
-                return False, f"Section length out of bounds: {words} words (min {min_words}, max {max_words})"
-            else:
-                self.logger.info("Word count within acceptable range")
-            
-            # DOT-Code-Block im Fließtext NICHT mehr prüfen
-            self.logger.info("Checking content alignment")
-            alignment_score = self._check_content_alignment(content, description, str(key) if key else None)
-            self.logger.info("Alignment score: %.2f", alignment_score)
+                return ReviewDecision(False, f"Unknown section key: {key}")
             
             threshold = getattr(self, 'alignment_threshold', 0.6)
-            self.logger.info("Alignment threshold: %.2f", threshold)
-            
-            if alignment_score < threshold:
-                self.logger.warning("Content does not align well with section requirements (alignment score: %.2f)", alignment_score)
-                return False, f"Content does not align well with section requirements (alignment score: {alignment_score:.2f})"
+            # Word count and requirement coverage, matched against this section's terms only
+            ctx = ReviewContext(section=section, content=content, stats=engine.analyze(content, sections=(key,)), threshold=threshold, provider=provider)
+            decision = self.review_pipeline.run(ctx, budget, defer_ai=defer_ai)
             
-            self.logger.info("Section review passed successfully")
-            return True, "ok"
+            stage_summary = ", ".join(
+                f"{r.stage}={'pass' if r.passed else 'fail'}" + (f"({r.score:.2f})" if r.score is not None else "")
+                for r in decision.stages
+            )
+            self.logger.debug("Review stages for %s: %s", key, stage_summary)
+            if not decision.accepted:
+                self.logger.warning("Section %s rejected: %s", key, decision.reason)
+            elif decision.pending_ai:
+                self.logger.info("Section %s provisionally accepted, AI review deferred", key)
+            else:
+                self.logger.debug("Section review passed successfully")
+            return decision
         except Exception as e:
             self.logger.error("Error in review_section for %s: %s", key, e)
-            return False, f"Review error: {str(e)}"
+            return ReviewDecision(False, f"Review error: {str(e)}")
     
     def _extract_max_words_from_description(self, description: str) -> Optional[int]:
         """Extract maximum word count from description text."""
-        # Look for patterns like "Maximum length: half a page" or "max 250 words"
-        patterns = [
-            r"Maximum length:\s*half a page",
-            r"Maximum length:\s*one page", 
-            r"Maximum length:\s*one third of a page",
-            r"max\s+(\d+)\s+words",
-            r"maximum\s+(\d+)\s+words"
-        ]
-        
-        for pattern in patterns:
-            if re.search(pattern, description, re.IGNORECASE):
-                # All sections now use half a page (250 words)
-                return 250
-        
-        # Default values if no length specification found in description
-        default_limits = {
-            "system_scope": 250,
-            "architecture_tech_stack": 250,
-            "external_interfaces": 250,
-            "ci_cd": 250,
-            "testing_concept": 250,
-            "deployment_operation": 250,
-            "ux_ui": 250
-        }
-        
-        # Try to determine from section key in description
-        for section_key, limit in default_limits.items():
-            if section_key in description.lower():
-                return limit
-        
-        return 250  # Default to half a page for all sections
+        return extract_max_words_from_description(description)
     
     def _get_word_count_tolerance(self, max_words: int) -> tuple[int, int]:
         """Get the acceptable word count range with tolerance."""
-        # Allow 30% tolerance above the limit (more generous)
-        tolerance = int(max_words * 0.3)
-        # Set minimum to 60% of max_words to ensure substantial content
-        min_words = int(max_words * 0.6)  # 60% of max_words as minimum
-        max_words_with_tolerance = max_words + tolerance
-        
-        return min_words, max_words_with_tolerance
+        return get_word_count_tolerance(max_words)
     
-    def _check_content_alignment(self, content: str, description: str, section_key: Optional[str] = None) -> float:
+    def _check_content_alignment(self, content: str, description: str, section_key: Optional[str] = None, stats: Optional[TextStats] = None) -> float:
         """Check how well the content aligns with the description requirements from section_descriptions.json."""
         try:
-            # Load section descriptions to get content requirements
-            section_descriptions = self._load_section_descriptions()
-            
-            # If we have a section key and content requirements, use them
-            if section_key and section_key in section_descriptions:
-                section_config = section_descriptions[section_key]
-                content_requirements = section_config.get('content_requirements', [])
-                
-                if content_requirements:
-                    return self._check_content_against_requirements(content, content_requirements, section_config)
+            # If we have a section key and content requirements, use the compiled review engine
+            engine = self._get_review_engine()
+            section = engine.config.get(section_key) if section_key else None
+            if section is not None and section.content_requirements:
+                score = engine.coverage_score(section, stats or engine.analyze(content, sections=(section_key,)))
+                self.logger.debug("Requirement coverage score for %s: %.2f", section_key, score)
+                return score
             
             # Fallback to keyword-based checking if no requirements found
             return self._check_content_alignment_fallback(content, description)
                 
         except Exception as e:
-            self.logger.error(f"Error in content alignment check: {e}")
+            self.logger.error("Error in content alignment check: %s", e)
             return 0.6  # More lenient default score on error
     
-    def _check_content_against_requirements(self, content: str, content_requirements: list, section_config: Optional[dict] = None) -> float:
-        """Check content against specific requirements from section_descriptions.json."""
-        try:
-            content_lower = content.lower()
-            requirements_covered = 0
-            total_requirements = len(content_requirements)
-            
-            for requirement in content_requirements:
-                # Extract key terms from the requirement
-                requirement_lower = requirement.lower()
-                
-                # Check if the requirement is covered in the content
-                # Look for key terms from the requirement
-                key_terms = self._extract_key_terms_from_requirement(requirement)
-                
-                # Check if any key terms are present in the content
-                if any(term in content_lower for term in key_terms):
-                    requirements_covered += 1
-                    self.logger.debug(f"Requirement covered: {requirement}")
-                else:
-                    self.logger.debug(f"Requirement NOT covered: {requirement}")
-            
-            # Calculate base score
-            if total_requirements > 0:
-                base_score = requirements_covered / total_requirements
-                
-                # Add length bonus based on section configuration
-                if section_config and 'word_count' in section_config:
-                    word_count_config = section_config['word_count']
-                    target_words = word_count_config.get('target', 70)
-                    min_words = word_count_config.get('min', 30)
-                    max_words = word_count_config.get('max', 100)
-                    
-                    # Calculate actual word count
-                    actual_words = len(content.split())
-                    
-                    # Length bonus based on target achievement
-                    if actual_words >= target_words:
-                        # Bonus for meeting or exceeding target
-                        length_bonus = 0.15
-                        self.logger.debug(f"Length bonus: {length_bonus} (target met: {actual_words} >= {target_words})")
-                    elif actual_words >= min_words:
-                        # Partial bonus for meeting minimum
-                        length_bonus = 0.05
-                        self.logger.debug(f"Length bonus: {length_bonus} (minimum met: {actual_words} >= {min_words})")
-                    else:
-                        # No bonus if below minimum
-                        length_bonus = 0.0
-                        self.logger.debug(f"Length bonus: {length_bonus} (below minimum: {actual_words} < {min_words})")
-                    
-                    base_score += length_bonus
-                else:
-                    # Fallback length bonus for older content
-                    if len(content) > 200:
-                        base_score += 0.1
-                    if len(content) > 500:
-                        base_score += 0.05
-                
-                # Cap at 1.0
-                return min(base_score, 1.0)
-            else:
-                return 0.7 if len(content) > 100 else 0.5
-                
-        except Exception as e:
-            self.logger.error(f"Error in content requirements check: {e}")
-            return 0.6
-    
     def _extract_key_terms_from_requirement(self, requirement: str) -> list:
         """Extract key terms from a content requirement for matching."""
-        requirement_lower = requirement.lower()
-        key_terms = []
-        
-        # Extract important terms (words that are not common stop words)
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'can', 'must', 'shall', 'how', 'what', 'when', 'where', 'why', 'which', 'who', 'whom', 'this', 'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them', 'my', 'your', 'his', 'her', 'its', 'our', 'their', 'mine', 'yours', 'his', 'hers', 'ours', 'theirs'}
-        
-        # Split into words and filter out stop words
-        words = requirement_lower.split()
-        for word in words:
-            # Clean the word (remove punctuation)
-            clean_word = ''.join(c for c in word if c.isalnum())
-            if clean_word and len(clean_word) > 2 and clean_word not in stop_words:
-                key_terms.append(clean_word)
-        
-        # Add some common variations and synonyms
-        term_variations = {
-            'test': ['testing', 'tested', 'tests'],
-            'security': ['secure', 'secured', 'security'],
-            'performance': ['performant', 'performance'],
-            'scalability': ['scalable', 'scale', 'scaling'],
-            'monitoring': ['monitor', 'monitored', 'monitors'],
-            'deployment': ['deploy', 'deployed', 'deploying'],
-            'integration': ['integrate', 'integrated', 'integrates'],
-            'architecture': ['architectural', 'architect'],
-            'technology': ['tech', 'technological'],
-            'framework': ['frameworks'],
-            'api': ['apis', 'application programming interface'],
-            'database': ['db', 'databases'],
-            'cloud': ['cloud-based', 'cloud-native'],
-            'container': ['containers', 'containerization'],
-            'orchestration': ['orchestrate', 'orchestrated'],
-            'automation': ['automated', 'automate'],
-            'quality': ['qualitative', 'quality assurance'],
-            'accessibility': ['accessible', 'accessibility'],
-            'responsive': ['responsiveness', 'responsive design'],
-            'prototype': ['prototyping', 'prototyped'],
-            'user experience': ['ux', 'user experience'],
-            'user interface': ['ui', 'user interface']
-        }
-        
-        # Add variations for found terms
-        additional_terms = []
-        for term in key_terms:
-            if term in term_variations:
-                additional_terms.extend(term_variations[term])
-        
-        key_terms.extend(additional_terms)
-        return list(set(key_terms))  # Remove duplicates
+        return list(extract_key_terms(requirement))
     
     def _check_content_alignment_fallback(self, content: str, description: str) -> float:
         """Fallback method for content alignment when no requirements are available."""
@@ -653,7 +457,7 @@ Please provide a detailed technical analysis and concept document as specified i
                 return 0.7 if len(content) > 100 else 0.5
                 
         except Exception as e:
-            self.logger.error(f"Error in content alignment fallback check: {e}")
+            self.logger.error("Error in content alignment fallback check: %s", e)
             return 0.6  # More lenient default score on error
 
     def _review_section_with_ai(self, section_name, definition, content, provider):
@@ -666,7 +470,6 @@ Please provide a detailed technical analysis and concept document as specified i
                 response = self._call_ollama(review_prompt)
             else:
                 return 0, "[REVIEW ERROR] Unsupported provider"
-            import re
             m = re.search(r"SCORE:\s*(\d+)[^\d]*(.*)", response, re.IGNORECASE)
             if m:
                 score = int(m.group(1))
@@ -677,30 +480,54 @@ Please provide a detailed technical analysis and concept document as specified i
         except Exception as e:
             return 0, f"[REVIEW ERROR] {str(e)}"
 
-    def _load_section_descriptions(self) -> Dict[str, Dict[str, Any]]:
-        """Load section descriptions from JSON file or use defaults."""
-        try:
-            # Try to load from JSON file first
-            json_path = "section_descriptions.json"
-            if os.path.exists(json_path):
-                self.logger.info("Loading section descriptions from JSON file: %s", json_path)
-                with open(json_path, 'r', encoding='utf-8') as f:
-                    descriptions = json.load(f)
-                self.logger.info("Loaded %d section descriptions from JSON file", len(descriptions))
-                return descriptions
-        except Exception as e:
-            self.logger.warning("Failed to load JSON descriptions: %s", str(e))
+    def review_sections_with_ai_batch(self, items: List[BatchReviewItem], provider: str) -> Dict[str, Tuple[int, str]]:
+        """Review many sections (of one or several documents) in a single AI request.
+        
+        Returns {item_id: (score 0-100, reason)} for every item. Only items whose
+        score could not be read from the batched response are reviewed one by one.
+        """
+        if not items:
+            return {}
+        if len({item.item_id for item in items}) != len(items):
+            raise ValueError("Batch review item ids must be unique")
+        
+        results: Dict[str, Tuple[int, str]] = {}
+        if len(items) > 1:
+            prompt = build_batch_review_prompt(items)
+            try:
+                if provider == "openai":
+                    response = self._call_openai(prompt)
+                elif provider == "ollama":
+                    response = self._call_ollama(prompt)
+                else:
+                    raise ValueError(f"Unsupported AI provider: {provider}")
+                results = parse_batch_review(response, items)
+                self.logger.info("Batch review parsed %d/%d section scores", len(results), len(items))
+            except Exception as e:
+                self.logger.warning("Batch review request failed: %s", e)
         
+        for item in items:
+            if item.item_id not in results:
+                self.logger.debug("Falling back to single-section review for %s", item.item_id)
+                results[item.item_id] = self._review_section_with_ai(item.title, item.description, item.content, provider)
+        return results
+
+    def _load_section_descriptions(self) -> Dict[str, Dict[str, Any]]:
+        """Return the raw section descriptions from the shared registry (read-only)."""
+        return self.section_registry.get().raw
+    
+    def _load_fallback_section_descriptions(self) -> Dict[str, Dict[str, Any]]:
+        """Load section descriptions from the text file or use defaults (JSON file missing or invalid)."""
         try:
-            # Fallback to text file
             txt_path = "section_descriptions.txt"
             if os.path.exists(txt_path):
                 self.logger.info("Loading section descriptions from text file: %s", txt_path)
-                return self._parse_text_descriptions(txt_path)
+                descriptions = self._parse_text_descriptions(txt_path)
+                if any(isinstance(v, dict) and 'title' in v for v in descriptions.values()):
+                    return descriptions
         except Exception as e:
             self.logger.warning("Failed to load text descriptions: %s", str(e))
         
-        # Use defaults if no file found
         self.logger.info("Using default section descriptions")
         return self._get_default_section_descriptions()
     
@@ -802,124 +629,213 @@ Please provide a detailed technical analysis and concept document as specified i
             }
         }
 
-    def generate_technical_concept_sections(self, project_description: str, provider: str = "openai", proposal_context: str = "", cancel_callback=None) -> Dict[str, Any]:
+    def _generate_section(self, section, project_description: str, provider: str, proposal_context: str, cancel_callback,
+                          review_budget: Optional[ReviewBudget], defer_ai: bool = False, previous_errors: Optional[List[str]] = None):
+        """Generate one section with up to 10 review attempts.
+        
+        Returns (result, pending_content); pending_content is set when the section
+        was accepted provisionally and still needs the batched AI review.
+        """
+        key = section.key
+        title = section.title
+        self.logger.debug("Section title: %s", title)
+        self.logger.debug("Word count requirements: min=%d, max=%d, target=%d", section.min_words, section.max_words, section.target_words)
+            
+        previous_errors = list(previous_errors or [])
+        best_score = float('-inf')
+        best_content = None
+        best_reason = None
+        # 1. Fließtext generieren (ohne Diagramm)
+        self.logger.debug("Starting text generation for section: %s", key)
+        for attempt in range(10):
+            set_log_context(attempt=attempt + 1)
+            self.logger.info("Text generation attempt %d/10 for section: %s", attempt + 1, key)
+            if cancel_callback and callable(cancel_callback) and cancel_callback():
+                self.logger.info("Generation cancelled during section %s, attempt %d", key, attempt + 1)
+                break
+            prompt = f"""You are an expert software architect and technical writer. Your task is to write ONLY the following section of a technical concept for a software project, in clear professional English. Do NOT add any other sections, summaries, introductions, conclusions, bullet points, lists, or headings.\n\nSection: {title}\n\nProject Description:\n{project_description}"""
+            if proposal_context and proposal_context.strip():
+                prompt += f"\n\nExisting Proposal Context:\n{proposal_context}"
+            # Verwende nur die spezifische Beschreibung für diese Sektion (vorkompiliert)
+            prompt += section.prompt_instructions
+            if previous_errors:
+                error_context = "\n".join([f"- {error}" for error in previous_errors])
+                prompt += f"\n\nIMPORTANT: The previous attempt failed due to these issues. Please ensure you address ALL of these problems:\n{error_context}\n\nMake sure to fix these specific issues in your response."
+                self.logger.debug("Adding error context from previous attempts: %d errors", len(previous_errors))
+            self.logger.debug("Text generation prompt length: %d", len(prompt))
+            if provider == "openai":
+                response = self._call_openai(prompt)
+            elif provider == "ollama":
+                response = self._call_ollama(prompt)
+            else:
+                self.logger.error("Unsupported AI provider: %s", provider)
+                raise ValueError(f"Unsupported AI provider: {provider}")
+            content = response.strip()
+            self.logger.debug("Generated content length: %d characters", len(content))
+            # Review prüft nicht mehr auf DOT-Code-Block im Fließtext
+            self.logger.debug("Reviewing generated content")
+            decision = self._review_section_decision(key, content, provider=provider, budget=review_budget, defer_ai=defer_ai)
+            score, reason = decision.accepted, decision.reason
+            self.logger.info("Section %s review result: score=%s, reason=%s", key, score, reason)
+            # Speichere bestes Ergebnis
+            if isinstance(score, (int, float)) and score > best_score:
+                best_score = score
+                best_content = content
+                best_reason = reason
+            if score:
+                self.logger.info("Section %s accepted after %d attempts", key, attempt + 1)
+                return {"text": content}, (content if decision.pending_ai else None)
+            previous_errors.append(reason)
+            self.logger.warning("Section %s rejected (attempt %d): %s", key, attempt + 1, reason)
+            if attempt == 9:
+                self.logger.warning("Section %s using best effort after 10 failed attempts", key)
+                if best_content is not None:
+                    return {"text": f"[BEST EFFORT]\n{best_content}\n\n[REVIEW] {best_reason}"}, None
+                return {"text": f"[BEST EFFORT]\n{content}\n\n[REVIEW] {reason}"}, None
+        return None, None
+    
+    def _apply_batched_ai_review(self, pending: Dict[str, str], section_config, results: Dict[str, Any], project_description: str,
+                                 provider: str, proposal_context: str, cancel_callback, threshold: float,
+                                 review_budget: Optional[ReviewBudget] = None) -> List[str]:
+        """Review all provisionally accepted sections in one AI request and regenerate rejected ones.
+        
+        Returns the keys whose text in results is final (accepted or regenerated).
+        """
+        items = [
+            BatchReviewItem(item_id=key, key=key, title=section_config.get(key).title,
+                            description=section_config.get(key).description, content=content)
+            for key, content in pending.items()
+        ]
+        self.logger.info("Batched AI review of %d borderline sections", len(items))
+        reviews = self.review_sections_with_ai_batch(items, provider)
+        final = []
+        for item in items:
+            score, reason = reviews[item.item_id]
+            if reason.startswith("[REVIEW ERROR]"):
+                # Keep the locally accepted text when the AI review is unavailable
+                self.logger.warning("AI review failed for %s, keeping local verdict: %s", item.key, reason)
+                final.append(item.key)
+                continue
+            if score / 100.0 >= threshold:
+                self.logger.info("AI review accepted section %s (score %d)", item.key, score)
+                final.append(item.key)
+                continue
+            if cancel_callback and callable(cancel_callback) and cancel_callback():
+                break
+            self.logger.warning("AI review rejected section %s (score %d): %s", item.key, score, reason)
+            error = f"AI review rejected the section (score: {score / 100.0:.2f}): {reason}"
+            # Regenerated text is reviewed inline (no second deferral) with what is left of the budget
+            with log_context(section=item.key, attempt=None):
+                result, _ = self._generate_section(section_config.get(item.key), project_description, provider, proposal_context,
+                                                   cancel_callback, review_budget, previous_errors=[error])
+            if result is not None:
+                results[item.key] = result
+                final.append(item.key)
+        return final
+    
+    def _save_checkpoint(self, section_checkpoint, key: str, result: Dict[str, Any]):
+        # Best-Effort-Texte nicht sichern, damit ein neuer Lauf sie noch einmal versucht
+        if section_checkpoint is None or result.get("text", "").startswith("[BEST EFFORT]"):
+            return
+        try:
+            section_checkpoint.save(key, result)
+        except Exception as e:
+            self.logger.warning("Could not save checkpoint for section %s: %s", key, e)
+    
+    def _adapt_section(self, section, base_text: str, project_description: str, provider: str, proposal_context: str,
+                       review_budget: Optional[ReviewBudget]) -> Optional[Dict[str, Any]]:
+        """One provider call that adapts a section written for a near-identical spec; None if the review rejects it."""
+        set_log_context(attempt=1)
+        prompt = f"""You are an expert software architect and technical writer. Below is a section of a technical concept that was written for a very similar project. Adapt it to the project description below: keep structure, wording and length, and change only what the differences in the description require. Return ONLY the adapted section text, without headings or comments.\n\nSection: {section.title}\n\nProject Description:\n{project_description}\n\nExisting Section Text:\n{base_text}"""
+        if proposal_context and proposal_context.strip():
+            prompt += f"\n\nExisting Proposal Context:\n{proposal_context}"
+        prompt += section.prompt_instructions
+        if provider == "openai":
+            content = self._call_openai(prompt).strip()
+        elif provider == "ollama":
+            content = self._call_ollama(prompt).strip()
+        else:
+            raise ValueError(f"Unsupported AI provider: {provider}")
+        decision = self._review_section_decision(section.key, content, provider=provider, budget=review_budget)
+        if decision.accepted:
+            self.logger.info("Section %s adapted from similar spec", section.key)
+            return {"text": content}
+        self.logger.info("Adapted section %s rejected (%s), generating from scratch", section.key, decision.reason)
+        return None
+    
+    def generate_technical_concept_sections(self, project_description: str, provider: str = "openai", proposal_context: str = "", cancel_callback=None,
+                                            section_checkpoint=None, adapt_from: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Generate all configured sections one by one.
+        
+        With a section_checkpoint (see checkpoint_store.SectionCheckpoint), sections
+        accepted in an earlier run are reused and newly accepted ones are saved
+        right away, so an interrupted run only regenerates what is missing.
+        adapt_from is the concept of a near-duplicate spec: its sections are
+        adapted with one call each and only generated from scratch if the
+        adapted text fails the review. metadata.provider_calls counts the calls.
+        """
+        counter = [0]
+        token = _provider_calls.set(counter)
+        try:
+            concept = self._generate_concept_sections(project_description, provider, proposal_context, cancel_callback,
+                                                      section_checkpoint, (adapt_from or {}).get("sections", {}))
+        finally:
+            _provider_calls.reset(token)
+        concept["metadata"]["provider_calls"] = counter[0]
+        return concept
+    
+    def _generate_concept_sections(self, project_description: str, provider: str, proposal_context: str, cancel_callback,
+                                   section_checkpoint, adapt_sections: Dict[str, Any]) -> Dict[str, Any]:
         self.logger.info("Starting section-by-section technical concept generation")
         self.logger.info("Provider: %s", provider)
         self.logger.info("Project description length: %d", len(project_description))
         self.logger.info("Proposal context provided: %s", bool(proposal_context and proposal_context.strip()))
         
-        section_descriptions = self._load_section_descriptions()
-        self.logger.info("Loaded %d section descriptions", len(section_descriptions))
+        section_config = self.section_registry.get()
+        self.logger.info("Loaded %d section descriptions", len(section_config.sections))
         
         results = {}
         threshold = getattr(self, 'alignment_threshold', 0.6)
         self.logger.info("Alignment score threshold: %.2f", threshold)
+        review_budget = ReviewBudget(getattr(self, 'ai_review_budget', 0))
+        defer_ai = bool(getattr(self, 'ai_review_batched', True))
+        pending = {}  # key -> provisionally accepted content waiting for the batched AI review
+        restored = section_checkpoint.completed() if section_checkpoint is not None else {}
         
-        for key, section_data in section_descriptions.items():
-            # Skip documentation or invalid entries
-            if not isinstance(section_data, dict) or 'title' not in section_data:
-                self.logger.info("Skipping non-section entry: %s", key)
+        for key, section in section_config.sections.items():
+            if key in restored:
+                self.logger.info("Section %s restored from checkpoint", key)
+                results[key] = restored[key]
                 continue
             self.logger.info("Processing section: %s", key)
             
             if cancel_callback and callable(cancel_callback) and cancel_callback():
                 self.logger.info("Generation cancelled before section %s", key)
                 break
-                
-            title = section_data["title"]
             
-            # Handle both old text format and new JSON format
-            if isinstance(section_data, dict) and "word_count" in section_data:
-                # New JSON format
-                definition = section_data["description"]
-                word_count_config = section_data.get("word_count", {})
-                target_words = word_count_config.get("target", 70)
-                min_words = word_count_config.get("min", 30)
-                max_words = word_count_config.get("max", 100)
-                
-                self.logger.info("Section title: %s", title)
-                self.logger.info("Section definition length: %d", len(definition))
-                self.logger.info("Word count config: target=%d, min=%d, max=%d", target_words, min_words, max_words)
-                
-                word_count_instruction = f"\n\nWORD COUNT REQUIREMENTS:\n- Minimum: {min_words} words\n- Maximum: {max_words} words\n- Target: {target_words} words\n\n"
-                self.logger.info("Word count requirements: min=%d, max=%d, target=%d", min_words, max_words, target_words)
-            else:
-                # Old text format
-                definition = section_data["description"]
-                self.logger.info("Section title: %s", title)
-                self.logger.info("Section definition length: %d", len(definition))
-                
-                max_words = self._extract_max_words_from_description(definition)
-                if max_words:
-                    min_words, max_words_with_tolerance = self._get_word_count_tolerance(max_words)
-                    word_count_instruction = f"\n\nWORD COUNT REQUIREMENTS:\n- Minimum: {min_words} words\n- Maximum: {max_words_with_tolerance} words\n- Target: {max_words} words\n\n"
-                    self.logger.info("Word count requirements: min=%d, max=%d, target=%d", min_words, max_words_with_tolerance, max_words)
+            with log_context(section=key, attempt=None):
+                base_text = adapt_sections.get(key, {}).get("text", "")
+                adapted = None
+                if base_text and not base_text.startswith("[BEST EFFORT]"):
+                    adapted = self._adapt_section(section, base_text, project_description, provider, proposal_context, review_budget)
+                if adapted is not None:
+                    result, pending_content = adapted, None
                 else:
-                    word_count_instruction = "\n\nWORD COUNT REQUIREMENTS:\n- Minimum: 150 words\n- Maximum: 400 words\n- Target: 250 words\n\n"
-                    self.logger.info("Using default word count requirements")
-                
-
-                
-            previous_errors = []
-            section_accepted = False
-            best_attempt = None  # (score, content, reason)
-            best_score = float('-inf')
-            best_content = None
-            best_reason = None
-            # 1. Fließtext generieren (ohne Diagramm)
-            self.logger.info("Starting text generation for section: %s", key)
-            for attempt in range(10):
-                self.logger.info("Text generation attempt %d/10 for section: %s", attempt + 1, key)
-                if cancel_callback and callable(cancel_callback) and cancel_callback():
-                    self.logger.info("Generation cancelled during section %s, attempt %d", key, attempt + 1)
-                    break
-                # Verwende nur die spezifische Beschreibung für diese Sektion
-                section_description = definition
-                self.logger.info("Using section-specific description for %s: %d characters", key, len(section_description))
-                prompt = f"""You are an expert software architect and technical writer. Your task is to write ONLY the following section of a technical concept for a software project, in clear professional English. Do NOT add any other sections, summaries, introductions, conclusions, bullet points, lists, or headings.\n\nSection: {title}\n\nProject Description:\n{project_description}"""
-                if proposal_context and proposal_context.strip():
-                    prompt += f"\n\nExisting Proposal Context:\n{proposal_context}"
-                # Verwende nur die spezifische Beschreibung für diese Sektion
-                prompt += f"\n\nInstructions:\n{section_description}{word_count_instruction}Output ONLY the content for this section. Do NOT include the section header or any other text. Do NOT include any diagram or code block."
-                if attempt > 0 and previous_errors:
-                    error_context = "\n".join([f"- {error}" for error in previous_errors])
-                    prompt += f"\n\nIMPORTANT: The previous attempt failed due to these issues. Please ensure you address ALL of these problems:\n{error_context}\n\nMake sure to fix these specific issues in your response."
-                    self.logger.info("Adding error context from previous attempts: %d errors", len(previous_errors))
-                self.logger.debug("Text generation prompt length: %d", len(prompt))
-                if provider == "openai":
-                    response = self._call_openai(prompt)
-                elif provider == "ollama":
-                    response = self._call_ollama(prompt)
-                else:
-                    self.logger.error("Unsupported AI provider: %s", provider)
-                    raise ValueError(f"Unsupported AI provider: {provider}")
-                content = response.strip()
-                self.logger.info("Generated content length: %d characters", len(content))
-                # Review prüft nicht mehr auf DOT-Code-Block im Fließtext
-                self.logger.info("Reviewing generated content")
-                score, reason = self._review_section(key, content, content, check_dot_block=False)
-                self.logger.info("Section %s review result: score=%s, reason=%s", key, score, reason)
-                # Speichere bestes Ergebnis
-                if isinstance(score, (int, float)) and score > best_score:
-                    best_score = score
-                    best_content = content
-                    best_reason = reason
-                if score:
-                    results[key] = {"text": content}
-                    section_accepted = True
-                    self.logger.info("Section %s accepted after %d attempts", key, attempt + 1)
-                    break
-                else:
-                    previous_errors.append(reason)
-                    self.logger.warning("Section %s rejected (attempt %d): %s", key, attempt + 1, reason)
-                    if attempt == 9:
-                        self.logger.warning("Section %s using best effort after 10 failed attempts", key)
-                        if best_content is not None:
-                            results[key] = {"text": f"[BEST EFFORT]\n{best_content}\n\n[REVIEW] {best_reason}"}
-                        else:
-                            results[key] = {"text": f"[BEST EFFORT]\n{content}\n\n[REVIEW] {reason}"}
-            
-            
+                    result, pending_content = self._generate_section(
+                        section, project_description, provider, proposal_context, cancel_callback,
+                        review_budget, defer_ai=defer_ai
+                    )
+            if result is not None:
+                results[key] = result
+                if pending_content is None:
+                    self._save_checkpoint(section_checkpoint, key, result)
+            if pending_content is not None:
+                pending[key] = pending_content
+        
+        if pending:
+            final = self._apply_batched_ai_review(pending, section_config, results, project_description, provider, proposal_context, cancel_callback, threshold, review_budget)
+            for key in final:
+                self._save_checkpoint(section_checkpoint, key, results[key])
         
         self.logger.info("Section-by-section generation completed. Generated %d sections", len(results))
         return {"sections": results, "metadata": {"generated_by": "Zeta Proposer", "mode": "section_by_section_ai_reviewed_graphviz"}} 
@@ -0,0 +1,147 @@
+import re
+import json
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+_JSON_FENCE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+_LINE_SCORE = re.compile(r"^[^\w\n]*([\w\-:. ]+?)[^\w\n]*[:\-][ \t]*SCORE:[ \t]*(\d+)[ \t]*(?:/[ \t]*100)?[ \t\-:]*(.*)$", re.IGNORECASE | re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class BatchReviewItem:
+    """One section candidate in a batched review request.
+
+    item_id is opaque and unique per batch: the section key for a single
+    document, or e.g. "doc2:ci_cd" when several documents are reviewed at once.
+    """
+    item_id: str
+    key: str
+    title: str
+    description: str
+    content: str
+
+
+def normalize_id(value) -> str:
+    return re.sub(r"[^a-z0-9]+", "", str(value).lower())
+
+
+def build_batch_review_prompt(items: Sequence[BatchReviewItem]) -> str:
+    parts = [
+        "You are an expert technical reviewer. Review each of the following sections of technical "
+        "concepts against its requirements. Give every section a score from 0 to 100 based on how "
+        "well the text fulfills ALL of its requirements.\n"
+    ]
+    for item in items:
+        parts.append(
+            f"=== SECTION id=\"{item.item_id}\" ===\nTitle: {item.title}\nRequirements: {item.description}\n"
+            f"Text:\n{item.content}\n=== END SECTION id=\"{item.item_id}\" ===\n"
+        )
+    parts.append(
+        "Respond with JSON only, no other text, in exactly this form:\n"
+        '{"reviews": [{"id": "<section id>", "score": <0-100>, "reason": "<short reason>"}]}\n'
+        "Include one entry per section and copy each id exactly."
+    )
+    return "\n".join(parts)
+
+
+def _load_json(response: str):
+    candidates = [m.group(1) for m in _JSON_FENCE.finditer(response)] + [response]
+    for text in candidates:
+        text = text.strip()
+        for start_char, end_char in (("{", "}"), ("[", "]")):
+            start, end = text.find(start_char), text.rfind(end_char)
+            if start == -1 or end <= start:
+                continue
+            try:
+                return json.loads(text[start:end + 1])
+            except ValueError:
+                continue
+    return None
+
+
+def _entries(data) -> List[dict]:
+    """Normalise the accepted response shapes to a list of {id, score, reason} dicts."""
+    if isinstance(data, dict):
+        for name in ("reviews", "results", "sections", "scores"):
+            if isinstance(data.get(name), list):
+                return [e for e in data[name] if isinstance(e, dict)]
+        # {"<id>": {"score": .., "reason": ..}} or {"<id>": 85}
+        entries = []
+        for item_id, value in data.items():
+            if isinstance(value, dict):
+                entries.append(dict(value, id=value.get("id", item_id)))
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                entries.append({"id": item_id, "score": value})
+        return entries
+    if isinstance(data, list):
+        return [e for e in data if isinstance(e, dict)]
+    return []
+
+
+def _score(value) -> Optional[int]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return max(0, min(100, int(round(value))))
+    if isinstance(value, str):
+        m = re.search(r"\d+(?:\.\d+)?", value)
+        if m:
+            return max(0, min(100, int(round(float(m.group(0))))))
+    return None
+
+
+def parse_batch_review(response: str, items: Sequence[BatchReviewItem]) -> Dict[str, Tuple[int, str]]:
+    """Map a batched review response back to item ids.
+
+    Entries are matched by exact id, then normalised id, then by section key
+    or title when that is unambiguous within the batch, and finally by
+    position if the response has no usable ids but one entry per item.
+    Items that cannot be matched or have no parsable score are left out.
+    """
+    by_id = {item.item_id: item for item in items}
+    by_normalized: Dict[str, Optional[str]] = {}
+    for item in items:
+        for alias in (item.item_id, item.key, item.title):
+            norm = normalize_id(alias)
+            if not norm:
+                continue
+            # An alias shared by several items (same key in two documents) is ambiguous
+            if norm in by_normalized and by_normalized[norm] != item.item_id:
+                by_normalized[norm] = None
+            else:
+                by_normalized[norm] = item.item_id
+
+    results: Dict[str, Tuple[int, str]] = {}
+    data = _load_json(response)
+    entries = _entries(data) if data is not None else []
+    unmatched = []
+    for entry in entries:
+        score = _score(entry.get("score"))
+        if score is None:
+            continue
+        reason = str(entry.get("reason", "")).strip()
+        raw_id = entry.get("id", entry.get("section", entry.get("key", entry.get("title"))))
+        item_id = None
+        if raw_id is not None:
+            raw_id = str(raw_id).strip()
+            item_id = raw_id if raw_id in by_id else by_normalized.get(normalize_id(raw_id))
+        if item_id is None:
+            unmatched.append((score, reason))
+        elif item_id not in results:
+            results[item_id] = (score, reason)
+
+    if not results and unmatched and len(unmatched) == len(items):
+        logger.debug("Batch review response has no usable ids, matching %d entries by position", len(items))
+        results = {item.item_id: unmatched[i] for i, item in enumerate(items)}
+
+    if data is None:
+        # Model ignored the JSON instruction; accept "<id>: SCORE: <n> - <reason>" lines
+        for m in _LINE_SCORE.finditer(response):
+            item_id = m.group(1).strip()
+            item_id = item_id if item_id in by_id else by_normalized.get(normalize_id(item_id))
+            if item_id and item_id not in results:
+                results[item_id] = (min(int(m.group(2)), 100), m.group(3).strip())
+    return results
@@ -0,0 +1,451 @@
+import copy
+import json
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .checkpoint_store import CheckpointStore, spec_hash
+from .logging_setup import get_log_context, log_context
+from .render_service import DEFAULT_RENDER_WORKERS, RenderJob, RenderService
+from .spec_similarity import DEFAULT_ADAPT_THRESHOLD, DEFAULT_REUSE_THRESHOLD, cluster_near_duplicates
+from .word_generator import RenderedDocument, WordDocumentGenerator
+
+STAGE_NAMES = ("load", "generate", "render", "write")
+# Generierung wartet fast nur auf den Provider, Rendern läuft in Prozessen, Schreiben ist I/O
+DEFAULT_STAGE_WORKERS = {"load": 1, "generate": 2, "render": DEFAULT_RENDER_WORKERS, "write": 1}
+# Max. Elemente zwischen zwei Stufen; eine volle Queue bremst die vorherige Stufe
+DEFAULT_QUEUE_SIZE = 4
+
+# Wie lange ein Duplikat darauf wartet, dass sein Repräsentant mit der Generierung beginnt
+DEFAULT_DUPLICATE_WAIT = 10.0
+_DUPLICATE_POLL_INTERVAL = 0.5
+
+_DONE = object()
+
+
+@dataclass
+class StageStats:
+    name: str
+    workers: int
+    processed: int = 0
+    failed: int = 0
+    busy: float = 0.0  # summed over all workers of the stage
+    started: Optional[float] = None
+    finished: Optional[float] = None
+
+    @property
+    def wall(self) -> float:
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+    @property
+    def throughput(self) -> float:
+        """Items per second between the first item entering and the last leaving the stage."""
+        return self.processed / self.wall if self.wall > 0 else 0.0
+
+    @property
+    def utilization(self) -> float:
+        return self.busy / (self.wall * self.workers) if self.wall > 0 else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.name}: {self.processed} items ({self.failed} failed) in {self.wall:.1f}s, "
+                f"{self.throughput:.2f} items/s, {self.utilization:.0%} busy ({self.workers} workers)")
+
+
+class Pipeline:
+    """Runs items through stages connected by bounded queues.
+
+    Every stage has its own worker threads; a stage function mutates the
+    item and raises on failure. Failed and skipped items are not processed
+    further but still travel to the end, so the result list contains every
+    item. Items need `error`, `failed_stage` and `skipped` attributes.
+    """
+
+    def __init__(self, stages: Sequence[Tuple[str, Callable[[Any], None], int]], queue_size: int = DEFAULT_QUEUE_SIZE,
+                 cancel_callback: Optional[Callable[[], bool]] = None, on_item_done: Optional[Callable[[Any], None]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.stages = [(name, func, max(1, workers)) for name, func, workers in stages]
+        self.queue_size = max(1, queue_size)
+        self.cancel_callback = cancel_callback
+        self.on_item_done = on_item_done
+        self.stats: Dict[str, StageStats] = {}
+        self._lock = threading.Lock()
+
+    def _work(self, name, func, inbox: queue.Queue, outbox: Optional[queue.Queue], alive: List[int], results: List[Any]):
+        stats = self.stats[name]
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                # Für die anderen Worker dieser Stufe zurücklegen; der letzte gibt das Ende weiter
+                inbox.put(_DONE)
+                with self._lock:
+                    alive[0] -= 1
+                    last = alive[0] == 0
+                if last and outbox is not None:
+                    outbox.put(_DONE)
+                return
+            if item.error is None and not item.skipped and self.cancel_callback and self.cancel_callback():
+                item.error, item.failed_stage = "cancelled", name
+            if item.error is None and not item.skipped:
+                start = time.perf_counter()
+                try:
+                    func(item)
+                except Exception as e:
+                    item.error, item.failed_stage = str(e) or type(e).__name__, name
+                    self.logger.error("%s failed in stage %s: %s", item, name, item.error)
+                end = time.perf_counter()
+                with self._lock:
+                    stats.processed += 1
+                    stats.failed += item.error is not None and item.failed_stage == name
+                    stats.busy += end - start
+                    stats.started = start if stats.started is None else min(stats.started, start)
+                    stats.finished = end if stats.finished is None else max(stats.finished, end)
+            if outbox is not None:
+                outbox.put(item)
+            else:
+                with self._lock:
+                    results.append(item)
+                if self.on_item_done:
+                    try:
+                        self.on_item_done(item)
+                    except Exception as e:
+                        self.logger.warning("Progress callback failed: %s", e)
+
+    def run(self, items: Iterable[Any]) -> List[Any]:
+        """Feed items (blocking while the first queue is full) and return them once all stages are done."""
+        self.stats = {name: StageStats(name, workers) for name, _, workers in self.stages}
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        results: List[Any] = []
+        threads = []
+        for i, (name, func, workers) in enumerate(self.stages):
+            outbox = queues[i + 1] if i + 1 < len(queues) else None
+            alive = [workers]
+            for n in range(workers):
+                thread = threading.Thread(target=self._work, args=(name, func, queues[i], outbox, alive, results),
+                                          name=f"bulk-{name}-{n}", daemon=True)
+                thread.start()
+                threads.append(thread)
+        for item in items:
+            queues[0].put(item)
+        queues[0].put(_DONE)
+        for thread in threads:
+            thread.join()
+        return results
+
+
+@dataclass
+class BulkItem:
+    json_file: Path
+    project_name: str = ""
+    upwork_link: str = ""
+    description: str = ""
+    concept: Optional[Dict[str, Any]] = None
+    rendered: Optional[RenderedDocument] = None
+    docx_path: Optional[str] = None
+    spec_hash: Optional[str] = None
+    skipped: bool = False  # already finished in an earlier run
+    error: Optional[str] = None
+    failed_stage: Optional[str] = None
+    # Near-duplicate handling: the spec whose concept is reused/adapted, and how
+    duplicate_of: Optional["BulkItem"] = field(default=None, repr=False)
+    similarity: float = 0.0
+    reuse_mode: Optional[str] = None  # "reuse" or "adapt"
+    concept_future: Optional[Future] = field(default=None, repr=False)  # set for representatives
+    provider_calls: int = 0
+
+    def __str__(self):
+        return self.json_file.name
+
+
+@dataclass
+class BulkReport:
+    items: List[BulkItem]
+    stages: Dict[str, StageStats] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    @property
+    def successful(self) -> List[BulkItem]:
+        return [item for item in self.items if item.error is None and not item.skipped]
+
+    @property
+    def skipped(self) -> List[BulkItem]:
+        return [item for item in self.items if item.skipped]
+
+    @property
+    def failed(self) -> List[BulkItem]:
+        return [item for item in self.items if item.error is not None]
+
+    def stage_summary(self) -> List[str]:
+        return [self.stages[name].summary() for name in STAGE_NAMES if name in self.stages]
+
+    @property
+    def duplicates(self) -> List[BulkItem]:
+        return [item for item in self.items if item.reuse_mode is not None]
+
+    @property
+    def calls_saved(self) -> int:
+        """Estimate: provider calls of the representative minus the calls the duplicate needed."""
+        return sum(max(0, item.duplicate_of.provider_calls - item.provider_calls)
+                   for item in self.duplicates if item.error is None)
+
+    def duplicate_summary(self) -> List[str]:
+        return [f"{item.json_file.name} ~ {item.duplicate_of.json_file.name} ({item.similarity:.0%}, {item.reuse_mode})"
+                for item in self.duplicates]
+
+
+class BulkGenerator:
+    """Spec files -> Word documents as a pipeline: load -> generate -> render -> write.
+
+    Concepts for several specs are generated concurrently while earlier ones
+    are rendered to bytes on the render service's worker processes and
+    written by the write stage, so neither the provider nor the CPU waits
+    for the other. Concurrency per stage comes from stage_workers; the
+    bounded queues between the stages provide the backpressure.
+    With a CheckpointStore, specs whose document was already written are
+    skipped and accepted sections of unfinished specs are reused.
+
+    Before the run, descriptions are clustered with MinHash/LSH. A spec at
+    least reuse_threshold similar to an earlier one takes over its concept,
+    one at least adapt_threshold similar gets it adapted section by section
+    (see generate_technical_concept_sections). Duplicates are fed after all
+    other specs so they rarely wait. adapt_threshold=None turns this off.
+    A duplicate only waits for a representative that is being generated;
+    one that has not reached the generate stage within duplicate_wait
+    seconds (or that fails) is not waited for, the duplicate is then
+    generated from scratch. This keeps duplicates from occupying all
+    generate workers while their representatives queue behind them.
+    """
+
+    def __init__(self, ai_service, render_service: RenderService, word_generator: WordDocumentGenerator,
+                 output_dir, provider: str = "openai", proposal_context: str = "", initiator: str = "",
+                 stage_workers: Optional[Dict[str, int]] = None, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 cancel_callback: Optional[Callable[[], bool]] = None,
+                 on_item_done: Optional[Callable[[BulkItem], None]] = None,
+                 checkpoints: Optional[CheckpointStore] = None,
+                 reuse_threshold: float = DEFAULT_REUSE_THRESHOLD,
+                 adapt_threshold: Optional[float] = DEFAULT_ADAPT_THRESHOLD,
+                 duplicate_wait: float = DEFAULT_DUPLICATE_WAIT):
+        self.logger = logging.getLogger(__name__)
+        self.ai_service = ai_service
+        self.render_service = render_service
+        self.word_generator = word_generator
+        self.output_dir = Path(output_dir)
+        self.provider = provider
+        self.proposal_context = proposal_context
+        self.initiator = initiator
+        self.stage_workers = dict(DEFAULT_STAGE_WORKERS, **(stage_workers or {}))
+        self.queue_size = queue_size
+        self.cancel_callback = cancel_callback
+        self.on_item_done = on_item_done
+        self.checkpoints = checkpoints
+        self.reuse_threshold = reuse_threshold
+        self.adapt_threshold = adapt_threshold
+        self.duplicate_wait = duplicate_wait
+        self._log_context: Dict[str, Any] = {}
+
+    def _context(self, item: BulkItem):
+        # Worker-Threads erben den Kontext des Aufrufers nicht; run_id und job_id explizit setzen
+        return log_context(**dict(self._log_context, job_id=item.json_file.stem))
+
+    @staticmethod
+    def _publish(item: BulkItem, concept: Optional[Dict[str, Any]], error: Optional[BaseException] = None):
+        # Wartende Duplikate freigeben; None oder ein Fehler heißt: selbst generieren
+        future = item.concept_future
+        if future is None or future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(concept)
+
+    def _representative_concept(self, item: BulkItem) -> Optional[Dict[str, Any]]:
+        """Concept of the representative to reuse or adapt; None to generate the duplicate from scratch."""
+        representative = item.duplicate_of
+        future = representative.concept_future
+        deadline = time.monotonic() + self.duplicate_wait
+        while not future.done():
+            if self.cancel_callback and self.cancel_callback():
+                return None
+            # Nur auf einen Repräsentanten warten, der schon generiert wird: steht er noch in einer
+            # Queue hinter Duplikaten, die alle Generate-Worker belegen, käme er nie an die Reihe
+            if not future.running() and time.monotonic() >= deadline:
+                self.logger.info("%s has not reached the generate stage after %.0fs, generating %s from scratch",
+                                 representative.json_file.name, self.duplicate_wait, item.json_file.name)
+                return None
+            wait([future], timeout=_DUPLICATE_POLL_INTERVAL)
+        try:
+            return future.result()
+        except Exception as e:
+            self.logger.info("%s failed (%s), generating %s from scratch", representative.json_file.name, e, item.json_file.name)
+            return None
+
+    def _plan_duplicates(self, items: List[BulkItem]) -> List[BulkItem]:
+        """Mark near-duplicates and return the feed order: representatives and unique specs first."""
+        specs = []
+        for i, item in enumerate(items):
+            try:
+                with open(item.json_file, 'r', encoding='utf-8') as f:
+                    description = json.load(f).get('description', '').strip()
+            except Exception:
+                continue  # Fehler meldet die Lade-Stufe
+            if description:
+                specs.append((i, description))
+        threshold = min(self.adapt_threshold, self.reuse_threshold)
+        duplicates = cluster_near_duplicates(specs, threshold)
+        for i, (rep_index, similarity) in duplicates.items():
+            item, representative = items[i], items[rep_index]
+            item.duplicate_of, item.similarity = representative, similarity
+            if representative.concept_future is None:
+                representative.concept_future = Future()
+        if duplicates:
+            self.logger.info("Found %d near-duplicate specs in %d clusters", len(duplicates),
+                             len({rep for rep, _ in duplicates.values()}))
+        return ([item for item in items if item.duplicate_of is None]
+                + [item for item in items if item.duplicate_of is not None])
+
+    def _item_done(self, item: BulkItem):
+        self._publish(item, None)
+        if self.on_item_done:
+            self.on_item_done(item)
+
+    def load(self, item: BulkItem):
+        try:
+            self._load(item)
+        except Exception as e:
+            # Sofort freigeben, nicht erst am Ende der Pipeline: Duplikate warten sonst unnötig
+            self._publish(item, None, e)
+            raise
+        if item.skipped:
+            self._publish(item, None)
+
+    def _load(self, item: BulkItem):
+        raw = item.json_file.read_bytes()
+        data = json.loads(raw.decode('utf-8'))
+        item.project_name = data.get('name', '').strip()
+        item.upwork_link = data.get('link', '').strip()
+        item.description = data.get('description', '').strip()
+        if not item.project_name:
+            raise ValueError(f"No project name found in {item.json_file.name}")
+        if not item.description:
+            raise ValueError(f"No description found in {item.json_file.name}")
+        if self.checkpoints is not None:
+            item.spec_hash = spec_hash(raw)
+            finished = self.checkpoints.finished_document(item.spec_hash)
+            if finished:
+                item.docx_path, item.skipped = finished, True
+                with self._context(item):
+                    self.logger.info("Skipping %s, document already created: %s", item.json_file.name, finished)
+
+    def generate(self, item: BulkItem):
+        with self._context(item):
+            if item.concept_future is not None:
+                item.concept_future.set_running_or_notify_cancel()  # Duplikate warten ab jetzt auf das Ergebnis
+            try:
+                base = self._representative_concept(item) if item.duplicate_of is not None else None
+                if base is not None and item.similarity >= self.reuse_threshold:
+                    item.reuse_mode = "reuse"
+                    item.concept = copy.deepcopy(base)
+                    item.concept["metadata"]["provider_calls"] = 0
+                    self.logger.info("Reusing concept of %s (similarity %.2f)", item.duplicate_of.json_file.name, item.similarity)
+                else:
+                    if base is not None:
+                        item.reuse_mode = "adapt"
+                        self.logger.info("Adapting concept of %s (similarity %.2f)", item.duplicate_of.json_file.name, item.similarity)
+                    self.logger.info("Generating concept for: %s", item.project_name)
+                    item.concept = self.ai_service.generate_technical_concept_sections(
+                        item.description,
+                        provider=self.provider,
+                        proposal_context=self.proposal_context,
+                        cancel_callback=self.cancel_callback or (lambda: False),
+                        section_checkpoint=self.checkpoints.sections(item.spec_hash) if self.checkpoints is not None else None,
+                        adapt_from=base,
+                    )
+                    self.logger.info("Concept generated for: %s", item.project_name)
+                item.provider_calls = item.concept.get("metadata", {}).get("provider_calls", 0)
+            except Exception as e:
+                self._publish(item, None, e)
+                raise
+            self._publish(item, item.concept)
+
+    def render(self, item: BulkItem):
+        with self._context(item):
+            job = RenderJob(
+                item.concept,
+                output_dir=str(self.output_dir),
+                project_name=item.project_name,
+                initiator=self.initiator,
+                upwork_link=item.upwork_link,
+                description=item.description,
+                log_context=get_log_context(),
+            )
+            item.rendered = self.render_service.render_bytes(job)
+            item.concept = None  # wird nicht mehr gebraucht
+
+    def write(self, item: BulkItem):
+        with self._context(item):
+            item.docx_path = self.word_generator.write_document(item.rendered, output_dir=str(self.output_dir),
+                                                                skip_path_warnings=True)
+            item.rendered = None
+            self.logger.info("Word document created: %s", item.docx_path)
+            if self.checkpoints is not None:
+                try:
+                    self.checkpoints.mark_finished(item.spec_hash, item.json_file, item.docx_path)
+                except Exception as e:
+                    self.logger.warning("Could not save checkpoint for %s: %s", item.json_file.name, e)
+
+    def process(self, json_file: Path) -> BulkItem:
+        """One spec through all stages on the calling thread (watch mode: one spec per worker).
+
+        Errors end up in item.error/failed_stage like in run(); there is no
+        near-duplicate detection for single specs.
+        """
+        self._log_context = {name: value for name, value in get_log_context().items() if value is not None}
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        item = BulkItem(Path(json_file))
+        for name in STAGE_NAMES:
+            if item.error is not None or item.skipped:
+                break
+            if self.cancel_callback and self.cancel_callback():
+                item.error, item.failed_stage = "cancelled", name
+                break
+            try:
+                getattr(self, name)(item)
+            except Exception as e:
+                item.error, item.failed_stage = str(e) or type(e).__name__, name
+                self.logger.error("%s failed in stage %s: %s", item, name, item.error)
+        try:
+            self._item_done(item)
+        except Exception as e:
+            self.logger.warning("Progress callback failed: %s", e)
+        return item
+
+    def run(self, json_files: Iterable[Path]) -> BulkReport:
+        self._log_context = {name: value for name, value in get_log_context().items() if value is not None}
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        pipeline = Pipeline(
+            [(name, getattr(self, name), self.stage_workers[name]) for name in STAGE_NAMES],
+            queue_size=self.queue_size,
+            cancel_callback=self.cancel_callback,
+            on_item_done=self._item_done,
+        )
+        start = time.perf_counter()
+        items = [BulkItem(Path(json_file)) for json_file in json_files]
+        if self.adapt_threshold is not None:
+            items = self._plan_duplicates(items)
+        items = pipeline.run(items)
+        report = BulkReport(items, pipeline.stats, time.perf_counter() - start)
+        self.logger.info("Bulk pipeline finished in %.1fs: %d successful, %d skipped, %d failed",
+                         report.elapsed, len(report.successful), len(report.skipped), len(report.failed))
+        for line in report.stage_summary():
+            self.logger.info("Stage %s", line)
+        if report.duplicates:
+            self.logger.info("Near-duplicates: %d, about %d provider calls saved", len(report.duplicates), report.calls_saved)
+            for line in report.duplicate_summary():
+                self.logger.info("Duplicate %s", line)
+        return report
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from .sqlite_store import SqliteDatabase
+
+CHECKPOINT_FILENAME = ".zeta_checkpoints.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sections (
+    spec_hash TEXT NOT NULL,
+    section_key TEXT NOT NULL,
+    result TEXT NOT NULL,
+    accepted_at REAL NOT NULL,
+    PRIMARY KEY (spec_hash, section_key)
+);
+CREATE TABLE IF NOT EXISTS documents (
+    spec_hash TEXT PRIMARY KEY,
+    spec_file TEXT NOT NULL,
+    docx_path TEXT NOT NULL,
+    finished_at REAL NOT NULL
+);
+"""
+
+
+def spec_hash(data: bytes) -> str:
+    """Content hash of a spec file; renaming or moving the file keeps its checkpoints."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class CheckpointStore:
+    """SQLite checkpoints of a bulk run, keyed by spec content hash and section key.
+
+    Accepted sections are stored as soon as they pass review and finished
+    documents once they are written, so a re-run into the same target folder
+    skips finished specs and only generates the sections that are missing.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.logger = logging.getLogger(__name__)
+        self.path = Path(path)
+        self._db = SqliteDatabase(self.path, _SCHEMA)
+
+    @classmethod
+    def for_directory(cls, directory: Union[str, Path]) -> "CheckpointStore":
+        return cls(Path(directory) / CHECKPOINT_FILENAME)
+
+    def _connect(self) -> sqlite3.Connection:
+        return self._db.connect()
+
+    def sections(self, digest: str) -> "SectionCheckpoint":
+        return SectionCheckpoint(self, digest)
+
+    def load_sections(self, digest: str) -> Dict[str, Dict[str, Any]]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT section_key, result FROM sections WHERE spec_hash = ?", (digest,)).fetchall()
+        return {key: json.loads(result) for key, result in rows}
+
+    def save_section(self, digest: str, key: str, result: Dict[str, Any]):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("INSERT OR REPLACE INTO sections (spec_hash, section_key, result, accepted_at) VALUES (?, ?, ?, ?)",
+                         (digest, key, json.dumps(result, ensure_ascii=False), time.time()))
+
+    def finished_document(self, digest: str) -> Optional[str]:
+        """Path of the document already written for this spec, if it still exists."""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT docx_path FROM documents WHERE spec_hash = ?", (digest,)).fetchone()
+        if row and os.path.exists(row[0]):
+            return row[0]
+        return None
+
+    def mark_finished(self, digest: str, spec_file: Union[str, Path], docx_path: Union[str, Path]):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("INSERT OR REPLACE INTO documents (spec_hash, spec_file, docx_path, finished_at) VALUES (?, ?, ?, ?)",
+                         (digest, str(spec_file), str(docx_path), time.time()))
+            # Die Sektionen stecken jetzt im Dokument
+            conn.execute("DELETE FROM sections WHERE spec_hash = ?", (digest,))
+
+    def clear(self, digest: Optional[str] = None):
+        with closing(self._connect()) as conn, conn:
+            if digest is None:
+                conn.execute("DELETE FROM sections")
+                conn.execute("DELETE FROM documents")
+            else:
+                conn.execute("DELETE FROM sections WHERE spec_hash = ?", (digest,))
+                conn.execute("DELETE FROM documents WHERE spec_hash = ?", (digest,))
+
+
+class SectionCheckpoint:
+    """The section checkpoints of one spec, as passed to generate_technical_concept_sections."""
+
+    def __init__(self, store: CheckpointStore, digest: str):
+        self.store = store
+        self.digest = digest
+
+    def completed(self) -> Dict[str, Dict[str, Any]]:
+        return self.store.load_sections(self.digest)
+
+    def save(self, key: str, result: Dict[str, Any]):
+        self.store.save_section(self.digest, key, result)
@@ -0,0 +1,429 @@
+"""Headless command line: generate, bulk, render and watch without Tk or Windows-only modules.
+
+Progress is written to stdout as JSON lines ({"event": ...}); log output
+goes to stderr and the log files from logging_config.json.
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .logging_setup import LOGGING_CONFIG_PATH, configure_logging_from_file, new_run_id, set_log_context, shutdown_queue_logging
+
+CONFIG_PATH = "config.json"
+PROPOSAL_PATH = "proposal.txt"
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2  # wie argparse
+EXIT_PARTIAL = 3  # Bulk: ein Teil der Spezifikationen ist fehlgeschlagen
+EXIT_INTERRUPTED = 130
+
+COMMANDS = ("generate", "bulk", "render", "watch")
+
+
+class CliError(Exception):
+    """Invalid input or configuration; reported as an error event with EXIT_USAGE."""
+
+
+def emit(event: str, **fields):
+    """One machine-readable progress line on stdout."""
+    sys.stdout.write(json.dumps(dict(event=event, ts=round(time.time(), 3), **fields), ensure_ascii=False, default=str) + "\n")
+    sys.stdout.flush()
+
+
+def load_config(path: str) -> Dict[str, Any]:
+    """The GUI's config.json; a missing file means defaults everywhere."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        raise CliError(f"Config {path} not readable: {e}")
+
+
+def _setup_logging():
+    logs_dir = Path("output") / "logs"
+    logs_dir.mkdir(parents=True, exist_ok=True)
+    # Konsolen-Handler aus logging_config.json nach stderr umbiegen, stdout gehört den Events
+    with contextlib.redirect_stdout(sys.stderr):
+        logfile = configure_logging_from_file(
+            LOGGING_CONFIG_PATH, fallback_logfile=str(logs_dir / f"zeta_log_{time.strftime('%Y%m%d_%H%M%S')}.log"))
+    run_id = new_run_id()
+    set_log_context(run_id=run_id, job_id=None, section=None, attempt=None)
+    return run_id, logfile
+
+
+def _provider(cfg: Dict[str, Any], args) -> str:
+    provider = args.provider or cfg.get("ai_provider", "openai")
+    # Wie die GUI: der AIServiceManager liest Schlüssel und Modell aus der Umgebung
+    if provider == "openai":
+        if cfg.get("openai_api_key"):
+            os.environ["OPENAI_API_KEY"] = cfg["openai_api_key"]
+        os.environ["OPENAI_MODEL"] = cfg.get("openai_model", "gpt-4o")
+    elif provider == "ollama":
+        os.environ["OLLAMA_URL"] = cfg.get("ollama_url", "http://localhost:11434")
+        os.environ["OLLAMA_MODEL"] = cfg.get("ollama_model", "llama3")
+    else:
+        raise CliError(f"Unsupported AI provider: {provider}")
+    return provider
+
+
+def _make_ai_service(cfg: Dict[str, Any]):
+    from .ai_service import AIServiceManager
+
+    ai_service = AIServiceManager()
+    ai_service.alignment_threshold = float(cfg.get("alignment_threshold", 0.6))
+    ai_service.semantic_alignment = bool(cfg.get("semantic_alignment", False))
+    ai_service.ai_review_budget = int(cfg.get("ai_review_budget", 3))
+    ai_service.ai_review_batched = bool(cfg.get("ai_review_batched", True))
+    return ai_service
+
+
+def _template_path(cfg: Dict[str, Any], args) -> Optional[str]:
+    template = args.template or cfg.get("selected_template")
+    if args.template and not os.path.exists(args.template):
+        raise CliError(f"Template not found: {args.template}")
+    return template
+
+
+def _make_generator(cfg: Dict[str, Any], args):
+    from .word_generator import WordDocumentGenerator
+
+    generator = WordDocumentGenerator(_output_dir(cfg, args))
+    template = _template_path(cfg, args)
+    if template:
+        generator.set_template(template)
+    return generator
+
+
+def _output_dir(cfg: Dict[str, Any], args) -> str:
+    return args.output or cfg.get("output_directory", "output/docx")
+
+
+def _load_proposal_context() -> str:
+    if os.path.exists(PROPOSAL_PATH):
+        with open(PROPOSAL_PATH, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    return ""
+
+
+def _read_text(value: Optional[str], path: Optional[str]) -> str:
+    if path == "-":
+        return sys.stdin.read().strip()
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    return (value or "").strip()
+
+
+def _open_pdf_converter(cfg: Dict[str, Any], args):
+    """The PDF converter if --pdf or pdf_export is set and LibreOffice is installed, else None."""
+    if not (args.pdf or cfg.get("pdf_export", False)):
+        return None
+    from .pdf_export import DEFAULT_PDF_WORKERS, NullPdfConverter, create_default_converter
+
+    converter = create_default_converter(max(1, int(cfg.get("pdf_workers", DEFAULT_PDF_WORKERS))))
+    if isinstance(converter, NullPdfConverter):
+        emit("warning", message="PDF export skipped (LibreOffice not installed)")
+        converter.close()
+        return None
+    return converter
+
+
+def _convert_pdf(converter, docx_path: str):
+    try:
+        emit("pdf", docx=docx_path, pdf=converter.convert(docx_path, Path(docx_path).with_suffix(".pdf")))
+    except Exception as e:
+        emit("pdf", docx=docx_path, pdf=None, error=str(e))
+
+
+def _export_pdf(cfg: Dict[str, Any], args, docx_paths: List[str], folder: Optional[Path] = None):
+    converter = _open_pdf_converter(cfg, args)
+    if converter is None:
+        return
+    from .pdf_export import convert_folder
+
+    with converter:
+        if folder is not None:
+            for result in convert_folder(folder, converter, max_workers=converter.workers):
+                emit("pdf", docx=result.docx_path, pdf=result.pdf_path, skipped=result.skipped, error=result.error)
+            return
+        for docx_path in docx_paths:
+            _convert_pdf(converter, docx_path)
+
+
+def _write_document(generator, concept, project: Dict[str, str], cfg, args) -> str:
+    docx_path = generator.create_document(
+        concept,
+        project_name=project.get("name"),
+        initiator=args.initiator if args.initiator is not None else cfg.get("initiator", ""),
+        upwork_link=project.get("link"),
+        description=project.get("description"),
+        skip_path_warnings=True,  # keine Dialoge; die Warnung geht ins Log
+        output_dir=_output_dir(cfg, args),
+    )
+    emit("document", path=docx_path, project=project.get("name"))
+    return docx_path
+
+
+def cmd_generate(args, cfg) -> int:
+    description = _read_text(args.description, args.description_file)
+    if not description:
+        raise CliError("A project description is required (--description or --description-file)")
+    project = {"name": args.name, "link": args.link or "", "description": description}
+    provider = _provider(cfg, args)
+    ai_service = _make_ai_service(cfg)
+    generator = _make_generator(cfg, args)
+
+    emit("generating", project=args.name, provider=provider)
+    concept = ai_service.generate_technical_concept_sections(
+        description, provider=provider, proposal_context=_load_proposal_context())
+    emit("concept", project=args.name, sections=len(concept.get("sections", {})),
+         provider_calls=concept.get("metadata", {}).get("provider_calls"))
+    if args.save_concept:
+        # Wieder einlesbar mit "render"
+        with open(args.save_concept, "w", encoding="utf-8") as f:
+            json.dump(dict(concept, project=project), f, indent=2, ensure_ascii=False)
+    docx_path = _write_document(generator, concept, project, cfg, args)
+    _export_pdf(cfg, args, [docx_path])
+    return EXIT_OK
+
+
+def cmd_render(args, cfg) -> int:
+    generator = _make_generator(cfg, args)
+    failed = 0
+    pdf_converter = _open_pdf_converter(cfg, args)  # ein LibreOffice-Pool für alle Dateien
+    with pdf_converter or contextlib.nullcontext():
+        for concept_file in args.concepts:
+            try:
+                with open(concept_file, "r", encoding="utf-8") as f:
+                    concept = json.load(f)
+                if not isinstance(concept.get("sections"), dict):
+                    raise CliError(f"{concept_file} has no 'sections' object")
+                project = dict(concept.get("project") or {})
+                if args.name:
+                    project["name"] = args.name
+                project.setdefault("name", Path(concept_file).stem)
+                docx_path = _write_document(generator, concept, project, cfg, args)
+                if pdf_converter is not None:
+                    _convert_pdf(pdf_converter, docx_path)
+            except Exception as e:
+                failed += 1
+                emit("error", file=concept_file, message=str(e))
+    if failed == len(args.concepts):
+        return EXIT_FAILED
+    return EXIT_PARTIAL if failed else EXIT_OK
+
+
+def _parse_stage_workers(values: List[str]) -> Dict[str, int]:
+    workers = {}
+    for value in values or ():
+        name, _, count = value.partition("=")
+        if not count.isdigit():
+            raise CliError(f"Invalid --workers value {value!r}, expected STAGE=N")
+        workers[name] = int(count)
+    return workers
+
+
+def cmd_bulk(args, cfg) -> int:
+    from .bulk_pipeline import DEFAULT_QUEUE_SIZE, DEFAULT_STAGE_WORKERS, STAGE_NAMES, BulkGenerator
+    from .checkpoint_store import CheckpointStore
+    from .render_service import RenderService
+    from .spec_similarity import DEFAULT_ADAPT_THRESHOLD, DEFAULT_REUSE_THRESHOLD
+
+    spec_dir = Path(args.spec_dir)
+    json_files = sorted(spec_dir.glob("*.json")) if spec_dir.is_dir() else []
+    if not json_files:
+        raise CliError(f"No JSON specifications found in {spec_dir}")
+    requested = _parse_stage_workers(args.workers)
+    unknown = set(requested) - set(STAGE_NAMES)
+    if unknown:
+        raise CliError(f"Unknown pipeline stage(s): {', '.join(sorted(unknown))}")
+    stage_workers = dict(DEFAULT_STAGE_WORKERS)
+    stage_workers.update({k: int(v) for k, v in cfg.get("bulk_stage_workers", {}).items() if k in DEFAULT_STAGE_WORKERS})
+    stage_workers.update(requested)
+    provider = _provider(cfg, args)
+    ai_service = _make_ai_service(cfg)
+    generator = _make_generator(cfg, args)
+    target = Path(_output_dir(cfg, args))
+    adapt_threshold = cfg.get("duplicate_adapt_threshold", DEFAULT_ADAPT_THRESHOLD)
+
+    def on_item_done(item):
+        status = "skipped" if item.skipped else ("failed" if item.error else "ok")
+        emit("item", file=item.json_file.name, status=status, path=item.docx_path, error=item.error,
+             stage=item.failed_stage, duplicate_of=item.duplicate_of.json_file.name if item.duplicate_of else None,
+             reuse_mode=item.reuse_mode)
+
+    emit("bulk_started", specs=len(json_files), output=target, provider=provider, stage_workers=stage_workers)
+    with RenderService(template_path=generator.template_path, output_directory=str(target),
+                       workers=stage_workers["render"]).start() as render_service:
+        bulk = BulkGenerator(
+            ai_service,
+            render_service,
+            generator,
+            target,
+            provider=provider,
+            proposal_context=_load_proposal_context(),
+            initiator=args.initiator if args.initiator is not None else cfg.get("initiator", ""),
+            stage_workers=stage_workers,
+            queue_size=max(1, int(cfg.get("bulk_queue_size", DEFAULT_QUEUE_SIZE))),
+            on_item_done=on_item_done,
+            checkpoints=None if args.no_resume or not cfg.get("bulk_resume", True) else CheckpointStore.for_directory(target),
+            reuse_threshold=float(cfg.get("duplicate_reuse_threshold", DEFAULT_REUSE_THRESHOLD)),
+            adapt_threshold=None if args.no_duplicates or adapt_threshold is None else float(adapt_threshold),
+        )
+        report = bulk.run(json_files)
+    for name in STAGE_NAMES:
+        stats = report.stages.get(name)
+        if stats is not None:
+            emit("stage", name=name, workers=stats.workers, processed=stats.processed, failed=stats.failed,
+                 seconds=round(stats.wall, 3), throughput=round(stats.throughput, 3), utilization=round(stats.utilization, 3))
+    _export_pdf(cfg, args, [], folder=target)
+    emit("bulk_finished", successful=len(report.successful), skipped=len(report.skipped), failed=len(report.failed),
+         duplicates=len(report.duplicates), calls_saved=report.calls_saved, seconds=round(report.elapsed, 3))
+    if report.failed and not (report.successful or report.skipped):
+        return EXIT_FAILED
+    return EXIT_PARTIAL if report.failed else EXIT_OK
+
+
+def cmd_watch(args, cfg) -> int:
+    from .bulk_pipeline import DEFAULT_STAGE_WORKERS, BulkGenerator
+    from .checkpoint_store import CheckpointStore
+    from .render_service import RenderService
+    from .spec_watcher import DEFAULT_DEBOUNCE, DEFAULT_WATCH_WORKERS, SpecWatcher, WatchQueue
+
+    folder = Path(args.folder or cfg.get("json_output_directory", "output/json"))
+    workers = args.workers or max(1, int(cfg.get("watch_workers", DEFAULT_WATCH_WORKERS)))
+    debounce = args.debounce if args.debounce is not None else float(cfg.get("watch_debounce", DEFAULT_DEBOUNCE))
+    provider = _provider(cfg, args)
+    ai_service = _make_ai_service(cfg)
+    generator = _make_generator(cfg, args)
+    target = Path(_output_dir(cfg, args))
+    queue = WatchQueue.for_directory(target)
+    if args.retry_failed:
+        emit("requeued", jobs=queue.retry_failed())
+
+    stop = threading.Event()
+    # Dienste und Task-Scheduler beenden mit SIGTERM; wie Strg+C sauber herunterfahren
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    pdf_converter = _open_pdf_converter(cfg, args)  # ein LibreOffice-Pool für die ganze Laufzeit
+    render_workers = min(workers, int(cfg.get("bulk_stage_workers", {}).get("render", DEFAULT_STAGE_WORKERS["render"])))
+    with RenderService(template_path=generator.template_path, output_directory=str(target),
+                       workers=max(1, render_workers)).start() as render_service, \
+            pdf_converter or contextlib.nullcontext():
+        def handler(json_file: Path) -> str:
+            item = bulk.process(json_file)
+            if item.error is not None:
+                raise RuntimeError(f"{item.failed_stage}: {item.error}")
+            if pdf_converter is not None and not item.skipped:
+                _convert_pdf(pdf_converter, item.docx_path)
+            return item.docx_path
+
+        def on_job_done(job):
+            emit("item", file=os.path.basename(job.path), status="failed" if job.error else "ok", path=job.docx_path,
+                 error=job.error, attempts=job.attempts, latency=round(job.latency, 3))
+
+        watcher = SpecWatcher(folder, handler, queue, workers=workers, debounce=debounce,
+                              poll_interval=args.poll_interval, use_watchdog=not args.poll,
+                              on_job_queued=lambda path: emit("queued", file=os.path.basename(path)),
+                              on_job_done=on_job_done)
+        # Abbruch über den Watcher selbst: nur dann bleibt ein abgebrochener Job zum Wiedereinreihen stehen
+        bulk = BulkGenerator(
+            ai_service,
+            render_service,
+            generator,
+            target,
+            provider=provider,
+            proposal_context=_load_proposal_context(),
+            initiator=args.initiator if args.initiator is not None else cfg.get("initiator", ""),
+            cancel_callback=watcher.stopped,
+            checkpoints=None if args.no_resume or not cfg.get("bulk_resume", True) else CheckpointStore.for_directory(target),
+        )
+        with watcher:
+            emit("watching", folder=watcher.folder, output=target, observer=watcher.observer_kind,
+                 workers=workers, debounce=debounce, provider=provider)
+            try:
+                while not stop.wait(1.0):
+                    pass
+            except KeyboardInterrupt:
+                pass
+            emit("stopping")
+    emit("watch_stopped", **queue.counts())
+    return EXIT_OK
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="zeta_proposer", description="Zeta Proposer without GUI. Progress is printed as JSON lines.")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--config", default=CONFIG_PATH, help="config.json of the GUI (default: %(default)s)")
+    common.add_argument("--output", help="output directory (default: output_directory from the config)")
+    common.add_argument("--template", help="Word template (default: selected_template from the config)")
+    common.add_argument("--initiator", help="initiator prefix (default: initiator from the config)")
+    common.add_argument("--pdf", action="store_true", help="also export PDFs (needs LibreOffice)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    generate = subparsers.add_parser("generate", parents=[common], help="generate one concept and document")
+    generate.add_argument("--name", required=True, help="project name")
+    generate.add_argument("--description", help="project description")
+    generate.add_argument("--description-file", help="file with the project description ('-' = stdin)")
+    generate.add_argument("--link", help="Upwork link")
+    generate.add_argument("--provider", choices=("openai", "ollama"), help="AI provider (default: ai_provider from the config)")
+    generate.add_argument("--save-concept", help="also write the generated concept as JSON (for 'render')")
+    generate.set_defaults(func=cmd_generate)
+
+    bulk = subparsers.add_parser("bulk", parents=[common], help="generate documents for all JSON specs in a folder")
+    bulk.add_argument("spec_dir", help="folder with JSON specifications (name, link, description)")
+    bulk.add_argument("--provider", choices=("openai", "ollama"), help="AI provider (default: ai_provider from the config)")
+    bulk.add_argument("--workers", action="append", metavar="STAGE=N", help="threads per stage (load, generate, render, write); repeatable")
+    bulk.add_argument("--no-resume", action="store_true", help="ignore checkpoints of earlier runs")
+    bulk.add_argument("--no-duplicates", action="store_true", help="no near-duplicate detection")
+    bulk.set_defaults(func=cmd_bulk)
+
+    render = subparsers.add_parser("render", parents=[common], help="render documents from saved concept JSON files, without AI")
+    render.add_argument("concepts", nargs="+", help="concept JSON files ({'sections': ...}, e.g. from generate --save-concept)")
+    render.add_argument("--name", help="project name (default: from the file or its name)")
+    render.set_defaults(func=cmd_render)
+
+    watch = subparsers.add_parser("watch", parents=[common], help="watch a folder and generate documents for new or changed JSON specs until stopped")
+    watch.add_argument("folder", nargs="?", help="folder with JSON specifications (default: json_output_directory from the config)")
+    watch.add_argument("--provider", choices=("openai", "ollama"), help="AI provider (default: ai_provider from the config)")
+    watch.add_argument("--workers", type=int, help="specs generated at the same time (default: watch_workers from the config)")
+    watch.add_argument("--debounce", type=float, help="seconds a file must stay unchanged before it is queued (default: watch_debounce from the config)")
+    watch.add_argument("--poll", action="store_true", help="poll the folder instead of using watchdog")
+    watch.add_argument("--poll-interval", type=float, default=1.0, help="seconds between polls and queue checks (default: %(default)s)")
+    watch.add_argument("--retry-failed", action="store_true", help="queue specs that failed in an earlier run again")
+    watch.add_argument("--no-resume", action="store_true", help="ignore checkpoints of earlier runs")
+    watch.set_defaults(func=cmd_watch)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logger = logging.getLogger(__name__)
+    try:
+        cfg = load_config(args.config)
+        run_id, logfile = _setup_logging()
+        emit("started", command=args.command, run_id=run_id, logfile=logfile)
+        code = args.func(args, cfg)
+    except CliError as e:
+        emit("error", message=str(e))
+        code = EXIT_USAGE
+    except KeyboardInterrupt:
+        emit("error", message="interrupted")
+        code = EXIT_INTERRUPTED
+    except Exception as e:
+        logger.error("%s failed: %s", args.command, e, exc_info=True)
+        emit("error", message=str(e))
+        code = EXIT_FAILED
+    emit("finished", command=args.command, exit_code=code)
+    shutdown_queue_logging()
+    return code
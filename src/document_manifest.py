@@ -0,0 +1,175 @@
+import logging
+import os
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from .output_store import split_version
+from .sqlite_store import SqliteDatabase
+
+MANIFEST_FILENAME = ".zeta_manifest.sqlite3"
+# Spalten, nach denen die Übersicht sortieren darf (direkt ins ORDER BY übernommen)
+SORT_COLUMNS = ("created", "project", "initiator", "version", "size", "path")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    path TEXT PRIMARY KEY,
+    project TEXT NOT NULL DEFAULT '',
+    initiator TEXT NOT NULL DEFAULT '',
+    created REAL NOT NULL,
+    version INTEGER NOT NULL DEFAULT 1,
+    size INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS documents_created ON documents (created);
+CREATE INDEX IF NOT EXISTS documents_project ON documents (project);
+"""
+
+
+@dataclass
+class ManifestEntry:
+    path: str  # relative to the manifest root (posix), absolute if outside of it
+    project: str
+    initiator: str
+    created: float  # mtime of the file
+    version: int
+    size: int
+
+
+class DocumentManifest:
+    """SQLite index of the documents below one output directory.
+
+    create_document records every write, so the overview window only runs
+    an indexed query instead of globbing and stat-ing every file. rescan()
+    walks the tree and reconciles files that were added, changed or deleted
+    by hand. Safe to use from several threads and render processes (WAL).
+    """
+
+    def __init__(self, root: Union[str, Path]):
+        self.logger = logging.getLogger(__name__)
+        self.root = Path(root)
+        self.db_path = self.root / MANIFEST_FILENAME
+        self._db = SqliteDatabase(self.db_path, _SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return self._db.connect()
+
+    def exists(self) -> bool:
+        return self._db.exists()
+
+    def _key(self, path: Path) -> str:
+        try:
+            return path.resolve().relative_to(self.root.resolve()).as_posix()
+        except ValueError:
+            return str(path.resolve())
+
+    def resolve(self, entry: ManifestEntry) -> Path:
+        return (self.root / entry.path).resolve()
+
+    def record(self, path: Union[str, Path], project: Optional[str] = None, initiator: Optional[str] = None,
+               version: Optional[int] = None):
+        """Insert or update one document; size and timestamp come from the file itself."""
+        path = Path(path)
+        st = path.stat()
+        if version is None:
+            version = split_version(path.parent.name)[1]
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO documents (path, project, initiator, created, version, size) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self._key(path), project or split_version(path.parent.name)[0], initiator or "",
+                 st.st_mtime, version, st.st_size),
+            )
+
+    def remove(self, path: Union[str, Path]):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM documents WHERE path = ?", (self._key(Path(path)),))
+
+    @staticmethod
+    def _where(filter_text: str) -> Tuple[str, tuple]:
+        if not filter_text:
+            return "", ()
+        # % und _ im Suchtext wörtlich nehmen ("_" steckt in vielen Projekt- und Dateinamen)
+        escaped = filter_text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        pattern = f"%{escaped}%"
+        return (" WHERE project LIKE ? ESCAPE '\\' OR initiator LIKE ? ESCAPE '\\' OR path LIKE ? ESCAPE '\\'",
+                (pattern, pattern, pattern))
+
+    def count(self, filter_text: str = "") -> int:
+        where, args = self._where(filter_text)
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM documents" + where, args).fetchone()[0]
+
+    def query(self, filter_text: str = "", sort: str = "created", descending: bool = True,
+              limit: int = 100, offset: int = 0) -> List[ManifestEntry]:
+        """One page of entries, filtered by a substring of project, initiator or path."""
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Unknown sort column: {sort}")
+        where, args = self._where(filter_text)
+        order = "DESC" if descending else "ASC"
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT path, project, initiator, created, version, size FROM documents{where} "
+                f"ORDER BY {sort} {order}, path LIMIT ? OFFSET ?",
+                args + (limit, offset),
+            ).fetchall()
+        return [ManifestEntry(*row) for row in rows]
+
+    def _walk(self) -> Dict[str, os.stat_result]:
+        found: Dict[str, os.stat_result] = {}
+        root = str(self.root)
+        stack = [root]
+        while stack:
+            folder = stack.pop()
+            try:
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        if entry.name.startswith((".", "~$")):
+                            continue
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif entry.name.lower().endswith(".docx"):
+                                found[Path(os.path.relpath(entry.path, root)).as_posix()] = entry.stat()
+                        except OSError as e:
+                            # Während des Scans gelöscht oder gesperrt: nur diesen Eintrag auslassen
+                            self.logger.warning("Could not scan %s: %s", entry.path, e)
+            except OSError as e:
+                self.logger.warning("Could not scan %s: %s", folder, e)
+        return found
+
+    def rescan(self) -> Tuple[int, int, int]:
+        """Reconcile the manifest with the files on disk; returns (added, updated, removed)."""
+        on_disk = self._walk()
+        with closing(self._connect()) as conn:
+            known = {path: (created, size) for path, created, size in
+                     conn.execute("SELECT path, created, size FROM documents")}
+            added = updated = 0
+            with conn:
+                for key, st in on_disk.items():
+                    previous = known.pop(key, None)
+                    if previous == (st.st_mtime, st.st_size):
+                        continue
+                    if previous is None:
+                        added += 1
+                        folder = Path(key).parent.name
+                        base, version = split_version(folder)
+                        # record() kann den Pfad seit dem SELECT eingetragen haben; Projekt/Initiator behalten
+                        conn.execute(
+                            "INSERT INTO documents (path, project, initiator, created, version, size) "
+                            "VALUES (?, ?, '', ?, ?, ?) "
+                            "ON CONFLICT(path) DO UPDATE SET created = excluded.created, size = excluded.size",
+                            (key, base, st.st_mtime, version, st.st_size),
+                        )
+                    else:
+                        updated += 1
+                        conn.execute("UPDATE documents SET created = ?, size = ? WHERE path = ?",
+                                     (st.st_mtime, st.st_size, key))
+                # Nur wirklich fehlende Dateien entfernen: record() kann nach dem Scan neue eingetragen haben.
+                # Absolute Pfade (Fallback-Ordner außerhalb des Roots) bleiben bei root / key unverändert
+                removed = [key for key in known if not (self.root / key).exists()]
+                conn.executemany("DELETE FROM documents WHERE path = ?", [(key,) for key in removed])
+        self.logger.info("Manifest %s rescanned: %d added, %d updated, %d removed",
+                         self.root, added, updated, len(removed))
+        return added, updated, len(removed)
@@ -0,0 +1,111 @@
+import io
+import logging
+import struct
+import zipfile
+from typing import BinaryIO, Dict, Iterable, List, Tuple, Union
+
+from lxml import etree
+
+from .placeholder_engine import PlaceholderEngine
+
+# Local file header (zipfile.structFileHeader); name and extra lengths are the last two fields
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+_FLAG_ENCRYPTED = 0x01
+_FLAG_DATA_DESCRIPTOR = 0x08
+
+# Same settings python-docx parses with
+_XML_PARSER = etree.XMLParser(remove_blank_text=True, resolve_entities=False)
+
+
+class UnsupportedTemplate(Exception):
+    """The template cannot be rendered on the zip fast path; use python-docx instead."""
+
+
+class ZipTemplate:
+    """Renders a .docx by patching only the XML parts that hold placeholders.
+
+    The template bytes stay in memory. Parts listed in patch_parts (document,
+    headers, footers with placeholders) are parsed, substituted and
+    recompressed per document; every other entry (media, fonts, styles, ...)
+    is copied as its original compressed bytes, without inflating or
+    recompressing it.
+    """
+
+    def __init__(self, data: bytes, patch_parts: Iterable[str]):
+        self.logger = logging.getLogger(__name__)
+        self.data = data
+        view = memoryview(data)
+        wanted = {name.lstrip('/') for name in patch_parts}
+        self.entries: List[Tuple[zipfile.ZipInfo, memoryview]] = []
+        self.xml_parts: Dict[str, bytes] = {}
+        try:
+            with zipfile.ZipFile(io.BytesIO(data)) as zf:
+                for info in zf.infolist():
+                    if info.flag_bits & _FLAG_ENCRYPTED:
+                        raise UnsupportedTemplate(f"encrypted entry {info.filename}")
+                    if info.filename in wanted:
+                        self.xml_parts[info.filename] = zf.read(info)
+                    self.entries.append((info, self._raw_entry(view, info)))
+        except (zipfile.BadZipFile, struct.error) as e:
+            raise UnsupportedTemplate(str(e)) from e
+        missing = wanted - set(self.xml_parts)
+        if missing:
+            raise UnsupportedTemplate(f"parts not found in zip: {', '.join(sorted(missing))}")
+
+    @staticmethod
+    def _raw_entry(view: memoryview, info: zipfile.ZipInfo) -> memoryview:
+        header = _LOCAL_HEADER.unpack_from(view, info.header_offset)
+        if header[0] != zipfile.stringFileHeader:
+            raise UnsupportedTemplate(f"bad local header for {info.filename}")
+        start = info.header_offset + _LOCAL_HEADER.size + header[-2] + header[-1]
+        return view[start:start + info.compress_size]
+
+    def render_part(self, name: str, engine: PlaceholderEngine) -> bytes:
+        root = etree.fromstring(self.xml_parts[name], _XML_PARSER)
+        engine.substitute_tree(root)
+        return etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+    def render(self, values: Dict[str, str], target: Union[str, BinaryIO]):
+        """Write the filled document to a path or binary file object."""
+        engine = PlaceholderEngine(values)
+        # Patch first, so a broken part fails before anything is written
+        patched = {name: self.render_part(name, engine) for name in self.xml_parts}
+        with zipfile.ZipFile(target, 'w') as zout:
+            for info, raw in self.entries:
+                if info.filename in patched:
+                    zinfo = zipfile.ZipInfo(info.filename, info.date_time)
+                    zinfo.external_attr = info.external_attr
+                    zout.writestr(zinfo, patched[info.filename], compress_type=zipfile.ZIP_DEFLATED)
+                else:
+                    _write_raw(zout, info, raw)
+
+    def render_bytes(self, values: Dict[str, str]) -> bytes:
+        buffer = io.BytesIO()
+        self.render(values, buffer)
+        return buffer.getvalue()
+
+
+def _write_raw(zout: zipfile.ZipFile, info: zipfile.ZipInfo, raw: memoryview):
+    """Append an entry with its already-compressed bytes.
+
+    zipfile has no public API for this, so it does what ZipFile.writestr does
+    internally: local header + data at start_dir, then register the entry for
+    the central directory written on close.
+    """
+    zinfo = zipfile.ZipInfo(info.filename, info.date_time)
+    zinfo.compress_type = info.compress_type
+    zinfo.external_attr = info.external_attr
+    zinfo.create_system = info.create_system
+    # Sizes and CRC are known, so they go into the local header instead of a data descriptor
+    zinfo.flag_bits = info.flag_bits & ~_FLAG_DATA_DESCRIPTOR
+    zinfo.CRC = info.CRC
+    zinfo.compress_size = info.compress_size
+    zinfo.file_size = info.file_size
+    zout.fp.seek(zout.start_dir)
+    zinfo.header_offset = zout.fp.tell()
+    zout.fp.write(zinfo.FileHeader())
+    zout.fp.write(raw)
+    zout.start_dir = zout.fp.tell()
+    zout.filelist.append(zinfo)
+    zout.NameToInfo[zinfo.filename] = zinfo
+    zout._didModify = True
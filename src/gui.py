@@ -1,23 +1,35 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, filedialog
 import threading
+import queue
 from pathlib import Path
 import os
 from dotenv import load_dotenv
-# from docx2pdf import convert  # Optional for PDF conversion
 # from pdf2image import convert_from_path  # Optional, wird nicht benötigt
-from PIL import Image, ImageTk
 import time
 import logging
 from datetime import datetime
-import pythoncom
 import glob
-import docx
 import json
 import re
 
 from .ai_service import AIServiceManager
 from .word_generator import WordDocumentGenerator
+from .logging_setup import LOGGING_CONFIG_PATH, configure_logging_from_file, iter_log_records, new_run_id, set_log_context
+from .bulk_pipeline import DEFAULT_QUEUE_SIZE, DEFAULT_STAGE_WORKERS, BulkGenerator
+from .checkpoint_store import CheckpointStore
+from .document_manifest import DocumentManifest
+from .spec_similarity import DEFAULT_ADAPT_THRESHOLD, DEFAULT_REUSE_THRESHOLD
+from .pdf_export import DEFAULT_PDF_WORKERS, NullPdfConverter, convert_folder, create_default_converter
+from .render_service import RenderService
+from .spec_watcher import DEFAULT_DEBOUNCE, DEFAULT_WATCH_WORKERS
+
+
+# Intervall, in dem die Tk-Mainloop die Log-Queue in das Log-Fenster überträgt
+LOG_DRAIN_INTERVAL_MS = 100
+DEFAULT_LOG_MAX_LINES = 2000
+# Zeilen pro Seite in der Dokumentenübersicht
+OVERVIEW_PAGE_SIZE = 100
 
 
 class GuiLogHandler(logging.Handler):
@@ -26,8 +38,12 @@ class GuiLogHandler(logging.Handler):
         self.gui_log_func = gui_log_func
 
     def emit(self, record):
-        msg = self.format(record)
-        self.gui_log_func(msg)
+        try:
+            msg = self.format(record)
+            # gui_log_func darf von jedem Thread aufgerufen werden (legt nur in die Queue)
+            self.gui_log_func(msg)
+        except Exception:
+            self.handleError(record)
 
 class ZetaProposerGUI:
     CONFIG_PATH = "config.json"
@@ -41,6 +57,8 @@ class ZetaProposerGUI:
         
         # Initialize default values first
         self.log_widget = None
+        self.log_queue = queue.SimpleQueue()  # Log-Zeilen aus Worker-/Listener-Threads
+        self.log_max_lines = DEFAULT_LOG_MAX_LINES  # Ringpuffer-Größe des Log-Fensters
         self.logger = None
         self.logfile_path = None
         self.selected_template = None
@@ -50,9 +68,22 @@ class ZetaProposerGUI:
         self.ollama_url = "http://localhost:11434"
         self.ollama_model = "llama3"
         self.alignment_threshold = 0.6  # Defaultwert
+        self.semantic_alignment = False  # Lokaler TF-IDF/BM25-Scorer (optional, benötigt NumPy)
+        self.ai_review_budget = 3  # Max. KI-Reviews pro Dokument für Grenzfälle (0 = aus)
+        self.ai_review_batched = True  # Grenzfälle gesammelt in einem Request prüfen
         self.output_directory = "output/docx"  # Defaultwert
         self.json_output_directory = "output/json"  # Defaultwert for JSON files
         self.initiator = ""  # Defaultwert
+        self.pdf_export = False  # PDF zusätzlich zum docx erzeugen (benötigt LibreOffice)
+        self.pdf_workers = DEFAULT_PDF_WORKERS  # Parallele Office-Prozesse für den PDF-Export
+        self.pdf_converter = None  # Wird beim ersten Export gestartet
+        self.bulk_stage_workers = {}  # Threads pro Bulk-Stufe (load/generate/render/write), fehlende = Standard
+        self.bulk_queue_size = DEFAULT_QUEUE_SIZE  # Max. wartende Elemente zwischen zwei Bulk-Stufen
+        self.bulk_resume = True  # Fertige Spezifikationen/Sektionen beim erneuten Lauf überspringen
+        self.duplicate_reuse_threshold = DEFAULT_REUSE_THRESHOLD  # Ähnlichkeit, ab der ein Konzept unverändert übernommen wird
+        self.duplicate_adapt_threshold = DEFAULT_ADAPT_THRESHOLD  # Ähnlichkeit, ab der ein Konzept angepasst wird (None = aus)
+        self.watch_workers = DEFAULT_WATCH_WORKERS  # Gleichzeitig generierte Spezifikationen im Watch-Modus (main.py watch)
+        self.watch_debounce = DEFAULT_DEBOUNCE  # Sekunden ohne Änderung, bevor eine Datei eingereiht wird
         self.cancel_requested = False  # Für Abbrechen-Button
         
         # Load configuration (this will override defaults)
@@ -67,21 +98,21 @@ class ZetaProposerGUI:
             self.word_generator.set_template(self.selected_template)
         
         self.setup_ui()
+        self.root.after(LOG_DRAIN_INTERVAL_MS, self._drain_log_queue)
         # Beim Schließen speichern
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         
     def on_closing(self):
         # Speichere aktuelle Einstellungen (inkl. Threshold)
         self.save_config()
+        if self.pdf_converter is not None:
+            self.pdf_converter.close()
         self.root.destroy()
         
     def show_documents_overview(self):
-        """Zeigt eine Übersicht aller erstellten docx-Dokumente (rekursiv in Unterordnern) und ermöglicht das Öffnen per Klick."""
-        import glob
+        """Zeigt eine Übersicht aller erstellten docx-Dokumente (aus dem Manifest, seitenweise) und ermöglicht das Öffnen per Doppelklick."""
         import platform
         import subprocess
-        from tkinter import Toplevel, Listbox, Button, END, Scrollbar, RIGHT, Y, LEFT, BOTH, Label
-        from pathlib import Path
         
         # Verwende den aktuell konfigurierten Output-Ordner
         output_dir = Path(self.output_directory)
@@ -89,29 +120,101 @@ class ZetaProposerGUI:
             messagebox.showwarning("Warnung", f"Output-Ordner existiert nicht: {output_dir}")
             return
         
-        # Rekursive Suche nach allen docx-Dateien in Unterordnern
-        files = sorted(output_dir.glob("*/*.docx"), key=os.path.getmtime, reverse=True)
-        win = Toplevel(self.root)
+        manifest = DocumentManifest(output_dir)
+        state = {"page": 0, "sort": "created", "descending": True, "total": 0}
+        columns = (("project", "Projekt", 200), ("initiator", "Veranlasser", 100), ("created", "Datum", 120),
+                   ("version", "Version", 60), ("size", "Größe", 70), ("path", "Pfad", 250))
+        
+        win = tk.Toplevel(self.root)
         win.title(f"Erstellte Dokumente - {output_dir}")
-        win.geometry("600x450")
-        
-        # Zeige den aktuellen Output-Ordner an
-        folder_label = Label(win, text=f"Output-Ordner: {output_dir}", font=("Arial", 9))
-        folder_label.pack(pady=(5, 0))
-        lb = Listbox(win, width=80)
-        lb.pack(side=LEFT, fill=BOTH, expand=True)
-        sb = Scrollbar(win)
-        sb.pack(side=RIGHT, fill=Y)
-        lb.config(yscrollcommand=sb.set)
-        sb.config(command=lb.yview)
-        for f in files:
-            lb.insert(END, str(f.relative_to(output_dir)))
+        win.geometry("850x500")
+        
+        # Zeige den aktuellen Output-Ordner und Filter an
+        top = ttk.Frame(win, padding=5)
+        top.pack(fill=tk.X)
+        ttk.Label(top, text=f"Output-Ordner: {output_dir}", font=("Arial", 9)).pack(side=tk.LEFT)
+        filter_var = tk.StringVar()
+        filter_entry = ttk.Entry(top, textvariable=filter_var, width=30)
+        filter_entry.pack(side=tk.RIGHT)
+        ttk.Label(top, text="Filter:").pack(side=tk.RIGHT, padx=(10, 5))
+        
+        tree_frame = ttk.Frame(win)
+        tree_frame.pack(fill=tk.BOTH, expand=True)
+        tree = ttk.Treeview(tree_frame, columns=[c[0] for c in columns], show="headings")
+        sb = ttk.Scrollbar(tree_frame, command=tree.yview)
+        tree.config(yscrollcommand=sb.set)
+        sb.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        bottom = ttk.Frame(win, padding=5)
+        bottom.pack(fill=tk.X)
+        page_var = tk.StringVar()
+        prev_btn = ttk.Button(bottom, text="<", width=3)
+        prev_btn.pack(side=tk.LEFT)
+        ttk.Label(bottom, textvariable=page_var).pack(side=tk.LEFT, padx=10)
+        next_btn = ttk.Button(bottom, text=">", width=3)
+        next_btn.pack(side=tk.LEFT)
+        scan_var = tk.StringVar()
+        ttk.Label(bottom, textvariable=scan_var).pack(side=tk.RIGHT)
+        
+        def refresh():
+            # Nur eine Seite aus dem Index lesen; kein stat() pro Datei im Tk-Thread
+            if not win.winfo_exists():
+                return
+            text = filter_var.get().strip()
+            state["total"] = manifest.count(text)
+            pages = max(1, -(-state["total"] // OVERVIEW_PAGE_SIZE))
+            state["page"] = min(state["page"], pages - 1)
+            entries = manifest.query(text, sort=state["sort"], descending=state["descending"],
+                                     limit=OVERVIEW_PAGE_SIZE, offset=state["page"] * OVERVIEW_PAGE_SIZE)
+            tree.delete(*tree.get_children())
+            for entry in entries:
+                tree.insert("", tk.END, iid=entry.path, values=(
+                    entry.project, entry.initiator, datetime.fromtimestamp(entry.created).strftime("%Y-%m-%d %H:%M"),
+                    entry.version, f"{entry.size // 1024} KB", entry.path))
+            page_var.set(f"Seite {state['page'] + 1}/{pages} ({state['total']} Dokumente)")
+            prev_btn.config(state="normal" if state["page"] > 0 else "disabled")
+            next_btn.config(state="normal" if state["page"] < pages - 1 else "disabled")
+        
+        def change_page(delta):
+            state["page"] = max(0, state["page"] + delta)
+            refresh()
+        
+        def sort_by(column):
+            if state["sort"] == column:
+                state["descending"] = not state["descending"]
+            else:
+                state["sort"], state["descending"] = column, column in ("created", "version", "size")
+            state["page"] = 0
+            refresh()
+        
+        def on_filter(*_):
+            state["page"] = 0
+            refresh()
+        
+        def rescan():
+            # Manuelle Änderungen im Ordner im Hintergrund abgleichen, danach neu anzeigen
+            scan_var.set("Ordner wird abgeglichen...")
+            def run():
+                try:
+                    manifest.rescan()
+                    message = ""
+                except Exception as e:
+                    if hasattr(self, 'logger') and self.logger:
+                        self.logger.error("Manifest rescan failed: %s", e)
+                    message = "Abgleich fehlgeschlagen"
+                def done():
+                    if win.winfo_exists():
+                        scan_var.set(message)
+                        refresh()
+                self.root.after(0, done)
+            threading.Thread(target=run, daemon=True).start()
+        
         def open_selected(event=None):
-            sel = lb.curselection()
+            sel = tree.selection()
             if not sel:
                 return
-            file_path = output_dir / lb.get(sel[0])
-            file_path = file_path.resolve()
+            file_path = (output_dir / sel[0]).resolve()
             try:
                 if platform.system() == "Windows":
                     os.startfile(str(file_path))
@@ -121,7 +224,17 @@ class ZetaProposerGUI:
                     subprocess.Popen(["xdg-open", str(file_path)])
             except Exception as e:
                 messagebox.showerror("Fehler", f"Konnte Datei nicht öffnen: {e}")
-        lb.bind('<Double-Button-1>', open_selected)
+        
+        for column, heading, width in columns:
+            tree.heading(column, text=heading, command=lambda c=column: sort_by(c))
+            tree.column(column, width=width, anchor="w")
+        prev_btn.config(command=lambda: change_page(-1))
+        next_btn.config(command=lambda: change_page(1))
+        ttk.Button(bottom, text="Neu einlesen", command=rescan).pack(side=tk.RIGHT, padx=10)
+        filter_var.trace_add("write", on_filter)
+        tree.bind('<Double-Button-1>', open_selected)
+        refresh()
+        rescan()
         
     def setup_ui(self):
         # Main frame
@@ -198,33 +311,25 @@ class ZetaProposerGUI:
             self.project_name_var.set("Enter project name here...")
         
     def setup_logger(self):
-        """Set up a new logger and log file for each generation run"""
+        """Configure logging for a generation run (logging_config.json, one run ID per run)"""
         # Immer im output-Ordner des aktuellen Projekts, nicht im konfigurierten Output-Ordner
         logs_dir = Path("output") / "logs"
         logs_dir.mkdir(parents=True, exist_ok=True)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.logfile_path = str(logs_dir / f"zeta_log_{timestamp}.log")
-        # Remove all handlers before reconfiguring logging to avoid duplicate logs
-        for handler in logging.root.handlers[:]:
-            logging.root.removeHandler(handler)
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s %(levelname)s %(message)s',
-            handlers=[
-                logging.FileHandler(self.logfile_path, encoding='utf-8'),
-                logging.StreamHandler()
-            ]
-        )
-        self.logger = logging.getLogger(__name__)
-        # Remove all handlers from root logger before adding GUI handler
-        for handler in logging.getLogger().handlers[:]:
-            if isinstance(handler, GuiLogHandler):
-                logging.getLogger().removeHandler(handler)
-        # Add GUI log handler
+        # GUI-Handler zeigt nur die Nachricht (ohne Zeitstempel)
         gui_handler = GuiLogHandler(self.log_message)
         gui_handler.setLevel(logging.INFO)
-        logging.getLogger().addHandler(gui_handler)
-        self.log_message(f"[LOGGING STARTED] Logfile: {self.logfile_path}")
+        gui_handler.setFormatter(logging.Formatter())
+        # Datei (JSONL, rotierend), Konsole und GUI laufen hinter einer Queue im Listener-Thread;
+        # ohne gültige logging_config.json wird wie bisher eine Logdatei pro Lauf geschrieben
+        self.logfile_path = configure_logging_from_file(
+            LOGGING_CONFIG_PATH, extra_handlers=[gui_handler],
+            fallback_logfile=str(logs_dir / f"zeta_log_{timestamp}.log")
+        )
+        self.run_id = new_run_id()
+        set_log_context(run_id=self.run_id, job_id=None, section=None, attempt=None)
+        self.logger = logging.getLogger(__name__)
+        self.log_message(f"[LOGGING STARTED] Run {self.run_id}, Logfile: {self.logfile_path}")
 
     def on_ai_provider_change(self, event=None):
         """Handle AI provider change"""
@@ -242,9 +347,23 @@ class ZetaProposerGUI:
             self.ollama_url = cfg.get("ollama_url", "http://localhost:11434")
             self.ollama_model = cfg.get("ollama_model", "llama3")
             self.alignment_threshold = float(cfg.get("alignment_threshold", 0.6))
+            self.semantic_alignment = bool(cfg.get("semantic_alignment", False))
+            self.ai_review_budget = int(cfg.get("ai_review_budget", 3))
+            self.ai_review_batched = bool(cfg.get("ai_review_batched", True))
+            self.log_max_lines = max(100, int(cfg.get("log_max_lines", DEFAULT_LOG_MAX_LINES)))
             self.output_directory = cfg.get("output_directory", "output/docx")
             self.json_output_directory = cfg.get("json_output_directory", "output/json")
             self.initiator = cfg.get("initiator", "")
+            self.pdf_export = bool(cfg.get("pdf_export", False))
+            self.pdf_workers = max(1, int(cfg.get("pdf_workers", DEFAULT_PDF_WORKERS)))
+            self.bulk_stage_workers = {k: int(v) for k, v in cfg.get("bulk_stage_workers", {}).items() if k in DEFAULT_STAGE_WORKERS}
+            self.bulk_queue_size = max(1, int(cfg.get("bulk_queue_size", DEFAULT_QUEUE_SIZE)))
+            self.bulk_resume = bool(cfg.get("bulk_resume", True))
+            self.duplicate_reuse_threshold = float(cfg.get("duplicate_reuse_threshold", DEFAULT_REUSE_THRESHOLD))
+            adapt_threshold = cfg.get("duplicate_adapt_threshold", DEFAULT_ADAPT_THRESHOLD)
+            self.duplicate_adapt_threshold = None if adapt_threshold is None else float(adapt_threshold)
+            self.watch_workers = max(1, int(cfg.get("watch_workers", DEFAULT_WATCH_WORKERS)))
+            self.watch_debounce = float(cfg.get("watch_debounce", DEFAULT_DEBOUNCE))
         except FileNotFoundError:
             # Erstelle Standard-Konfiguration wenn Datei nicht existiert
             self._create_default_config()
@@ -262,9 +381,22 @@ class ZetaProposerGUI:
             "ollama_url": "http://localhost:11434",
             "ollama_model": "llama3",
             "alignment_threshold": 0.6,
+            "semantic_alignment": False,
+            "ai_review_budget": 3,
+            "ai_review_batched": True,
+            "log_max_lines": DEFAULT_LOG_MAX_LINES,
             "output_directory": "output/docx",
             "json_output_directory": "output/json",
-            "initiator": ""
+            "initiator": "",
+            "pdf_export": False,
+            "pdf_workers": DEFAULT_PDF_WORKERS,
+            "bulk_stage_workers": dict(DEFAULT_STAGE_WORKERS),
+            "bulk_queue_size": DEFAULT_QUEUE_SIZE,
+            "bulk_resume": True,
+            "duplicate_reuse_threshold": DEFAULT_REUSE_THRESHOLD,
+            "duplicate_adapt_threshold": DEFAULT_ADAPT_THRESHOLD,
+            "watch_workers": DEFAULT_WATCH_WORKERS,
+            "watch_debounce": DEFAULT_DEBOUNCE
         }
         try:
             with open(self.CONFIG_PATH, "w", encoding="utf-8") as f:
@@ -292,9 +424,22 @@ class ZetaProposerGUI:
             "ollama_url": self.ollama_url,
             "ollama_model": self.ollama_model,
             "alignment_threshold": self.alignment_threshold,
+            "semantic_alignment": self.semantic_alignment,
+            "ai_review_budget": self.ai_review_budget,
+            "ai_review_batched": self.ai_review_batched,
+            "log_max_lines": self.log_max_lines,
             "output_directory": self.output_directory,
             "json_output_directory": self.json_output_directory,
-            "initiator": self.initiator
+            "initiator": self.initiator,
+            "pdf_export": self.pdf_export,
+            "pdf_workers": self.pdf_workers,
+            "bulk_stage_workers": self.bulk_stage_workers,
+            "bulk_queue_size": self.bulk_queue_size,
+            "bulk_resume": self.bulk_resume,
+            "duplicate_reuse_threshold": self.duplicate_reuse_threshold,
+            "duplicate_adapt_threshold": self.duplicate_adapt_threshold,
+            "watch_workers": self.watch_workers,
+            "watch_debounce": self.watch_debounce
         }
         with open(self.CONFIG_PATH, "w", encoding="utf-8") as f:
             json.dump(cfg, f, indent=2)
@@ -391,6 +536,7 @@ class ZetaProposerGUI:
                 "ux_ui"
             ]
             # Regex für alle Platzhalter (mit/ohne Leerzeichen, case-insensitive)
+            import docx
             placeholder_patterns = [re.compile(r"\{\{\s*" + ph + r"\s*\}\}", re.IGNORECASE) for ph in placeholders]
             for f in glob.glob("templates/*.docx") + glob.glob("templates/*.dotx"):
                 try:
@@ -491,6 +637,10 @@ class ZetaProposerGUI:
         threshold_slider = ttk.Scale(scrollable_frame, from_=0.3, to=1.0, orient=tk.HORIZONTAL, variable=threshold_var, command=on_slider_change)
         threshold_slider.pack(fill=tk.X, pady=(0, 20))
         
+        # Semantische Bewertung (lokal, ohne Netzwerk)
+        semantic_var = tk.BooleanVar(value=self.semantic_alignment)
+        ttk.Checkbutton(scrollable_frame, text="Semantische Übereinstimmung lokal bewerten (TF-IDF/BM25, benötigt NumPy)", variable=semantic_var).pack(anchor=tk.W, pady=(0, 20))
+        
         # Initiator setting
         ttk.Label(scrollable_frame, text="Initiator (optional):").pack(anchor=tk.W, pady=(15,0))
         ttk.Label(scrollable_frame, text="Name/Abteilung des Veranlassers (wird als Suffix an Dateinamen angehängt):", font=("Arial", 8)).pack(anchor=tk.W)
@@ -525,6 +675,7 @@ class ZetaProposerGUI:
                 os.environ["OLLAMA_MODEL"] = self.ollama_model
             
             self.alignment_threshold = float(threshold_var.get())
+            self.semantic_alignment = bool(semantic_var.get())
             self.output_directory = output_dir_var.get()
             self.json_output_directory = json_output_dir_var.get()
             self.initiator = initiator_var.get()
@@ -750,12 +901,13 @@ class ZetaProposerGUI:
     
     def _bulk_generate_documents_thread(self, json_files, target_folder):
         """Generate Word documents from JSON files in a separate thread"""
+        render_service = None
         try:
             self.setup_logger()
             if hasattr(self, 'logger') and self.logger:
                 self.logger.info("Starting bulk document generation")
-                self.logger.info(f"Processing {len(json_files)} JSON files")
-                self.logger.info(f"Target folder: {target_folder}")
+                self.logger.info("Processing %s JSON files", len(json_files))
+                self.logger.info("Target folder: %s", target_folder)
             
             # Create target folder if it doesn't exist
             target_path = Path(target_folder)
@@ -775,102 +927,87 @@ class ZetaProposerGUI:
                 
             # Set alignment threshold
             self.ai_service.alignment_threshold = self.alignment_threshold
+            self.ai_service.semantic_alignment = self.semantic_alignment
+            self.ai_service.ai_review_budget = self.ai_review_budget
+            self.ai_service.ai_review_batched = self.ai_review_batched
             
             # Load proposal context if available
             proposal_context = self._load_full_proposal_context()
             
-            successful_generations = 0
-            failed_generations = 0
+            # Render-Worker mit vorgeladenem Template starten, während die ersten Konzepte generiert werden
+            stage_workers = dict(DEFAULT_STAGE_WORKERS, **self.bulk_stage_workers)
+            render_service = RenderService(
+                template_path=self.word_generator.template_path,
+                output_directory=str(target_path),
+                workers=stage_workers["render"],
+            ).start()
             
-            for i, json_file in enumerate(json_files):
-                try:
-                    # Update progress
-                    progress_text = f"Processing {i+1}/{len(json_files)}: {json_file.name}"
-                    self.root.after(0, lambda t=progress_text: self.progress_var.set(t))
-                    self.root.after(0, lambda t=progress_text: self.status_var.set(t))
-                    
-                    if hasattr(self, 'logger') and self.logger:
-                        self.logger.info(f"Processing file {i+1}/{len(json_files)}: {json_file.name}")
-                    
-                    # Load JSON data
-                    with open(json_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    
-                    # Extract project data
-                    project_name = data.get('name', '').strip()
-                    upwork_link = data.get('link', '').strip()
-                    description = data.get('description', '').strip()
-                    
-                    if not project_name:
-                        if hasattr(self, 'logger') and self.logger:
-                            self.logger.warning(f"No project name found in {json_file.name}")
-                        failed_generations += 1
-                        continue
-                        
-                    if not description:
-                        if hasattr(self, 'logger') and self.logger:
-                            self.logger.warning(f"No description found in {json_file.name}")
-                        failed_generations += 1
-                        continue
-                    
-                    # Generate concept using AI
-                    if hasattr(self, 'logger') and self.logger:
-                        self.logger.info(f"Generating concept for: {project_name}")
-                    
-                    concept = self.ai_service.generate_technical_concept_sections(
-                        description, 
-                        provider=provider, 
-                        proposal_context=proposal_context,
-                        cancel_callback=lambda: False  # No cancellation during bulk processing
-                    )
-                    
-                    if hasattr(self, 'logger') and self.logger:
-                        self.logger.info(f"Concept generated for: {project_name}")
-                    
-                    # Create Word document
-                    # Temporarily change output directory for this generation
-                    original_output_dir = self.word_generator.output_dir
-                    self.word_generator.output_dir = Path(target_folder)
-                    
-                    docx_path = self.word_generator.create_document(
-                        concept, 
-                        project_name=project_name, 
-                        initiator=self.initiator,
-                        upwork_link=upwork_link,
-                        description=description,
-                        skip_path_warnings=True  # Skip path warnings during bulk generation
-                    )
-                    
-                    # Restore original output directory
-                    self.word_generator.output_dir = original_output_dir
-                    
-                    if hasattr(self, 'logger') and self.logger:
-                        self.logger.info(f"Word document created: {docx_path}")
-                    
-                    # Note: Documents are NOT automatically opened during bulk generation
-                    
-                    successful_generations += 1
-                    
-                except Exception as e:
-                    if hasattr(self, 'logger') and self.logger:
-                        self.logger.error(f"Error processing {json_file.name}: {str(e)}")
-                    failed_generations += 1
-                    continue
+            completed = []
+            def on_item_done(item):
+                completed.append(item)
+                progress_text = f"Completed {len(completed)}/{len(json_files)}: {item.json_file.name}"
+                self.root.after(0, lambda t=progress_text: self.progress_var.set(t))
+                self.root.after(0, lambda t=progress_text: self.status_var.set(t))
+            
+            # Laden -> Generieren -> Rendern -> Schreiben als Pipeline mit begrenzten Queues
+            bulk = BulkGenerator(
+                self.ai_service,
+                render_service,
+                self.word_generator,
+                target_path,
+                provider=provider,
+                proposal_context=proposal_context,
+                initiator=self.initiator,
+                stage_workers=stage_workers,
+                queue_size=self.bulk_queue_size,
+                on_item_done=on_item_done,
+                # Checkpoints im Zielordner: ein erneuter Lauf holt nur die fehlende Arbeit nach
+                checkpoints=CheckpointStore.for_directory(target_path) if self.bulk_resume else None,
+                reuse_threshold=self.duplicate_reuse_threshold,
+                adapt_threshold=self.duplicate_adapt_threshold,
+            )
+            report = bulk.run(json_files)
+            render_service.shutdown()
+            # Note: Documents are NOT automatically opened during bulk generation
+            successful_generations = len(report.successful)
+            failed_generations = len(report.failed)
+            skipped_generations = len(report.skipped)
+            
+            # Ganzen Ausgabeordner mit begrenzter Parallelität nach PDF konvertieren
+            pdf_summary = ""
+            if self.pdf_export and (successful_generations or skipped_generations):
+                converter = self._get_pdf_converter()
+                if isinstance(converter, NullPdfConverter):
+                    self.logger.info("PDF export skipped (LibreOffice not installed)")
+                    pdf_summary = "\nPDF: skipped (LibreOffice not installed)"
+                else:
+                    self.root.after(0, lambda: self.progress_var.set("Converting documents to PDF..."))
+                    pdf_results = convert_folder(target_path, converter, max_workers=self.pdf_workers)
+                    pdf_failed = sum(1 for r in pdf_results if r.error)
+                    pdf_skipped = sum(1 for r in pdf_results if r.skipped)
+                    pdf_converted = len(pdf_results) - pdf_failed - pdf_skipped
+                    pdf_summary = f"\nPDF: {pdf_converted} converted, {pdf_skipped} up to date, {pdf_failed} failed"
             
             # Show completion message
-            completion_message = f"Bulk generation completed!\n\nSuccessful: {successful_generations}\nFailed: {failed_generations}\n\nDocuments saved in: {target_folder}"
+            completion_message = f"Bulk generation completed!\n\nSuccessful: {successful_generations}\nSkipped (already created): {skipped_generations}\nFailed: {failed_generations}{pdf_summary}\n\nDocuments saved in: {target_folder}"
+            if report.duplicates:
+                completion_message += f"\n\nNear-duplicates: {len(report.duplicates)} (about {report.calls_saved} provider calls saved)\n"
+                completion_message += "\n".join(report.duplicate_summary()[:10])
+            completion_message += "\n\nStages:\n" + "\n".join(report.stage_summary())
             
             self.root.after(0, lambda: self.progress_var.set("Ready"))
             self.root.after(0, lambda: self.status_var.set(f"Bulk generation completed: {successful_generations} successful, {failed_generations} failed"))
             self.root.after(0, lambda: messagebox.showinfo("Bulk Generation Complete", completion_message))
             
             if hasattr(self, 'logger') and self.logger:
-                self.logger.info(f"Bulk generation completed: {successful_generations} successful, {failed_generations} failed")
+                self.logger.info("Bulk generation completed: %s successful, %s failed", successful_generations, failed_generations)
                 
         except Exception as e:
             error_message = f"Error during bulk generation: {str(e)}"
             if hasattr(self, 'logger') and self.logger:
                 self.logger.error(error_message)
+            if render_service is not None:
+                render_service.shutdown(wait=False)
             self.root.after(0, lambda: self.progress_var.set("Ready"))
             self.root.after(0, lambda: self.status_var.set("Bulk generation failed"))
             self.root.after(0, lambda: messagebox.showerror("Error", error_message))
@@ -952,6 +1089,9 @@ class ZetaProposerGUI:
                 
             # Set alignment threshold
             self.ai_service.alignment_threshold = self.alignment_threshold
+            self.ai_service.semantic_alignment = self.semantic_alignment
+            self.ai_service.ai_review_budget = self.ai_review_budget
+            self.ai_service.ai_review_batched = self.ai_review_batched
             if hasattr(self, 'logger') and self.logger:
                 self.logger.info("Alignment threshold set to: %.2f", self.alignment_threshold)
             
@@ -991,7 +1131,7 @@ class ZetaProposerGUI:
                 
             # Use manually entered project name
             if hasattr(self, 'logger') and self.logger:
-                self.logger.info(f"Using manually entered project name: {project_name}")
+                self.logger.info("Using manually entered project name: %s", project_name)
 
             # Word-Dokument erzeugen, Projektname, Datum und Initiator als Parameter übergeben
             docx_path = self.word_generator.create_document(
@@ -1003,6 +1143,7 @@ class ZetaProposerGUI:
             )
             if hasattr(self, 'logger') and self.logger:
                 self.logger.info("Word document created: %s", docx_path)
+            pdf_path = self._convert_to_pdf(docx_path) if self.pdf_export else None
             # Öffne das erzeugte docx automatisch
             try:
                 import platform
@@ -1015,7 +1156,7 @@ class ZetaProposerGUI:
                     subprocess.Popen(["xdg-open", docx_path])
             except Exception as e:
                 if hasattr(self, 'logger') and self.logger:
-                    self.logger.error(f"Could not open docx automatically: {e}")
+                    self.logger.error("Could not open docx automatically: %s", e)
             
             if self.cancel_requested:
                 if hasattr(self, 'logger') and self.logger:
@@ -1030,6 +1171,8 @@ class ZetaProposerGUI:
             if hasattr(self, 'logger') and self.logger:
                 self.logger.info("Generation process completed successfully")
             message = f"Technical concept generated successfully!\n\nFiles created:\n• {docx_path}"
+            if pdf_path:
+                message += f"\n• {pdf_path}"
             message += f"\n\nLog file: {self.logfile_path}"
             self.root.after(0, lambda: messagebox.showinfo("Success", message))
             
@@ -1070,62 +1213,79 @@ class ZetaProposerGUI:
                 self.logger.error("Error loading proposal context: %s", str(e))
             return ""
 
+    def _get_pdf_converter(self):
+        """Persistent converter shared by all exports; LibreOffice processes start on first use."""
+        if self.pdf_converter is None:
+            self.pdf_converter = create_default_converter(self.pdf_workers)
+        return self.pdf_converter
+
     def _convert_to_pdf(self, docx_path):
-        """Convert Word document to PDF"""
+        """Convert Word document to PDF (next to the docx). Returns the PDF path or None."""
         if hasattr(self, 'logger') and self.logger:
             self.logger.info("Converting Word document to PDF: %s", docx_path)
         
-        try:
-            # Create PDF output directory
-            pdf_output_dir = Path(self.output_directory) / "pdf"
-            pdf_output_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Generate PDF filename
-            docx_name = Path(docx_path).stem
-            pdf_path = pdf_output_dir / f"{docx_name}.pdf"
-            
-            if hasattr(self, 'logger') and self.logger:
-                self.logger.info("PDF output path: %s", pdf_path)
-            
-            # Initialize COM for Windows
-            import platform
-            if platform.system() == "Windows":
-                try:
-                    import pythoncom
-                    pythoncom.CoInitialize()
-                    if hasattr(self, 'logger') and self.logger:
-                        self.logger.info("COM initialized for Windows")
-                except ImportError:
-                    if hasattr(self, 'logger') and self.logger:
-                        self.logger.warning("pythoncom not available, trying without COM initialization")
-                except Exception as e:
-                    if hasattr(self, 'logger') and self.logger:
-                        self.logger.warning("COM initialization failed: %s", str(e))
-            # PDF conversion is optional and skipped if docx2pdf is not installed
+        converter = self._get_pdf_converter()
+        if isinstance(converter, NullPdfConverter):
             if hasattr(self, 'logger') and self.logger:
-                self.logger.info("PDF conversion skipped (docx2pdf not installed)")
+                self.logger.info("PDF conversion skipped (LibreOffice not installed)")
             return None
+        try:
+            pdf_path = converter.convert(docx_path, Path(docx_path).with_suffix(".pdf"))
+            if hasattr(self, 'logger') and self.logger:
+                self.logger.info("PDF created: %s", pdf_path)
+            return pdf_path
         except Exception as e:
+            # Das docx ist bereits gespeichert; ein fehlgeschlagenes PDF bricht die Generierung nicht ab
             if hasattr(self, 'logger') and self.logger:
                 self.logger.error("PDF conversion failed: %s", str(e))
-            raise
+            return None
 
     def show_last_log(self):
-        if self.logfile_path and os.path.exists(self.logfile_path):
-            with open(self.logfile_path, "r", encoding="utf-8") as f:
-                log_content = f.read()
+        if not (self.logfile_path and os.path.exists(self.logfile_path)):
+            messagebox.showinfo("Info", "Kein Logfile gefunden.")
+            return
+        logfile_path, run_id = self.logfile_path, getattr(self, "run_id", None)
+
+        def load():
+            # Im Hintergrund lesen: die Logdatei kann groß sein, der Tk-Thread soll nicht blockieren
+            try:
+                if logfile_path.endswith(".jsonl"):
+                    # Gemeinsame JSONL-Datei: nur die Einträge des letzten Laufs, nur aus der aktuellen Datei
+                    # (rotierte .gz-Backups enthalten ältere Läufe)
+                    log_content = "\n".join(
+                        " ".join(str(part) for part in (
+                            record.get("ts", ""), record.get("level", ""),
+                            f"[{record['job_id']}]" if record.get("job_id") else "",
+                            f"[{record['section']}#{record.get('attempt') or '-'}]" if record.get("section") else "",
+                            record.get("message", ""),
+                        ) if part)
+                        for record in iter_log_records(logfile_path, include_rotated=False)
+                        if record.get("run_id") == run_id
+                    )
+                else:
+                    with open(logfile_path, "r", encoding="utf-8") as f:
+                        log_content = f.read()
+            except OSError as e:
+                message = f"Logfile konnte nicht gelesen werden: {e}"
+                self.root.after(0, lambda: messagebox.showerror("Error", message))
+                return
+            self.root.after(0, lambda: show(log_content))
+
+        def show(log_content):
             log_win = tk.Toplevel(self.root)
-            log_win.title(f"Log: {os.path.basename(self.logfile_path)}")
+            log_win.title(f"Log: {os.path.basename(logfile_path)}")
             text = scrolledtext.ScrolledText(log_win, width=100, height=30)
             text.pack(fill=tk.BOTH, expand=True)
             text.insert(tk.END, log_content)
             text.config(state="disabled")
-        else:
-            messagebox.showinfo("Info", "Kein Logfile gefunden.")
+
+        threading.Thread(target=load, daemon=True).start()
 
     def show_preview(self, png_path):
         preview_win = tk.Toplevel(self.root)
         preview_win.title("Document Preview")
+        # Pillow nur für die Vorschau laden, nicht beim Start
+        from PIL import Image, ImageTk
         img = Image.open(png_path)
         tk_img = ImageTk.PhotoImage(img)
         label = tk.Label(preview_win, image=tk_img)
@@ -1134,12 +1294,35 @@ class ZetaProposerGUI:
         preview_win.geometry(f"{img.width}x{img.height}")
 
     def log_message(self, message):
-        print(message)
-        if self.log_widget:
+        """Thread-safe: queue a line for the log window (the console handler already prints it)."""
+        self.log_queue.put(message)
+
+    def _drain_log_queue(self):
+        """Move all queued log lines into the log window in one insert (runs in the Tk mainloop)."""
+        messages = []
+        try:
+            while True:
+                messages.append(self.log_queue.get_nowait())
+        except queue.Empty:
+            pass
+        if messages and self.log_widget:
+            # Mehr Zeilen als der Ringpuffer fasst müssen gar nicht erst eingefügt werden
+            if len(messages) > self.log_max_lines:
+                messages = messages[-self.log_max_lines:]
+            at_bottom = self.log_widget.yview()[1] >= 0.999
             self.log_widget.config(state="normal")
-            self.log_widget.insert(tk.END, message + "\n")
-            self.log_widget.see(tk.END)
+            self.log_widget.insert(tk.END, "\n".join(messages) + "\n")
+            # Ringpuffer: älteste Zeilen entfernen, damit Speicher und Redraw konstant bleiben
+            line_count = int(self.log_widget.index("end-1c").split(".")[0]) - 1
+            if line_count > self.log_max_lines:
+                self.log_widget.delete("1.0", f"{line_count - self.log_max_lines + 1}.0")
+            if at_bottom:
+                self.log_widget.see(tk.END)
             self.log_widget.config(state="disabled")
+        try:
+            self.root.after(LOG_DRAIN_INTERVAL_MS, self._drain_log_queue)
+        except tk.TclError:
+            pass  # Fenster wurde geschlossen
 
     def toggle_log(self):
         if self.log_visible:
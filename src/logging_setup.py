@@ -0,0 +1,401 @@
+import atexit
+import copy
+import gzip
+import json
+import logging
+import logging.config
+import logging.handlers
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+DEFAULT_FORMAT = '%(asctime)s %(levelname)s %(message)s'
+LOGGING_CONFIG_PATH = "logging_config.json"
+
+# BatchingFileHandler: write after this many records or this many seconds
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+# Fields every record carries (None outside of a run/job/section)
+CONTEXT_FIELDS = ("run_id", "job_id", "section", "attempt")
+_context_vars: Dict[str, ContextVar] = {name: ContextVar(f"log_{name}", default=None) for name in CONTEXT_FIELDS}
+
+
+def new_run_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+def set_log_context(**fields):
+    """Set context fields for the current thread/context until they are changed again."""
+    for name, value in fields.items():
+        _context_vars[name].set(value)
+
+
+@contextmanager
+def log_context(**fields):
+    """Set context fields (run_id, job_id, section, attempt) for the duration of the block."""
+    tokens = [(_context_vars[name], _context_vars[name].set(value)) for name, value in fields.items()]
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+def get_log_context() -> Dict[str, Any]:
+    return {name: var.get() for name, var in _context_vars.items()}
+
+
+class ContextFilter(logging.Filter):
+    """Stamps the context fields onto each record.
+
+    Must run in the producing thread (it is attached to the QueueHandler),
+    because context variables are not visible on the listener thread.
+    """
+
+    def filter(self, record):
+        for name, var in _context_vars.items():
+            if not hasattr(record, name):
+                setattr(record, name, var.get())
+        return True
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener's handlers.
+
+    The stdlib prepare() runs self.format(record) on the producing thread
+    and folds the traceback into the message. This one only merges msg and
+    args (the arguments may change before the listener gets to them) and
+    turns exc_info into exc_text, which also keeps the record picklable for
+    the render workers' multiprocessing queue.
+    """
+
+    _exc_formatter = logging.Formatter()
+
+    def prepare(self, record):
+        record = copy.copy(record)  # andere Handler der Kette sehen den unveränderten Record
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self._exc_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, message plus the context fields that are set."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name in CONTEXT_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                entry[name] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class BatchingFileHandler(logging.FileHandler):
+    """FileHandler that buffers formatted records and writes them in batches.
+
+    Records are flushed when the batch is full, when the oldest buffered
+    record is older than flush_interval, for every record at ERROR or above,
+    and on close. Meant to run behind a QueueListener, so the writes happen
+    on the listener thread and never on a generation thread.
+    """
+
+    def __init__(self, filename, mode='a', encoding='utf-8', batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL, flush_level: int = logging.ERROR):
+        super().__init__(filename, mode=mode, encoding=encoding, delay=True)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.flush_level = flush_level
+        self._buffer: List[str] = []
+        self._first_buffered = 0.0
+
+    def emit(self, record):
+        try:
+            line = self.format(record) + self.terminator
+        except Exception:
+            self.handleError(record)
+            return
+        with self.lock:
+            if not self._buffer:
+                self._first_buffered = time.monotonic()
+            self._buffer.append(line)
+            due = (len(self._buffer) >= self.batch_size or record.levelno >= self.flush_level
+                   or time.monotonic() - self._first_buffered >= self.flush_interval)
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            if not self._buffer:
+                return
+            data = ''.join(self._buffer)
+            self._buffer.clear()
+            try:
+                if self.stream is None:
+                    self.stream = self._open()
+                self.stream.write(data)
+                self.stream.flush()
+            except Exception:
+                # Report like StreamHandler would; the batch is dropped
+                if logging.raiseExceptions:
+                    sys.stderr.write("--- Logging error while writing batch to %s ---\n" % self.baseFilename)
+
+    def close(self):
+        self.flush()
+        super().close()
+
+
+class RotatingBatchFileHandler(BatchingFileHandler):
+    """BatchingFileHandler with size- and time-based rotation and gzip compression.
+
+    Before a batch is written the file is rotated if the batch would push it
+    past max_bytes or the file is older than rotate_interval seconds. Backups
+    are named <file>.1.gz (newest) to <file>.<backup_count>.gz; older ones are
+    deleted, so disk use stays bounded.
+    """
+
+    def __init__(self, filename, max_bytes: int = 10 * 1024 * 1024, backup_count: int = 10,
+                 rotate_interval: Optional[float] = 24 * 3600, **kwargs):
+        os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+        super().__init__(filename, mode='a', **kwargs)
+        self.max_bytes = max_bytes
+        self.backup_count = max(0, backup_count)
+        self.rotate_interval = rotate_interval
+        try:
+            self._opened_at = os.stat(self.baseFilename).st_mtime
+        except OSError:
+            self._opened_at = time.time()
+
+    def backup_name(self, index: int) -> str:
+        return f"{self.baseFilename}.{index}.gz"
+
+    def _should_rotate(self, pending: int) -> bool:
+        try:
+            size = os.path.getsize(self.baseFilename)
+        except OSError:
+            return False
+        if size == 0:
+            return False
+        if self.max_bytes and size + pending > self.max_bytes:
+            return True
+        return bool(self.rotate_interval) and time.time() - self._opened_at >= self.rotate_interval
+
+    def rotate_now(self):
+        with self.lock:
+            if self.stream is not None:
+                self.stream.close()
+                self.stream = None
+            if self.backup_count == 0:
+                os.remove(self.baseFilename)
+            else:
+                for index in range(self.backup_count - 1, 0, -1):
+                    src = self.backup_name(index)
+                    if os.path.exists(src):
+                        os.replace(src, self.backup_name(index + 1))
+                with open(self.baseFilename, 'rb') as f_in, gzip.open(self.backup_name(1), 'wb') as f_out:
+                    shutil.copyfileobj(f_in, f_out)
+                os.remove(self.baseFilename)
+            self._opened_at = time.time()
+
+    def flush(self):
+        with self.lock:
+            if not self._buffer:
+                return
+            pending = sum(len(line) for line in self._buffer)
+            if self._should_rotate(pending):
+                try:
+                    self.rotate_now()
+                except OSError:
+                    if logging.raiseExceptions:
+                        sys.stderr.write("--- Logging error while rotating %s ---\n" % self.baseFilename)
+            super().flush()
+
+
+def iter_log_records(path: str, include_rotated: bool = True) -> Iterator[Dict[str, Any]]:
+    """Yield JSON-lines records oldest first (rotated .gz backups, then the current file)."""
+    paths = []
+    if include_rotated:
+        index = 1
+        while os.path.exists(f"{path}.{index}.gz"):
+            paths.append(f"{path}.{index}.gz")
+            index += 1
+        paths.reverse()
+    if os.path.exists(path):
+        paths.append(path)
+    for file_path in paths:
+        opener = gzip.open if file_path.endswith(".gz") else open
+        with opener(file_path, 'rt', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+class QueueLogging:
+    """Routes all root logging through a QueueHandler to a QueueListener thread.
+
+    Producers pay for the level check, the context fields, merging the
+    message arguments and putting the record on the queue (plus the
+    traceback text when an exception is logged, see DeferredQueueHandler);
+    formatting for the output handlers, file I/O and the GUI callback all
+    happen on the listener thread. A small timer thread flushes batching
+    handlers while the application is idle.
+    """
+
+    def __init__(self, handlers: Iterable[logging.Handler], level: int = logging.INFO,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        self.handlers = list(handlers)
+        self.level = level
+        self.flush_interval = flush_interval
+        self.queue = queue.SimpleQueue()
+        self.queue_handler = DeferredQueueHandler(self.queue)
+        self.queue_handler.addFilter(ContextFilter())
+        self.listener = logging.handlers.QueueListener(self.queue, *self.handlers, respect_handler_level=True)
+        self._started = False
+        self._stop_event = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    def start(self):
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        root.addHandler(self.queue_handler)
+        root.setLevel(self.level)
+        self.listener.start()
+        self._started = True
+        self._stop_event.clear()
+        self._flusher = threading.Thread(target=self._flush_loop, name="log-flusher", daemon=True)
+        self._flusher.start()
+        return self
+
+    def _flush_loop(self):
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def stop(self):
+        """Drain the queue, detach from the root logger and close all handlers."""
+        if not self._started:
+            return
+        self._started = False
+        root = logging.getLogger()
+        root.removeHandler(self.queue_handler)
+        self.listener.stop()
+        self._stop_event.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        for handler in self.handlers:
+            try:
+                handler.close()
+            except Exception:
+                pass
+
+    def flush(self):
+        for handler in self.handlers:
+            try:
+                handler.flush()
+            except Exception:
+                pass
+
+
+_active: Optional[QueueLogging] = None
+_active_lock = threading.Lock()
+
+
+def configure_queue_logging(logfile_path: Optional[str] = None, extra_handlers: Iterable[logging.Handler] = (),
+                            level: int = logging.INFO, fmt: str = DEFAULT_FORMAT,
+                            console: bool = True, console_stream=None) -> QueueLogging:
+    """Replace the current logging setup with a queue-backed one.
+
+    Calling it again (e.g. once per generation run with a new log file) stops
+    the previous listener after draining it.
+    """
+    global _active
+    formatter = logging.Formatter(fmt)
+    handlers: List[logging.Handler] = []
+    if logfile_path:
+        handlers.append(BatchingFileHandler(logfile_path))
+    if console:
+        handlers.append(logging.StreamHandler(console_stream))
+    handlers.extend(extra_handlers)
+    for handler in handlers:
+        if handler.formatter is None:
+            handler.setFormatter(formatter)
+
+    with _active_lock:
+        if _active is not None:
+            _active.stop()
+        _active = QueueLogging(handlers, level).start()
+        return _active
+
+
+def _file_handler_path(handlers: Iterable[logging.Handler]) -> Optional[str]:
+    for handler in handlers:
+        if isinstance(handler, RotatingBatchFileHandler):
+            return handler.baseFilename
+    for handler in handlers:
+        if isinstance(handler, logging.FileHandler):
+            return handler.baseFilename
+    return None
+
+
+def configure_logging_from_file(config_path: str = LOGGING_CONFIG_PATH, extra_handlers: Iterable[logging.Handler] = (),
+                                fallback_logfile: Optional[str] = None) -> Optional[str]:
+    """Configure logging from logging_config.json (dictConfig) behind the queue listener.
+
+    The handlers the file attaches to the root logger are moved onto the
+    QueueListener; loggers in the file should only set levels and propagate.
+    Extra handlers (the GUI console) are added to the listener as well. Falls
+    back to configure_queue_logging(fallback_logfile) if the file is missing
+    or invalid. Returns the path of the main log file, if any.
+    """
+    global _active
+    extra_handlers = list(extra_handlers)
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        with _active_lock:
+            if _active is not None:
+                _active.stop()
+                _active = None
+            logging.config.dictConfig(config)
+            root = logging.getLogger()
+            handlers = root.handlers[:] + extra_handlers
+            _active = QueueLogging(handlers, level=root.level).start()
+        return _file_handler_path(handlers)
+    except (OSError, ValueError, TypeError, AttributeError, ImportError) as e:
+        # dictConfig reports all configuration problems as ValueError
+        sys.stderr.write(f"Logging config {config_path} not usable ({e}), using default logging\n")
+        configure_queue_logging(fallback_logfile, extra_handlers=extra_handlers)
+        return fallback_logfile
+
+
+def shutdown_queue_logging():
+    global _active
+    with _active_lock:
+        if _active is not None:
+            _active.stop()
+            _active = None
+
+
+atexit.register(shutdown_queue_logging)
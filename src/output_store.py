@@ -0,0 +1,105 @@
+import logging
+import os
+import re
+import threading
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, Optional, Union
+
+_VERSIONED_NAME = re.compile(r"^(?P<base>.+?)_v(?P<version>\d+)$")
+
+# Versuche pro Datei, falls das Ziel gesperrt ist (z. B. in Word geöffnet)
+MAX_FILE_VERSIONS = 100
+
+
+def split_version(name: str):
+    """'Proj_v3' -> ('Proj', 3); 'Proj' -> ('Proj', 1)."""
+    m = _VERSIONED_NAME.match(name)
+    if m:
+        return m.group('base'), int(m.group('version'))
+    return name, 1
+
+
+def versioned_name(base: str, version: int) -> str:
+    return base if version == 1 else f"{base}_v{version}"
+
+
+class OutputStore:
+    """Allocates versioned project folders and writes files atomically.
+
+    The output directory is scanned once into a base name -> highest version
+    index; new folders are claimed with os.mkdir, which is atomic, so
+    concurrent writers (threads or render processes with their own index)
+    never get the same folder. Files are written to a temp file next to the
+    target and renamed into place, so a reader never sees half a document.
+    """
+
+    def __init__(self, root: Union[str, Path]):
+        self.logger = logging.getLogger(__name__)
+        self.root = Path(root)
+        self._index: Optional[Dict[str, int]] = None
+        self._lock = threading.Lock()
+
+    def _scan(self) -> Dict[str, int]:
+        index: Dict[str, int] = {}
+        try:
+            with os.scandir(self.root) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        base, version = split_version(entry.name)
+                        if version > index.get(base, 0):
+                            index[base] = version
+        except FileNotFoundError:
+            pass
+        self.logger.debug("Indexed %d project names in %s", len(index), self.root)
+        return index
+
+    def refresh(self):
+        with self._lock:
+            self._index = None
+
+    def allocate_folder(self, base_name: str) -> Path:
+        """Create and return the next free <base_name> / <base_name>_vN folder."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            if self._index is None:
+                self._index = self._scan()
+            version = self._index.get(base_name, 0) + 1
+            while True:
+                folder = self.root / versioned_name(base_name, version)
+                try:
+                    os.mkdir(folder)
+                except FileExistsError:
+                    # Von einem anderen Prozess belegt oder nach dem Scan entstanden
+                    version += 1
+                    continue
+                self._index[base_name] = version
+                return folder
+
+    def write_atomic(self, target: Union[str, Path], writer: Callable[[str], None]) -> Path:
+        """Let writer(path) write a temp file, then rename it to target.
+
+        If the target is locked (PermissionError on rename, e.g. opened in Word),
+        the next free <name>_vN<suffix> is used. Returns the final path.
+        """
+        target = Path(target)
+        tmp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex[:8]}.tmp")
+        try:
+            writer(str(tmp_path))
+            for version in range(1, MAX_FILE_VERSIONS + 1):
+                final = target.with_name(versioned_name(target.stem, version) + target.suffix)
+                try:
+                    os.replace(tmp_path, final)
+                    return final
+                except PermissionError as e:
+                    self.logger.warning("Permission error on version %d: %s", version, e)
+            raise PermissionError(f"No writable file name for {target} after {MAX_FILE_VERSIONS} versions")
+        finally:
+            if tmp_path.exists():
+                try:
+                    tmp_path.unlink()
+                except OSError:
+                    pass
+
+    def write_text(self, target: Union[str, Path], text: str) -> Path:
+        return self.write_atomic(target, lambda path: Path(path).write_text(text, encoding='utf-8'))
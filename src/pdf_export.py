@@ -0,0 +1,308 @@
+import atexit
+import logging
+import os
+import platform
+import queue
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Union
+
+DEFAULT_PDF_WORKERS = 2
+# Sekunden bis ein frisch gestarteter Office-Prozess Verbindungen annimmt
+OFFICE_START_TIMEOUT = 60.0
+OFFICE_CONVERT_TIMEOUT = 300.0
+
+_WINDOWS_SOFFICE = (
+    r"C:\Program Files\LibreOffice\program\soffice.exe",
+    r"C:\Program Files (x86)\LibreOffice\program\soffice.exe",
+)
+
+
+class PdfConversionError(Exception):
+    pass
+
+
+class PdfConverter(ABC):
+    """Converts one .docx into a .pdf. Implementations must be safe to call from several threads."""
+
+    name = "base"
+
+    def available(self) -> bool:
+        return True
+
+    @abstractmethod
+    def convert(self, docx_path: Union[str, Path], pdf_path: Union[str, Path]) -> Path:
+        """Write pdf_path and return it; raises PdfConversionError on failure."""
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class NullPdfConverter(PdfConverter):
+    """Stand-in for tests and machines without an office suite: records the calls, writes nothing."""
+
+    name = "null"
+
+    def __init__(self):
+        self.converted: List[Path] = []
+        self._lock = threading.Lock()
+
+    def convert(self, docx_path, pdf_path) -> Path:
+        with self._lock:
+            self.converted.append(Path(docx_path))
+        return Path(pdf_path)
+
+
+def find_soffice() -> Optional[str]:
+    for name in ("soffice", "libreoffice"):
+        path = shutil.which(name)
+        if path:
+            return path
+    if platform.system() == "Windows":
+        for path in _WINDOWS_SOFFICE:
+            if os.path.exists(path):
+                return path
+    return None
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class _OfficeProcess:
+    """One headless LibreOffice in listener mode with its own user profile."""
+
+    def __init__(self, soffice: str, slot: int):
+        self.logger = logging.getLogger(__name__)
+        self.soffice = soffice
+        self.slot = slot
+        self.profile_dir = tempfile.mkdtemp(prefix=f"zeta_lo_{slot}_")
+        self.port = 0
+        self.process: Optional[subprocess.Popen] = None
+        self._desktop = None
+
+    def _profile_url(self) -> str:
+        return Path(self.profile_dir).as_uri()
+
+    def start(self):
+        self.port = _free_port()
+        self.process = subprocess.Popen(
+            [self.soffice, "--headless", "--invisible", "--nologo", "--norestore", "--nodefault",
+             "--nolockcheck", f"-env:UserInstallation={self._profile_url()}",
+             f"--accept=socket,host=127.0.0.1,port={self.port};urp;StarOffice.ComponentContext"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        self._desktop = None
+        self.logger.info("LibreOffice listener %d started (pid %d, port %d)", self.slot, self.process.pid, self.port)
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def _connect(self):
+        import uno  # LibreOffice's Python bridge (python3-uno / bundled Python)
+
+        local = uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext("com.sun.star.bridge.UnoUrlResolver", local)
+        url = f"uno:socket,host=127.0.0.1,port={self.port};urp;StarOffice.ComponentContext"
+        deadline = time.monotonic() + OFFICE_START_TIMEOUT
+        while True:
+            try:
+                ctx = resolver.resolve(url)
+                break
+            except Exception:
+                if time.monotonic() > deadline or not self.alive():
+                    raise PdfConversionError(f"LibreOffice listener {self.slot} not reachable on port {self.port}")
+                time.sleep(0.25)
+        self._desktop = ctx.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", ctx)
+
+    def convert_uno(self, docx_path: Path, pdf_path: Path):
+        import uno
+        from com.sun.star.beans import PropertyValue
+
+        def prop(name, value):
+            p = PropertyValue()
+            p.Name = name
+            p.Value = value
+            return p
+
+        if self._desktop is None:
+            self._connect()
+        doc = self._desktop.loadComponentFromURL(uno.systemPathToFileUrl(str(docx_path)), "_blank", 0, (prop("Hidden", True),))
+        if doc is None:
+            raise PdfConversionError(f"LibreOffice could not open {docx_path}")
+        try:
+            doc.storeToURL(uno.systemPathToFileUrl(str(pdf_path)), (prop("FilterName", "writer_pdf_Export"),))
+        finally:
+            doc.close(True)
+
+    def convert_cli(self, docx_path: Path, pdf_path: Path):
+        # Without the UNO bridge: one short-lived soffice per file, but with the slot's warm profile
+        result = subprocess.run(
+            [self.soffice, "--headless", "--norestore", "--nolockcheck", f"-env:UserInstallation={self._profile_url()}",
+             "--convert-to", "pdf", "--outdir", str(pdf_path.parent), str(docx_path)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=OFFICE_CONVERT_TIMEOUT,
+        )
+        produced = pdf_path.parent / f"{docx_path.stem}.pdf"
+        if result.returncode != 0 or not produced.exists():
+            raise PdfConversionError(result.stderr.decode(errors="replace").strip() or f"soffice exit code {result.returncode}")
+        if produced != pdf_path:
+            os.replace(produced, pdf_path)
+
+    def stop(self):
+        if self.alive():
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+        self._desktop = None
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+
+class LibreOfficePdfConverter(PdfConverter):
+    """Keeps a small pool of persistent headless LibreOffice processes.
+
+    Each slot is a soffice in listener mode with its own user profile; a
+    conversion borrows a free slot, so at most `workers` documents convert
+    at once and no office start-up is paid per file. Talking to a listener
+    needs LibreOffice's Python bridge (uno); without it each slot falls back
+    to `soffice --convert-to pdf` with its already initialized profile.
+    Dead processes are restarted on the next conversion.
+    """
+
+    name = "libreoffice"
+
+    def __init__(self, workers: int = DEFAULT_PDF_WORKERS, soffice: Optional[str] = None):
+        self.logger = logging.getLogger(__name__)
+        self.soffice = soffice or find_soffice()
+        self.workers = max(1, workers)
+        self._slots: "queue.Queue[_OfficeProcess]" = queue.Queue()
+        self._all: List[_OfficeProcess] = []
+        self._lock = threading.Lock()
+        self._started = False
+        try:
+            import uno  # noqa: F401
+            self.use_uno = True
+        except ImportError:
+            self.use_uno = False
+
+    def available(self) -> bool:
+        return self.soffice is not None
+
+    def _start(self):
+        with self._lock:
+            if self._started:
+                return
+            if not self.available():
+                raise PdfConversionError("LibreOffice (soffice) not found")
+            for slot in range(self.workers):
+                office = _OfficeProcess(self.soffice, slot)
+                if self.use_uno:
+                    office.start()
+                self._all.append(office)
+                self._slots.put(office)
+            self._started = True
+            atexit.register(self.close)
+
+    def convert(self, docx_path, pdf_path) -> Path:
+        self._start()
+        docx_path = Path(docx_path).resolve()
+        pdf_path = Path(pdf_path).resolve()
+        pdf_path.parent.mkdir(parents=True, exist_ok=True)
+        office = self._slots.get()
+        try:
+            if not self.use_uno:
+                office.convert_cli(docx_path, pdf_path)
+                return pdf_path
+            if not office.alive():
+                self.logger.warning("LibreOffice listener %d died, restarting", office.slot)
+                office.start()
+            try:
+                office.convert_uno(docx_path, pdf_path)
+            except PdfConversionError:
+                raise
+            except Exception as e:
+                # Verbindung verloren: Prozess neu starten und einmal wiederholen
+                self.logger.warning("LibreOffice listener %d failed (%s), restarting", office.slot, e)
+                office.stop()
+                office.start()
+                office.convert_uno(docx_path, pdf_path)
+            return pdf_path
+        finally:
+            self._slots.put(office)
+
+    def close(self):
+        with self._lock:
+            for office in self._all:
+                office.stop()
+            self._all.clear()
+            self._slots = queue.Queue()
+            self._started = False
+
+
+def create_default_converter(workers: int = DEFAULT_PDF_WORKERS) -> PdfConverter:
+    """LibreOffice pool if soffice is installed, otherwise the no-op converter."""
+    converter = LibreOfficePdfConverter(workers)
+    if converter.available():
+        return converter
+    logging.getLogger(__name__).info("LibreOffice not found, PDF export disabled")
+    return NullPdfConverter()
+
+
+@dataclass
+class PdfResult:
+    docx_path: Path
+    pdf_path: Optional[Path]
+    error: Optional[str] = None
+    skipped: bool = False
+
+
+def find_documents(folder: Union[str, Path]) -> List[Path]:
+    """All .docx below folder, without Word lock files (~$...) and unfinished temp files."""
+    return sorted(p for p in Path(folder).rglob("*.docx")
+                  if not p.name.startswith(("~$", ".")) and p.is_file())
+
+
+def convert_folder(folder: Union[str, Path], converter: PdfConverter, max_workers: int = DEFAULT_PDF_WORKERS,
+                   overwrite: bool = False) -> List[PdfResult]:
+    """Convert every document of a (bulk) output folder; each PDF is written next to its .docx.
+
+    At most max_workers conversions run at once. PDFs that are newer than
+    their .docx are skipped unless overwrite is set.
+    """
+    logger = logging.getLogger(__name__)
+
+    def convert_one(docx_path: Path) -> PdfResult:
+        pdf_path = docx_path.with_suffix(".pdf")
+        if not overwrite and pdf_path.exists() and pdf_path.stat().st_mtime >= docx_path.stat().st_mtime:
+            return PdfResult(docx_path, pdf_path, skipped=True)
+        try:
+            return PdfResult(docx_path, converter.convert(docx_path, pdf_path))
+        except Exception as e:
+            logger.error("PDF conversion failed for %s: %s", docx_path, e)
+            return PdfResult(docx_path, None, error=str(e))
+
+    documents = find_documents(folder)
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="pdf-export") as pool:
+        results = list(pool.map(convert_one, documents))
+    converted = sum(1 for r in results if r.error is None and not r.skipped)
+    logger.info("PDF export of %s: %d converted, %d skipped, %d failed", folder, converted,
+                sum(1 for r in results if r.skipped), sum(1 for r in results if r.error))
+    return results
@@ -0,0 +1,138 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from docx.oxml.ns import qn
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{([A-Za-z0-9_]+)\}\}")
+
+W_P = qn('w:p')
+W_T = qn('w:t')
+W_BR = qn('w:br')
+W_TAB = qn('w:tab')
+XML_SPACE = '{http://www.w3.org/XML/1998/namespace}space'
+
+_BREAKS = re.compile(r"(\n|\t)")
+
+
+def placeholder(name: str) -> str:
+    return f"{{{{{name}}}}}"
+
+
+def owning_paragraph(element):
+    """Nearest enclosing w:p (text boxes nest paragraphs inside paragraphs)."""
+    parent = element.getparent()
+    while parent is not None and parent.tag != W_P:
+        parent = parent.getparent()
+    return parent
+
+
+def paragraph_text_nodes(p) -> List:
+    """w:t elements that belong to this paragraph itself, not to nested text-box paragraphs."""
+    return [t for t in p.iter(W_T) if owning_paragraph(t) is p]
+
+
+def _write_text(t, text: str):
+    """Set the text of a w:t node; line breaks and tabs become w:br/w:tab in the same run."""
+    t.set(XML_SPACE, 'preserve')
+    if '\n' not in text and '\t' not in text:
+        t.text = text
+        return
+    pieces = _BREAKS.split(text)
+    t.text = pieces[0]
+    anchor = t
+    for piece in pieces[1:]:
+        if piece == '\n':
+            element = t.makeelement(W_BR, {})
+        elif piece == '\t':
+            element = t.makeelement(W_TAB, {})
+        elif piece:
+            element = t.makeelement(W_T, {XML_SPACE: 'preserve'})
+            element.text = piece
+        else:
+            continue
+        anchor.addnext(element)
+        anchor = element
+
+
+class PlaceholderEngine:
+    """Replaces {{name}} placeholders with one compiled alternation per value set.
+
+    Matching runs over the concatenated w:t text of a paragraph, so placeholders
+    Word has split across runs are found. The replacement goes into the run
+    where the placeholder starts (keeping that run's formatting); the rest of
+    the placeholder is cut out of the following runs. Runs without a match are
+    not touched.
+    """
+
+    def __init__(self, values: Dict[str, str]):
+        self.values = {placeholder(name): value if value is not None else '' for name, value in values.items()}
+        tokens = sorted(self.values, key=len, reverse=True)
+        self.pattern: Optional[re.Pattern] = re.compile('|'.join(map(re.escape, tokens))) if tokens else None
+
+    def substitute_paragraph(self, p, nodes: Optional[List] = None) -> int:
+        """Replace placeholders in one paragraph. Returns the number of replacements."""
+        if self.pattern is None:
+            return 0
+        if nodes is None:
+            nodes = paragraph_text_nodes(p)
+        texts = [t.text or '' for t in nodes]
+        matches = list(self.pattern.finditer(''.join(texts)))
+        if not matches:
+            return 0
+
+        # Node offsets in the original concatenated text
+        starts, ends = [], []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text)
+            ends.append(offset)
+
+        changed = set()
+        node = len(nodes) - 1
+        # Right to left, so earlier offsets stay valid while node texts change
+        for match in reversed(matches):
+            first = self._node_at(starts, ends, match.start(), node)
+            last = self._node_at(starts, ends, match.end() - 1, first)
+            head = texts[first][:match.start() - starts[first]]
+            tail = texts[last][match.end() - starts[last]:]
+            replacement = self.values[match.group(0)]
+            if first == last:
+                texts[first] = head + replacement + tail
+            else:
+                texts[first] = head + replacement
+                for middle in range(first + 1, last):
+                    texts[middle] = ''
+                texts[last] = tail
+                changed.update(range(first + 1, last + 1))
+            changed.add(first)
+            node = first
+
+        for index in sorted(changed, reverse=True):
+            _write_text(nodes[index], texts[index])
+        return len(matches)
+
+    @staticmethod
+    def _node_at(starts, ends, position: int, hint: int) -> int:
+        # Index of the node holding position; searches from hint in either direction
+        index = hint
+        while index > 0 and starts[index] > position:
+            index -= 1
+        while index < len(starts) - 1 and position >= ends[index]:
+            index += 1
+        return index
+
+    def substitute_tree(self, root) -> Tuple[int, int]:
+        """One pass over all paragraphs of a part (body, header, footer incl. text boxes).
+
+        Returns (paragraphs changed, replacements).
+        """
+        if self.pattern is None:
+            return 0, 0
+        paragraphs = replaced = 0
+        for p in list(root.iter(W_P)):
+            count = self.substitute_paragraph(p)
+            if count:
+                paragraphs += 1
+                replaced += count
+        return paragraphs, replaced
@@ -0,0 +1,239 @@
+import logging
+import logging.handlers
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from .logging_setup import ContextFilter, DeferredQueueHandler, log_context
+from .word_generator import RenderedDocument, WordDocumentGenerator
+
+DEFAULT_RENDER_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+
+@dataclass
+class RenderJob:
+    """Everything a worker needs to write one document; must stay picklable."""
+    concept: Dict[str, Any]
+    output_dir: str
+    project_name: Optional[str] = None
+    initiator: Optional[str] = None
+    upwork_link: Optional[str] = None
+    description: Optional[str] = None
+    skip_path_warnings: bool = True
+    log_context: Dict[str, Any] = field(default_factory=dict)
+
+
+# --- Worker process side ---
+
+_worker_generator = None
+
+
+def _init_worker(template_path: Optional[str], output_directory: str, log_queue, log_level: int):
+    """Runs once per worker: route logging to the parent, import python-docx and preload the template."""
+    global _worker_generator
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    if log_queue is not None:
+        handler = DeferredQueueHandler(log_queue)
+        handler.addFilter(ContextFilter())
+        root.addHandler(handler)
+    root.setLevel(log_level)
+    _worker_generator = _make_generator(template_path, output_directory)
+    logging.getLogger(__name__).debug("Render worker %d ready", os.getpid())
+
+
+def _make_generator(template_path: Optional[str], output_directory: str) -> WordDocumentGenerator:
+    generator = WordDocumentGenerator(output_directory)
+    if template_path and os.path.exists(template_path):
+        generator.set_template(template_path)
+        # Parse, compile and prepare the zip fast path now instead of on the first job
+        generator.template_compiler.load(template_path).zip_template()
+    return generator
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _render_job(job: RenderJob) -> str:
+    return _render_with(_worker_generator, job)
+
+
+def _render_bytes_job(job: RenderJob) -> RenderedDocument:
+    return _render_bytes_with(_worker_generator, job)
+
+
+def _render_with(generator, job: RenderJob) -> str:
+    with log_context(**job.log_context):
+        return generator.create_document(
+            job.concept,
+            project_name=job.project_name,
+            initiator=job.initiator,
+            upwork_link=job.upwork_link,
+            description=job.description,
+            skip_path_warnings=job.skip_path_warnings,
+            output_dir=job.output_dir,
+        )
+
+
+def _render_bytes_with(generator, job: RenderJob) -> RenderedDocument:
+    with log_context(**job.log_context):
+        return generator.render_document(
+            job.concept,
+            project_name=job.project_name,
+            initiator=job.initiator,
+            upwork_link=job.upwork_link,
+            description=job.description,
+        )
+
+
+class _ForwardToLoggers(logging.Handler):
+    """Re-emits worker records through the parent's loggers (and so its queue logging)."""
+
+    def handle(self, record):
+        logger = logging.getLogger(record.name)
+        if logger.isEnabledFor(record.levelno):
+            logger.handle(record)
+        return True
+
+
+# --- Parent side ---
+
+class RenderService:
+    """Renders documents on a pool of long-lived worker processes.
+
+    Each worker imports python-docx and preloads the template once, so jobs
+    only pay for filling and writing the document. Rendering runs outside
+    the generating process's GIL and overlaps with the next LLM call. Jobs
+    carry their output directory; nothing shared is mutated per job.
+    With workers=0 (or if the pool breaks) jobs are rendered in-process,
+    with one generator per calling thread.
+    """
+
+    def __init__(self, template_path: Optional[str] = None, output_directory: str = "output",
+                 workers: Optional[int] = None):
+        self.logger = logging.getLogger(__name__)
+        self.template_path = template_path
+        self.output_directory = output_directory
+        self.workers = DEFAULT_RENDER_WORKERS if workers is None else max(0, workers)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._log_queue = None
+        self._log_listener: Optional[logging.handlers.QueueListener] = None
+        self._local = threading.local()  # Generator pro Thread für das Rendern im eigenen Prozess
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+
+    def set_template(self, template_path: Optional[str]):
+        """Change the template; workers are restarted (warm) on the next job."""
+        if template_path == self.template_path:
+            return
+        self.shutdown()
+        self.template_path = template_path
+        self._local = threading.local()
+
+    def _ensure_pool(self) -> Optional[ProcessPoolExecutor]:
+        with self._lock:
+            if self._pool is None and self.workers > 0:
+                # spawn everywhere: fork would copy the logging/GUI threads' locks into the workers
+                context = multiprocessing.get_context("spawn")
+                self._log_queue = context.Queue()
+                self._log_listener = logging.handlers.QueueListener(self._log_queue, _ForwardToLoggers())
+                self._log_listener.start()
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=context,
+                    initializer=_init_worker,
+                    initargs=(self.template_path, self.output_directory, self._log_queue,
+                              logging.getLogger().getEffectiveLevel()),
+                )
+                self.logger.info("Render pool started with %d workers", self.workers)
+            return self._pool
+
+    def start(self):
+        """Spawn and warm all workers now, e.g. while the first concept is still being generated."""
+        pool = self._ensure_pool()
+        if pool is not None:
+            for _ in range(self.workers):
+                pool.submit(_ping)
+        return self
+
+    def _local_generator(self) -> WordDocumentGenerator:
+        generator = getattr(self._local, "generator", None)
+        if generator is None:
+            generator = self._local.generator = _make_generator(self.template_path, self.output_directory)
+        return generator
+
+    def _render_local(self, local_func, job: RenderJob) -> Future:
+        future: Future = Future()
+        try:
+            future.set_result(local_func(self._local_generator(), job))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def _fall_back(self, error: Exception):
+        with self._lock:
+            if self.workers == 0:
+                return  # ein anderer Thread hat den Ausfall schon behandelt
+            self.workers = 0
+        self.logger.error("Render pool unavailable (%s), rendering in-process from now on", error)
+        self.shutdown(wait=False)
+
+    def _submit(self, worker_func, local_func, job: RenderJob) -> Future:
+        pool = self._ensure_pool()
+        if pool is None:
+            return self._render_local(local_func, job)
+        try:
+            return pool.submit(worker_func, job)
+        except (BrokenProcessPool, RuntimeError, OSError) as e:
+            self._fall_back(e)
+            return self._render_local(local_func, job)
+
+    def _run(self, worker_func, local_func, job: RenderJob):
+        future = self._submit(worker_func, local_func, job)
+        try:
+            return future.result()
+        except BrokenProcessPool as e:
+            # Ein Worker ist mitten im Job gestorben: alle laufenden Jobs scheitern so, jeder wird hier neu gerendert
+            self._fall_back(e)
+            self.logger.warning("Render worker died, rendering %s in-process", job.project_name or "document")
+            return local_func(self._local_generator(), job)
+
+    def submit(self, job: RenderJob) -> Future:
+        """Queue a job; the future resolves to the path of the written document.
+
+        result() raises BrokenProcessPool if the worker died; render() retries such jobs in-process.
+        """
+        return self._submit(_render_job, _render_with, job)
+
+    def submit_render(self, job: RenderJob) -> Future:
+        """Queue a job that only renders; the future resolves to a RenderedDocument (bytes, nothing written)."""
+        return self._submit(_render_bytes_job, _render_bytes_with, job)
+
+    def render(self, job: RenderJob) -> str:
+        """Like submit(job).result(), but a job lost to a crashed worker is rendered again in-process."""
+        return self._run(_render_job, _render_with, job)
+
+    def render_bytes(self, job: RenderJob) -> RenderedDocument:
+        """Like submit_render(job).result(), with the same in-process retry as render()."""
+        return self._run(_render_bytes_job, _render_bytes_with, job)
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=wait)
+                self._pool = None
+            if self._log_listener is not None:
+                self._log_listener.stop()
+                self._log_listener = None
+            self._log_queue = None
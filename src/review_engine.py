@@ -0,0 +1,162 @@
+import re
+import logging
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from .section_registry import CompiledSection, SectionConfig
+
+_WORD = re.compile(r"\w+")
+
+# ASCII bytes -> themselves for \w characters, space otherwise (bytes.translate table)
+_ASCII_WORDS = bytes(c if chr(c).isalnum() or c == ord("_") else ord(" ") for c in range(128)) + b" " * 128
+
+# Length bonuses added to the requirement coverage (same scale as the alignment threshold)
+TARGET_MET_BONUS = 0.15
+MINIMUM_MET_BONUS = 0.05
+
+# (words of the term, requirements it covers)
+_TermMatcher = Tuple[Tuple[Tuple[str, ...], FrozenSet[Tuple[str, int]]], ...]
+
+
+def _words(text: str) -> List[str]:
+    """The \\w+ runs of text; ASCII text (almost every candidate) is split without the regex engine."""
+    if text.isascii():
+        return text.encode("ascii").translate(_ASCII_WORDS).decode("ascii").split()
+    return _WORD.findall(text)
+
+
+def _phrase_at_word_start(words: List[str], term: Tuple[str, ...]) -> bool:
+    """True if the words of a multi-word term follow each other (the last one as a prefix)."""
+    first, last = term[0], len(term) - 1
+    pos = -1
+    while True:
+        try:
+            pos = words.index(first, pos + 1)
+        except ValueError:
+            return False
+        following = words[pos:pos + len(term)]
+        if len(following) == len(term) and following[1:last] == list(term[1:last]) and following[last].startswith(term[last]):
+            return True
+
+
+@dataclass(frozen=True)
+class TextStats:
+    """Result of one pass over a candidate text."""
+    word_count: int
+    char_count: int
+    matched: FrozenSet[Tuple[str, int]]  # (section_key, requirement_index)
+
+    def covered(self, key: str) -> FrozenSet[int]:
+        return frozenset(idx for section_key, idx in self.matched if section_key == key)
+
+
+@dataclass(frozen=True)
+class SectionReview:
+    """Length and coverage verdict for one section candidate."""
+    key: str
+    word_count: int
+    min_words: int
+    max_words: int
+    alignment_score: Optional[float]
+    covered_requirements: Tuple[str, ...]
+    missing_requirements: Tuple[str, ...]
+
+    @property
+    def length_ok(self) -> bool:
+        return self.min_words <= self.word_count <= self.max_words
+
+
+class ReviewEngine:
+    """Precompiled matcher for the section requirement terms.
+
+    A term matches when a word begins with it ("test" matches "testing", but
+    "ui" does not match "build"). Candidates are split into \\w+ words once;
+    each term is then looked up in the sorted unique words with a binary
+    search, so a review only pays for the terms of the sections it asks for.
+    """
+
+    def __init__(self, config: SectionConfig):
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+
+        self._matchers: Dict[str, _TermMatcher] = {}
+        all_targets: Dict[Tuple[str, ...], set] = {}
+        for key, section in config.sections.items():
+            term_targets: Dict[Tuple[str, ...], set] = {}
+            for idx, terms in enumerate(section.requirement_terms):
+                for term in terms:
+                    words = tuple(_words(term.lower()))
+                    if words:
+                        term_targets.setdefault(words, set()).add((key, idx))
+                        all_targets.setdefault(words, set()).add((key, idx))
+            self._matchers[key] = tuple((words, frozenset(targets)) for words, targets in term_targets.items())
+        # Ohne Abschnittsangabe: jeden Begriff nur einmal prüfen, auch wenn mehrere Abschnitte ihn nutzen
+        self._all_sections: _TermMatcher = tuple((words, frozenset(targets)) for words, targets in all_targets.items())
+        self.logger.debug("Review engine compiled: %d terms across %d sections", len(all_targets), len(config.sections))
+
+    def analyze(self, content: str, sections: Optional[Iterable[str]] = None) -> TextStats:
+        """Count words and collect the matched requirements of the given sections (default: all)."""
+        # Terms are lowercase; one lower() copy is cheaper than case-insensitive comparisons
+        words = _words(content.lower())
+        sorted_words = sorted(set(words))
+        if sections is None:
+            matchers = (self._all_sections,)
+        else:
+            matchers = [self._matchers[key] for key in sections if key in self._matchers]
+        end = len(sorted_words)
+        matched = set()
+        for matcher in matchers:
+            for term, targets in matcher:
+                # A word begins with the (last word of the) term iff it sorts right at or after it
+                prefix = term[-1]
+                i = bisect_left(sorted_words, prefix)
+                if i < end and sorted_words[i].startswith(prefix) and (len(term) == 1 or _phrase_at_word_start(words, term)):
+                    matched |= targets
+        return TextStats(word_count=len(words), char_count=len(content), matched=frozenset(matched))
+
+    def analyze_many(self, contents: Iterable[str], sections: Optional[Iterable[str]] = None) -> List[TextStats]:
+        sections = None if sections is None else tuple(sections)
+        return [self.analyze(content, sections) for content in contents]
+
+    def coverage_score(self, section: CompiledSection, stats: TextStats) -> Optional[float]:
+        """Requirement coverage plus length bonus, capped at 1.0 (None without requirements)."""
+        total = len(section.content_requirements)
+        if not total:
+            return None
+        score = len(stats.covered(section.key)) / total
+        return min(score + self.length_bonus(section, stats), 1.0)
+
+    @staticmethod
+    def length_bonus(section: CompiledSection, stats: TextStats) -> float:
+        """Bonus for meeting the target (or at least the minimum) word count."""
+        if section.has_word_count:
+            if stats.word_count >= section.target_words:
+                return TARGET_MET_BONUS
+            if stats.word_count >= section.min_words:
+                return MINIMUM_MET_BONUS
+            return 0.0
+        # Fallback length bonus for older content
+        bonus = 0.0
+        if stats.char_count > 200:
+            bonus += 0.1
+        if stats.char_count > 500:
+            bonus += 0.05
+        return bonus
+
+    def review(self, key: str, content: str, stats: Optional[TextStats] = None) -> Optional[SectionReview]:
+        section = self.config.get(key)
+        if section is None:
+            return None
+        stats = stats or self.analyze(content, sections=(key,))
+        covered = stats.covered(key)
+        requirements = section.content_requirements
+        return SectionReview(
+            key=key,
+            word_count=stats.word_count,
+            min_words=section.min_words,
+            max_words=section.max_words,
+            alignment_score=self.coverage_score(section, stats),
+            covered_requirements=tuple(r for i, r in enumerate(requirements) if i in covered),
+            missing_requirements=tuple(r for i, r in enumerate(requirements) if i not in covered),
+        )
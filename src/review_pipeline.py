@@ -0,0 +1,156 @@
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+
+from .review_engine import TextStats
+from .section_registry import CompiledSection
+
+# A scorer returns an alignment score in [0, 1], or None to abstain
+Scorer = Callable[["ReviewContext"], Optional[float]]
+# The AI reviewer returns (score in [0, 1] or None on error, reason)
+AIReviewer = Callable[["ReviewContext"], Tuple[Optional[float], str]]
+
+# Cheap stages only reject candidates this far below the threshold
+HARD_FAIL_MARGIN = 0.25
+# Final scores within this distance of the threshold go to the AI reviewer
+BORDERLINE_MARGIN = 0.1
+
+
+@dataclass
+class ReviewContext:
+    section: CompiledSection
+    content: str
+    stats: TextStats
+    threshold: float
+    provider: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class StageResult:
+    stage: str
+    passed: bool
+    score: Optional[float] = None
+    reason: str = ""
+
+
+@dataclass
+class ReviewDecision:
+    accepted: bool
+    reason: str
+    score: Optional[float] = None
+    stages: List[StageResult] = field(default_factory=list)
+    pending_ai: bool = False  # Provisionally accepted, waiting for a batched AI review
+
+    @property
+    def ai_reviewed(self) -> bool:
+        return any(stage.stage == "ai_review" for stage in self.stages)
+
+
+class ReviewBudget:
+    """Per-document limit for AI review calls (thread-safe)."""
+
+    def __init__(self, max_calls: int):
+        self.max_calls = max(0, int(max_calls))
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def try_consume(self) -> bool:
+        with self._lock:
+            if self.used >= self.max_calls:
+                return False
+            self.used += 1
+            return True
+
+    @property
+    def remaining(self) -> int:
+        return self.max_calls - self.used
+
+
+class ReviewPipeline:
+    """Ordered section review, cheapest check first.
+
+    1. length      - hard failure when the word count is out of bounds
+    2. scorers     - term coverage, then any registered scorers; each stage
+                     only rejects clear failures, the last score that is not
+                     None is the decision score
+    3. ai_review   - only for borderline decision scores and only while the
+                     per-document budget lasts; with defer_ai the candidate is
+                     accepted provisionally and reviewed later in one batch
+    """
+
+    def __init__(self, hard_fail_margin: float = HARD_FAIL_MARGIN, borderline_margin: float = BORDERLINE_MARGIN):
+        self.hard_fail_margin = hard_fail_margin
+        self.borderline_margin = borderline_margin
+        self.logger = logging.getLogger(__name__)
+        self._scorers: List[Tuple[str, Scorer]] = []
+        self._ai_reviewer: Optional[AIReviewer] = None
+
+    def register_scorer(self, name: str, scorer: Scorer):
+        """Append a scorer; registering an existing name replaces it in place."""
+        for i, (existing, _) in enumerate(self._scorers):
+            if existing == name:
+                self._scorers[i] = (name, scorer)
+                return
+        self._scorers.append((name, scorer))
+
+    def unregister_scorer(self, name: str):
+        self._scorers = [(n, s) for n, s in self._scorers if n != name]
+
+    @property
+    def scorer_names(self) -> List[str]:
+        return [name for name, _ in self._scorers]
+
+    def set_ai_reviewer(self, reviewer: Optional[AIReviewer]):
+        self._ai_reviewer = reviewer
+
+    def run(self, ctx: ReviewContext, budget: Optional[ReviewBudget] = None, defer_ai: bool = False) -> ReviewDecision:
+        stages: List[StageResult] = []
+        section = ctx.section
+
+        # 1. Length
+        words = ctx.stats.word_count
+        if words < section.min_words or words > section.max_words:
+            reason = f"Section length out of bounds: {words} words (min {section.min_words}, max {section.max_words})"
+            stages.append(StageResult("length", False, reason=reason))
+            return ReviewDecision(False, reason, None, stages)
+        stages.append(StageResult("length", True))
+
+        # 2. Scorers (term coverage first, registered scorers after it)
+        score = None
+        for name, scorer in self._scorers:
+            stage_score = scorer(ctx)
+            if stage_score is None:
+                stages.append(StageResult(name, True, reason="abstained"))
+                continue
+            score = stage_score
+            self.logger.debug("Review stage %s: %.2f", name, stage_score)
+            if stage_score < ctx.threshold - self.hard_fail_margin:
+                reason = f"Content does not align well with section requirements (alignment score: {stage_score:.2f})"
+                stages.append(StageResult(name, False, stage_score, reason))
+                return ReviewDecision(False, reason, stage_score, stages)
+            stages.append(StageResult(name, True, stage_score))
+
+        if score is None:
+            stages.append(StageResult("alignment", True, reason="no scorer available"))
+            return ReviewDecision(True, "ok", None, stages)
+
+        # 3. AI review for borderline candidates only
+        if (self._ai_reviewer is not None and abs(score - ctx.threshold) < self.borderline_margin
+                and budget is not None and budget.try_consume()):
+            if defer_ai:
+                stages.append(StageResult("ai_review_deferred", True, score))
+                return ReviewDecision(True, "ok", score, stages, pending_ai=True)
+            ai_score, ai_reason = self._ai_reviewer(ctx)
+            if ai_score is not None:
+                passed = ai_score >= ctx.threshold
+                reason = "ok" if passed else f"AI review rejected the section (score: {ai_score:.2f}): {ai_reason}"
+                stages.append(StageResult("ai_review", passed, ai_score, ai_reason))
+                return ReviewDecision(passed, reason, ai_score, stages)
+            self.logger.warning("AI review failed, using local score: %s", ai_reason)
+            stages.append(StageResult("ai_review", True, reason=ai_reason))
+
+        if score < ctx.threshold:
+            reason = f"Content does not align well with section requirements (alignment score: {score:.2f})"
+            return ReviewDecision(False, reason, score, stages)
+        return ReviewDecision(True, "ok", score, stages)
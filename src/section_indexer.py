@@ -0,0 +1,75 @@
+import re
+import logging
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from .section_registry import SectionConfig
+
+_MARKUP = r"(?:\*\*|__|\*|_)?"
+
+
+def _title_pattern(title: str) -> str:
+    """Escaped title with flexible whitespace ("CI/CD  Pipelines" still matches)."""
+    return r"[ \t]+".join(re.escape(word) for word in title.split())
+
+
+def build_header_pattern(titles: Mapping[str, str]) -> re.Pattern:
+    """Compile one header regex for all section titles.
+
+    A header is a line that consists of an optional markdown heading marker,
+    optional numbering ("3." / "3)" / "Section 3:"), the title and optional
+    trailing punctuation. Text after a ':' or dash on the header line is
+    captured as inline content. Each title alternative is a named group
+    ``s<n>`` that identifies the matching section.
+    """
+    alternatives = []
+    # Longest titles first so a title that prefixes another cannot win
+    for index, (key, title) in enumerate(sorted(titles.items(), key=lambda kv: -len(kv[1]))):
+        alternatives.append(f"(?P<s{index}>{_title_pattern(title)})")
+    return re.compile(
+        r"^[ \t]*(?:#{1,6}[ \t]*)?" + _MARKUP +
+        r"[ \t]*(?:(?:section[ \t]+)?\d{1,2}[.):][ \t]*)?" + _MARKUP + r"[ \t]*"
+        r"(?:" + "|".join(alternatives) + r")"
+        r"[ \t]*" + _MARKUP + r"[ \t]*(?:[:.\-–][ \t]*" + _MARKUP + r"[ \t]*(?P<inline>[^\n]*?))?[ \t]*" + _MARKUP + r"[ \t]*$",
+        re.IGNORECASE | re.MULTILINE,
+    )
+
+
+class SectionIndexer:
+    """Finds all section boundaries of a combined concept response in one pass.
+
+    The header regex is built from the configured section titles, so adding a
+    section to section_descriptions.json needs no code change. Every section
+    runs from the end of its header line to the start of the next header.
+    """
+
+    def __init__(self, config: SectionConfig):
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+        titles = config.titles
+        ordered = sorted(titles.items(), key=lambda kv: -len(kv[1]))
+        self._group_keys = {f"s{index}": key for index, (key, _) in enumerate(ordered)}
+        self._pattern = build_header_pattern(titles)
+
+    def find_headers(self, text: str) -> List[Tuple[str, int, int, Optional[str]]]:
+        """Return (key, header_start, header_end, inline_text) for each header in order."""
+        headers = []
+        for m in self._pattern.finditer(text):
+            key = next(key for group, key in self._group_keys.items() if m.start(group) != -1)
+            headers.append((key, m.start(), m.end(), m.group("inline")))
+        return headers
+
+    def split(self, text: str) -> Dict[str, str]:
+        """Map section key -> content for every section found (first occurrence wins)."""
+        headers = self.find_headers(text)
+        sections: Dict[str, str] = {}
+        for i, (key, _, end, inline) in enumerate(headers):
+            if key in sections:
+                self.logger.debug("Duplicate header for section %s ignored", key)
+                continue
+            next_start = headers[i + 1][1] if i + 1 < len(headers) else len(text)
+            body = text[end:next_start].strip()
+            if inline:
+                body = f"{inline.strip()}\n{body}".strip() if body else inline.strip()
+            sections[key] = body
+        self.logger.debug("Indexed %d section headers, %d sections", len(headers), len(sections))
+        return sections
@@ -0,0 +1,269 @@
+import os
+import json
+import logging
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+SECTION_DESCRIPTIONS_PATH = "section_descriptions.json"
+
+# Default word limit for sections without a "word_count" block (half a page)
+DEFAULT_MAX_WORDS = 250
+
+# Defaults used when a "word_count" block is present but incomplete
+DEFAULT_WORD_COUNT = {"target": 70, "min": 30, "max": 100}
+
+STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
+    'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did',
+    'will', 'would', 'could', 'should', 'may', 'might', 'can', 'must', 'shall',
+    'how', 'what', 'when', 'where', 'why', 'which', 'who', 'whom',
+    'this', 'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they',
+    'me', 'him', 'her', 'us', 'them', 'my', 'your', 'his', 'its', 'our', 'their',
+    'mine', 'yours', 'hers', 'ours', 'theirs',
+})
+
+# Common variations and synonyms added to the key terms of a requirement
+TERM_VARIATIONS = MappingProxyType({
+    'test': ('testing', 'tested', 'tests'),
+    'security': ('secure', 'secured', 'security'),
+    'performance': ('performant', 'performance'),
+    'scalability': ('scalable', 'scale', 'scaling'),
+    'monitoring': ('monitor', 'monitored', 'monitors'),
+    'deployment': ('deploy', 'deployed', 'deploying'),
+    'integration': ('integrate', 'integrated', 'integrates'),
+    'architecture': ('architectural', 'architect'),
+    'technology': ('tech', 'technological'),
+    'framework': ('frameworks',),
+    'api': ('apis', 'application programming interface'),
+    'database': ('db', 'databases'),
+    'cloud': ('cloud-based', 'cloud-native'),
+    'container': ('containers', 'containerization'),
+    'orchestration': ('orchestrate', 'orchestrated'),
+    'automation': ('automated', 'automate'),
+    'quality': ('qualitative', 'quality assurance'),
+    'accessibility': ('accessible', 'accessibility'),
+    'responsive': ('responsiveness', 'responsive design'),
+    'prototype': ('prototyping', 'prototyped'),
+    'user experience': ('ux', 'user experience'),
+    'user interface': ('ui', 'user interface'),
+})
+
+
+class SectionConfigError(ValueError):
+    """Raised when section_descriptions.json does not match the expected schema."""
+
+
+@lru_cache(maxsize=4096)
+def extract_key_terms(requirement: str) -> Tuple[str, ...]:
+    """Extract key terms (plus known variations) from a content requirement."""
+    key_terms = []
+    for word in requirement.lower().split():
+        clean_word = ''.join(c for c in word if c.isalnum())
+        if clean_word and len(clean_word) > 2 and clean_word not in STOP_WORDS:
+            key_terms.append(clean_word)
+
+    additional_terms = []
+    for term in key_terms:
+        additional_terms.extend(TERM_VARIATIONS.get(term, ()))
+
+    # dict.fromkeys keeps the order stable while removing duplicates
+    return tuple(dict.fromkeys(key_terms + additional_terms))
+
+
+def extract_max_words_from_description(description: str) -> Optional[int]:
+    """Extract maximum word count from description text (all sections use half a page)."""
+    return DEFAULT_MAX_WORDS
+
+
+def get_word_count_tolerance(max_words: int) -> Tuple[int, int]:
+    """Get the acceptable word count range: 60% of max_words up to max_words + 30%."""
+    tolerance = int(max_words * 0.3)
+    min_words = int(max_words * 0.6)
+    return min_words, max_words + tolerance
+
+
+def build_word_count_instruction(min_words: int, max_words: int, target_words: int) -> str:
+    return f"\n\nWORD COUNT REQUIREMENTS:\n- Minimum: {min_words} words\n- Maximum: {max_words} words\n- Target: {target_words} words\n\n"
+
+
+@dataclass(frozen=True)
+class CompiledSection:
+    """A validated section entry with all derived data precomputed."""
+    key: str
+    title: str
+    description: str
+    content_requirements: Tuple[str, ...]
+    min_words: int
+    max_words: int
+    target_words: int
+    has_word_count: bool
+    requirement_terms: Tuple[Tuple[str, ...], ...]
+    word_count_instruction: str
+    prompt_instructions: str
+    raw: Mapping[str, Any] = field(repr=False)
+
+
+@dataclass(frozen=True)
+class SectionConfig:
+    """Immutable snapshot of the section configuration."""
+    sections: Mapping[str, CompiledSection]
+    raw: Mapping[str, Any] = field(repr=False)
+    source: str
+    mtime_ns: Optional[int] = None
+
+    def get(self, key: str) -> Optional[CompiledSection]:
+        return self.sections.get(key)
+
+    @property
+    def titles(self) -> Dict[str, str]:
+        return {key: section.title for key, section in self.sections.items()}
+
+
+def _int_field(word_count: Mapping[str, Any], name: str, key: str) -> int:
+    value = word_count.get(name, DEFAULT_WORD_COUNT[name])
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        raise SectionConfigError(f"Section '{key}': word_count.{name} must be a non-negative number")
+    return int(value)
+
+
+def compile_section(key: str, data: Mapping[str, Any]) -> CompiledSection:
+    """Validate one section entry and precompile its derived data."""
+    title = data.get("title")
+    if not isinstance(title, str) or not title.strip():
+        raise SectionConfigError(f"Section '{key}': 'title' must be a non-empty string")
+    description = data.get("description", "")
+    if not isinstance(description, str):
+        raise SectionConfigError(f"Section '{key}': 'description' must be a string")
+    requirements = data.get("content_requirements", [])
+    if not isinstance(requirements, list) or not all(isinstance(r, str) for r in requirements):
+        raise SectionConfigError(f"Section '{key}': 'content_requirements' must be a list of strings")
+
+    word_count = data.get("word_count")
+    if word_count is not None:
+        if not isinstance(word_count, dict):
+            raise SectionConfigError(f"Section '{key}': 'word_count' must be an object")
+        min_words = _int_field(word_count, "min", key)
+        max_words = _int_field(word_count, "max", key)
+        target_words = _int_field(word_count, "target", key)
+        if min_words > max_words:
+            raise SectionConfigError(f"Section '{key}': word_count.min ({min_words}) is greater than max ({max_words})")
+        instruction = build_word_count_instruction(min_words, max_words, target_words)
+    else:
+        target_words = extract_max_words_from_description(description) or DEFAULT_MAX_WORDS
+        min_words, max_words = get_word_count_tolerance(target_words)
+        instruction = build_word_count_instruction(min_words, max_words, target_words)
+
+    prompt_instructions = (
+        f"\n\nInstructions:\n{description}{instruction}"
+        "Output ONLY the content for this section. Do NOT include the section header or any other text. "
+        "Do NOT include any diagram or code block."
+    )
+
+    return CompiledSection(
+        key=key,
+        title=title,
+        description=description,
+        content_requirements=tuple(requirements),
+        min_words=min_words,
+        max_words=max_words,
+        target_words=target_words,
+        has_word_count=word_count is not None,
+        requirement_terms=tuple(extract_key_terms(r) for r in requirements),
+        word_count_instruction=instruction,
+        prompt_instructions=prompt_instructions,
+        raw=MappingProxyType(dict(data)),
+    )
+
+
+def compile_config(raw: Mapping[str, Any], source: str, mtime_ns: Optional[int] = None,
+                   logger: Optional[logging.Logger] = None) -> SectionConfig:
+    """Validate a loaded descriptions mapping and compile all section entries."""
+    logger = logger or logging.getLogger(__name__)
+    if not isinstance(raw, dict):
+        raise SectionConfigError("Section descriptions must be a JSON object")
+
+    sections = {}
+    for key, data in raw.items():
+        # Skip documentation or other non-section entries
+        if key.startswith("_") or not isinstance(data, dict) or "title" not in data:
+            logger.debug("Skipping non-section entry: %s", key)
+            continue
+        try:
+            sections[key] = compile_section(key, data)
+        except SectionConfigError as e:
+            logger.warning("Invalid section configuration skipped: %s", e)
+
+    if not sections:
+        raise SectionConfigError(f"No valid sections found in {source}")
+    return SectionConfig(sections=MappingProxyType(sections), raw=MappingProxyType(dict(raw)),
+                         source=source, mtime_ns=mtime_ns)
+
+
+class SectionRegistry:
+    """Loads section_descriptions.json once and hot-reloads it when its mtime changes.
+
+    Readers get an immutable SectionConfig snapshot, so one registry can be shared
+    across worker threads; only the reload itself is serialized.
+    """
+
+    def __init__(self, json_path: str = SECTION_DESCRIPTIONS_PATH,
+                 fallback_loader: Optional[Callable[[], Dict[str, Any]]] = None):
+        self.json_path = json_path
+        self.fallback_loader = fallback_loader
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._config: Optional[SectionConfig] = None
+        self._seen_stamp = None  # (mtime_ns, size) of the last file we attempted to load
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.json_path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def get(self) -> SectionConfig:
+        """Return the current configuration, reloading only if the file changed."""
+        stamp = self._file_stamp()
+        config = self._config
+        if config is not None and stamp == self._seen_stamp:
+            return config
+        with self._lock:
+            if self._config is not None and stamp == self._seen_stamp:
+                return self._config
+            self._reload(stamp)
+            return self._config
+
+    def invalidate(self):
+        """Force a reload on the next get()."""
+        with self._lock:
+            self._seen_stamp = object()
+
+    def _reload(self, stamp):
+        self._seen_stamp = stamp
+        if stamp is not None:
+            try:
+                self.logger.info("Loading section descriptions from JSON file: %s", self.json_path)
+                with open(self.json_path, 'r', encoding='utf-8') as f:
+                    raw = json.load(f)
+                self._config = compile_config(raw, self.json_path, stamp[0], self.logger)
+                self.logger.info("Compiled %d section descriptions from JSON file", len(self._config.sections))
+                return
+            except (OSError, ValueError) as e:
+                # json.JSONDecodeError and SectionConfigError are both ValueErrors
+                self.logger.warning("Failed to load JSON descriptions: %s", str(e))
+                if self._config is not None and self._config.source == self.json_path:
+                    self.logger.warning("Keeping previously loaded section descriptions")
+                    return
+
+        if self._config is not None and self._config.source != self.json_path:
+            return  # Fallback is already loaded and cannot change
+        self._config = self._load_fallback()
+
+    def _load_fallback(self) -> SectionConfig:
+        raw = self.fallback_loader() if self.fallback_loader else {}
+        self.logger.info("Using fallback section descriptions")
+        return compile_config(raw, "fallback", None, self.logger)
@@ -0,0 +1,149 @@
+import re
+import math
+import logging
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .section_registry import STOP_WORDS, TERM_VARIATIONS, SectionConfig
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Longest suffixes first; the stem must keep at least MIN_STEM characters
+_SUFFIXES = (
+    "izations", "ization", "abilities", "ability", "ations", "ation", "ating", "ments",
+    "ities", "ness", "ment", "ings", "ated", "able", "ible", "ity", "ing", "ate",
+    "ies", "ers", "ed", "es", "er", "ly", "al", "s", "e",
+)
+MIN_STEM = 3
+
+# BM25 parameters for the candidate side
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Cosine similarity at which a requirement counts as fully covered
+FULL_COVERAGE_SIMILARITY = 0.3
+
+
+def _build_synonyms() -> Dict[str, str]:
+    synonyms = {}
+    for canonical, variations in TERM_VARIATIONS.items():
+        for variation in variations:
+            if " " not in variation and " " not in canonical:
+                synonyms[variation] = canonical
+    return synonyms
+
+
+_SYNONYMS = _build_synonyms()
+
+
+def stem(word: str) -> str:
+    """Very small suffix stripper so 'scalable', 'scaling' and 'scalability' share a stem."""
+    word = _SYNONYMS.get(word, word)
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM:
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    return [stem(t) for t in _TOKEN.findall(text.lower()) if t not in STOP_WORDS and len(t) > 1]
+
+
+@lru_cache(maxsize=None)
+def _numpy():
+    """NumPy, imported on first use (only with semantic_alignment); None if not installed."""
+    try:
+        import numpy
+    except ImportError:  # Optional dependency: the scorer is simply unavailable without NumPy
+        return None
+    return numpy
+
+
+def is_available() -> bool:
+    return _numpy() is not None
+
+
+class SemanticAlignmentScorer:
+    """Local TF-IDF/BM25 alignment scorer for section candidates.
+
+    Every content requirement of every section is embedded once as an IDF
+    weighted vector over the (stemmed) requirement vocabulary. Candidates are
+    embedded with BM25-saturated term frequencies, and coverage for a whole
+    batch is one matrix product followed by a masked mean per candidate, so
+    paraphrases that share stems count and off-topic text scores near zero.
+    Runs on NumPy only: no network, no GPU.
+    """
+
+    def __init__(self, config: SectionConfig):
+        np = _numpy()
+        if np is None:
+            raise RuntimeError("NumPy is required for semantic alignment scoring (pip install numpy)")
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+
+        requirement_tokens = []
+        self._section_rows: Dict[str, Tuple[int, int]] = {}
+        for key, section in config.sections.items():
+            start = len(requirement_tokens)
+            for requirement in section.content_requirements:
+                requirement_tokens.append(tokenize(requirement))
+            self._section_rows[key] = (start, len(requirement_tokens))
+
+        vocabulary = sorted({t for tokens in requirement_tokens for t in tokens})
+        self._vocab = {term: i for i, term in enumerate(vocabulary)}
+        n_docs = max(len(requirement_tokens), 1)
+
+        doc_freq = np.zeros(len(vocabulary), dtype=np.float64)
+        for tokens in requirement_tokens:
+            for idx in {self._vocab[t] for t in tokens}:
+                doc_freq[idx] += 1
+        self._idf = np.log1p(n_docs / np.maximum(doc_freq, 1.0))
+
+        matrix = np.zeros((len(requirement_tokens), len(vocabulary)), dtype=np.float64)
+        for row, tokens in enumerate(requirement_tokens):
+            for token in tokens:
+                matrix[row, self._vocab[token]] = 1.0
+        matrix *= self._idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        self._requirements = matrix / np.where(norms == 0, 1.0, norms)
+        self.logger.debug("Semantic scorer compiled: %d requirements, %d terms", len(requirement_tokens), len(vocabulary))
+
+    def _embed(self, contents: Sequence[str]):
+        """BM25 weighted, L2-normalised candidate matrix (n_candidates x vocabulary)."""
+        np = _numpy()
+        counts = np.zeros((len(contents), len(self._vocab)), dtype=np.float64)
+        lengths = np.zeros(len(contents), dtype=np.float64)
+        for row, content in enumerate(contents):
+            tokens = tokenize(content)
+            lengths[row] = len(tokens)
+            indices = [self._vocab[t] for t in tokens if t in self._vocab]
+            if indices:
+                np.add.at(counts[row], indices, 1.0)
+
+        avg_length = lengths.mean() if len(contents) and lengths.mean() > 0 else 1.0
+        norm = BM25_K1 * (1.0 - BM25_B + BM25_B * lengths / avg_length)
+        weights = counts * (BM25_K1 + 1.0) / (counts + norm[:, None])
+        weights *= self._idf
+        norms = np.linalg.norm(weights, axis=1, keepdims=True)
+        return weights / np.where(norms == 0, 1.0, norms)
+
+    def score_batch(self, items: Sequence[Tuple[str, str]]):
+        """Coverage in [0, 1] for each (section_key, content) pair; NaN for sections without requirements."""
+        np = _numpy()
+        if not items:
+            return np.zeros(0)
+        n_requirements = self._requirements.shape[0]
+        mask = np.zeros((len(items), n_requirements), dtype=bool)
+        for row, (key, _) in enumerate(items):
+            start, end = self._section_rows.get(key, (0, 0))
+            mask[row, start:end] = True
+
+        similarity = self._embed([content for _, content in items]) @ self._requirements.T
+        covered = np.clip(similarity / FULL_COVERAGE_SIMILARITY, 0.0, 1.0) * mask
+        totals = mask.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(totals > 0, covered.sum(axis=1) / totals, np.nan)
+
+    def score(self, key: str, content: str) -> Optional[float]:
+        value = float(self.score_batch([(key, content)])[0])
+        return None if math.isnan(value) else value
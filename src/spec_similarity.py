@@ -0,0 +1,132 @@
+import hashlib
+import random
+import re
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+_WORD = re.compile(r"\w+")
+
+# Mersenne prime 2^31-1: (a*x + b) stays below 2^63, so NumPy uint64 and Python ints agree
+_PRIME = (1 << 31) - 1
+
+DEFAULT_NUM_PERM = 128
+# 32 Bänder à 4 Zeilen: Kandidaten ab ca. 0.4 Jaccard-Ähnlichkeit
+DEFAULT_BANDS = 32
+DEFAULT_SHINGLE_SIZE = 3
+
+# Ab dieser Ähnlichkeit wird das Konzept unverändert übernommen, ab ADAPT sektionsweise angepasst
+DEFAULT_REUSE_THRESHOLD = 0.9
+DEFAULT_ADAPT_THRESHOLD = 0.7
+
+
+@lru_cache(maxsize=None)
+def _numpy():
+    """NumPy, imported when the first MinHasher is built; None if not installed."""
+    try:
+        import numpy
+    except ImportError:  # Optional dependency: pure-Python signatures give the same values, just slower
+        return None
+    return numpy
+
+
+def shingles(text: str, size: int = DEFAULT_SHINGLE_SIZE) -> Set[int]:
+    """Hashed word n-grams of the lower-cased text; texts shorter than size give one shingle."""
+    words = _WORD.findall((text or "").lower())
+    if len(words) < size:
+        grams: Iterable[str] = [" ".join(words)] if words else []
+    else:
+        grams = (" ".join(words[i:i + size]) for i in range(len(words) - size + 1))
+    return {int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest(), "little") % _PRIME
+            for g in grams}
+
+
+class MinHasher:
+    """MinHash signatures with num_perm universal hash functions (a*x + b) mod p."""
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.a = [rng.randrange(1, _PRIME) for _ in range(num_perm)]
+        self.b = [rng.randrange(0, _PRIME) for _ in range(num_perm)]
+        self._np = np = _numpy()
+        if np is not None:
+            self._a = np.array(self.a, dtype=np.uint64)[:, None]
+            self._b = np.array(self.b, dtype=np.uint64)[:, None]
+
+    def signature(self, hashes: Set[int]) -> Tuple[int, ...]:
+        if not hashes:
+            return (_PRIME,) * self.num_perm
+        np = self._np
+        if np is not None:
+            x = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))[None, :]
+            return tuple(int(v) for v in ((self._a * x + self._b) % _PRIME).min(axis=1))
+        return tuple(min((a * x + b) % _PRIME for x in hashes) for a, b in zip(self.a, self.b))
+
+
+def estimate_similarity(sig1: Sequence[int], sig2: Sequence[int]) -> float:
+    """Estimated Jaccard similarity: share of equal signature positions."""
+    return sum(1 for x, y in zip(sig1, sig2) if x == y) / len(sig1)
+
+
+class SpecSimilarityIndex:
+    """Locality-sensitive hashing index over spec descriptions.
+
+    Signatures are split into bands; two specs become candidates when any
+    band matches exactly, and candidates are ranked by their estimated
+    Jaccard similarity. Lookups stay roughly constant per spec instead of
+    comparing every pair.
+    """
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, bands: int = DEFAULT_BANDS,
+                 shingle_size: int = DEFAULT_SHINGLE_SIZE, hasher: Optional[MinHasher] = None):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.hasher = hasher or MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.signatures: Dict[Hashable, Tuple[int, ...]] = {}
+        self._buckets: List[Dict[Tuple[int, ...], List[Hashable]]] = [defaultdict(list) for _ in range(bands)]
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        return self.hasher.signature(shingles(text, self.shingle_size))
+
+    def _bands(self, sig: Tuple[int, ...]):
+        for band in range(self.bands):
+            yield band, sig[band * self.rows:(band + 1) * self.rows]
+
+    def add(self, key: Hashable, text: str) -> Tuple[int, ...]:
+        sig = self.signature(text)
+        self.signatures[key] = sig
+        for band, chunk in self._bands(sig):
+            self._buckets[band][chunk].append(key)
+        return sig
+
+    def query(self, text: str, threshold: float = 0.0) -> List[Tuple[Hashable, float]]:
+        """Indexed keys similar to text, most similar first."""
+        sig = self.signature(text)
+        candidates = set()
+        for band, chunk in self._bands(sig):
+            candidates.update(self._buckets[band].get(chunk, ()))
+        matches = [(key, estimate_similarity(sig, self.signatures[key])) for key in candidates]
+        return sorted((m for m in matches if m[1] >= threshold), key=lambda m: -m[1])
+
+
+def cluster_near_duplicates(specs: Sequence[Tuple[Hashable, str]], threshold: float = DEFAULT_ADAPT_THRESHOLD,
+                            index: Optional[SpecSimilarityIndex] = None) -> Dict[Hashable, Tuple[Hashable, float]]:
+    """Assign every spec that is similar enough to an earlier one to that spec.
+
+    Returns {duplicate key: (representative key, similarity)}. Representatives
+    are always the first spec of their cluster in the given order; duplicates
+    never become representatives themselves, so there are no chains.
+    """
+    index = index or SpecSimilarityIndex()
+    duplicates: Dict[Hashable, Tuple[Hashable, float]] = {}
+    for key, text in specs:
+        matches = index.query(text, threshold)
+        if matches:
+            duplicates[key] = matches[0]
+        else:
+            index.add(key, text)
+    return duplicates
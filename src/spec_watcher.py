@@ -0,0 +1,358 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple, Union
+
+from .checkpoint_store import spec_hash
+from .logging_setup import get_log_context, set_log_context
+from .sqlite_store import SqliteDatabase
+
+WATCH_QUEUE_FILENAME = ".zeta_watch_queue.sqlite3"
+
+DEFAULT_WATCH_WORKERS = 2
+# Sekunden ohne neue Änderung, bevor eine Datei als fertig geschrieben gilt
+DEFAULT_DEBOUNCE = 2.0
+DEFAULT_POLL_INTERVAL = 1.0
+# Wie lange eine Datei unvollständiges JSON enthalten darf, bevor sie verworfen wird
+PARTIAL_WRITE_TIMEOUT = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    path TEXT PRIMARY KEY,
+    spec_hash TEXT NOT NULL,
+    state TEXT NOT NULL,
+    enqueued_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    docx_path TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, enqueued_at);
+"""
+
+
+@dataclass
+class WatchJob:
+    path: str
+    spec_hash: str
+    enqueued_at: float
+    attempts: int
+    docx_path: Optional[str] = None
+    error: Optional[str] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def latency(self) -> Optional[float]:
+        """Seconds from queueing (after debounce) to the finished document."""
+        return None if self.finished_at is None else self.finished_at - self.enqueued_at
+
+
+class WatchQueue:
+    """Persistent generation queue of the watch daemon (SQLite, one row per spec file).
+
+    A file is queued again only when its content hash changes, so restarting
+    the daemon does not regenerate finished specs. Jobs that were running
+    when the daemon stopped are picked up again by recover().
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.logger = logging.getLogger(__name__)
+        self.path = Path(path)
+        self._db = SqliteDatabase(self.path, _SCHEMA)
+
+    @classmethod
+    def for_directory(cls, directory: Union[str, Path]) -> "WatchQueue":
+        return cls(Path(directory) / WATCH_QUEUE_FILENAME)
+
+    def _connect(self) -> sqlite3.Connection:
+        return self._db.connect()
+
+    def enqueue(self, path: Union[str, Path], digest: str) -> bool:
+        """Queue a spec unless this exact content was queued before (failed ones: see retry_failed)."""
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT spec_hash FROM jobs WHERE path = ?", (str(path),)).fetchone()
+            if row and row[0] == digest:
+                return False
+            conn.execute("INSERT OR REPLACE INTO jobs (path, spec_hash, state, enqueued_at) VALUES (?, ?, 'pending', ?)",
+                         (str(path), digest, time.time()))
+        return True
+
+    def claim(self) -> Optional[WatchJob]:
+        """Oldest pending job, atomically marked as running (safe across threads and processes).
+
+        Jobs queued within the same clock tick (coarse time.time() on Windows) keep their insertion order.
+        """
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "UPDATE jobs SET state = 'running', started_at = ?, attempts = attempts + 1 "
+                "WHERE path = (SELECT path FROM jobs WHERE state = 'pending' ORDER BY enqueued_at, rowid LIMIT 1) "
+                "RETURNING path, spec_hash, enqueued_at, attempts",
+                (time.time(),),
+            ).fetchone()
+        return WatchJob(*row) if row else None
+
+    def finish(self, job: WatchJob):
+        # Nur wenn die Datei inzwischen nicht erneut (mit anderem Inhalt) eingereiht wurde
+        with closing(self._connect()) as conn, conn:
+            conn.execute("UPDATE jobs SET state = ?, finished_at = ?, docx_path = ?, error = ? "
+                         "WHERE path = ? AND spec_hash = ? AND state = 'running'",
+                         ("failed" if job.error else "done", job.finished_at, job.docx_path, job.error,
+                          job.path, job.spec_hash))
+
+    def recover(self) -> int:
+        """Requeue jobs left running by a stopped daemon; returns their number."""
+        with closing(self._connect()) as conn, conn:
+            return conn.execute("UPDATE jobs SET state = 'pending' WHERE state = 'running'").rowcount
+
+    def retry_failed(self) -> int:
+        with closing(self._connect()) as conn, conn:
+            return conn.execute("UPDATE jobs SET state = 'pending', error = NULL, enqueued_at = ? WHERE state = 'failed'",
+                                (time.time(),)).rowcount
+
+    def counts(self) -> Dict[str, int]:
+        with closing(self._connect()) as conn:
+            return dict(conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+
+
+def _is_spec_file(path: str) -> bool:
+    name = os.path.basename(path)
+    return name.lower().endswith(".json") and not name.startswith((".", "~$"))
+
+
+class _PollingObserver:
+    """Fallback without watchdog: compares (mtime, size) of the spec files every interval."""
+
+    def __init__(self, folder: Path, on_change: Callable[[str], None], interval: float):
+        self.folder = folder
+        self.on_change = on_change
+        self.interval = interval
+        self._snapshot: Dict[str, Tuple[int, int]] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="watch-poll", daemon=True)
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        found = {}
+        try:
+            with os.scandir(self.folder) as entries:
+                for entry in entries:
+                    if _is_spec_file(entry.name) and entry.is_file():
+                        st = entry.stat()
+                        found[entry.path] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            pass  # Ordner kurzzeitig nicht erreichbar (Netzlaufwerk); nächste Runde
+        return found
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            snapshot = self._scan()
+            for path, state in snapshot.items():
+                if self._snapshot.get(path) != state:
+                    self.on_change(path)
+            self._snapshot = snapshot
+
+    def start(self):
+        # Bestehende Dateien meldet der Watcher selbst beim Start
+        self._snapshot = self._scan()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+def _watchdog_observer(folder: Path, on_change: Callable[[str], None]):
+    """watchdog Observer calling on_change for every touched file, or None if watchdog is not installed."""
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        return None
+
+    class _Handler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            # Nur Schreibzugriffe; "opened"/"closed_no_write" entstehen auch beim eigenen Lesen
+            if event.is_directory or event.event_type not in ("created", "modified", "moved", "closed"):
+                return
+            # Atomisch geschriebene Dateien kommen als "moved" an: Ziel zählt
+            for path in (event.src_path, getattr(event, "dest_path", None)):
+                if path and _is_spec_file(os.fsdecode(path)):
+                    on_change(os.fsdecode(path))
+
+    observer = Observer()
+    observer.schedule(_Handler(), str(folder), recursive=False)
+    return observer
+
+
+class SpecWatcher:
+    """Watches a folder for new or changed spec JSON files and generates their documents.
+
+    File events (watchdog, or polling without it) only mark a file; once it
+    has not changed for `debounce` seconds and parses as JSON it is queued in
+    the WatchQueue. `workers` threads take jobs from the queue and call
+    handler(path), which returns the path of the written document or raises.
+    Files already in the folder are checked at start, so specs added while
+    the daemon was not running are picked up too.
+    """
+
+    def __init__(self, folder: Union[str, Path], handler: Callable[[Path], str], queue: WatchQueue,
+                 workers: int = DEFAULT_WATCH_WORKERS, debounce: float = DEFAULT_DEBOUNCE,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL, use_watchdog: bool = True,
+                 on_job_queued: Optional[Callable[[str], None]] = None,
+                 on_job_done: Optional[Callable[[WatchJob], None]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.folder = Path(folder).resolve()  # gleiche Pfade aus watchdog, Polling und Startscan
+        self.handler = handler
+        self.queue = queue
+        self.workers = max(1, workers)
+        self.debounce = max(0.0, debounce)
+        self.poll_interval = max(0.1, poll_interval)
+        self.use_watchdog = use_watchdog
+        self.on_job_queued = on_job_queued
+        self.on_job_done = on_job_done
+        self.observer_kind: Optional[str] = None
+        # Pfad -> (letzte Änderung, erste Änderung) für den Debounce
+        self._dirty: Dict[str, Tuple[float, float]] = {}
+        self._dirty_lock = threading.Lock()
+        self._wakeup = threading.Condition()
+        self._stop = threading.Event()
+        self._observer = None
+        self._threads = []
+        self._log_context: Dict[str, object] = {}
+
+    def stopped(self) -> bool:
+        """True once stop() was called; usable as cancel_callback for the handler."""
+        return self._stop.is_set()
+
+    def touch(self, path: str):
+        """Note a change; the file is queued once it has been quiet for `debounce` seconds."""
+        now = time.monotonic()
+        with self._dirty_lock:
+            self._dirty[path] = (now, self._dirty.get(path, (now, now))[1])
+
+    def _due(self):
+        now = time.monotonic()
+        with self._dirty_lock:
+            due = [(path, first) for path, (last, first) in self._dirty.items() if now - last >= self.debounce]
+            for path, _ in due:
+                del self._dirty[path]
+        return due
+
+    def _settle(self, path: str, first_seen: float):
+        try:
+            raw = Path(path).read_bytes()
+        except FileNotFoundError:
+            return  # gelöscht oder umbenannt
+        except OSError as e:
+            # Unter Windows noch vom Schreiber gesperrt
+            self.logger.debug("%s not readable yet: %s", path, e)
+            self._retry(path, first_seen)
+            return
+        try:
+            json.loads(raw.decode("utf-8"))
+        except ValueError:
+            self._retry(path, first_seen)
+            return
+        if self.queue.enqueue(path, spec_hash(raw)):
+            self.logger.info("Queued %s", os.path.basename(path))
+            if self.on_job_queued:
+                self.on_job_queued(path)
+            with self._wakeup:
+                self._wakeup.notify()
+
+    def _retry(self, path: str, first_seen: float):
+        if time.monotonic() - first_seen > PARTIAL_WRITE_TIMEOUT:
+            self.logger.warning("Ignoring %s: no complete JSON after %.0fs", os.path.basename(path), PARTIAL_WRITE_TIMEOUT)
+            return
+        now = time.monotonic()
+        with self._dirty_lock:
+            self._dirty.setdefault(path, (now, first_seen))
+
+    def _schedule(self):
+        interval = min(self.poll_interval, max(self.debounce / 2, 0.1))
+        while not self._stop.wait(interval):
+            for path, first_seen in self._due():
+                try:
+                    self._settle(path, first_seen)
+                except Exception as e:
+                    self.logger.error("Could not queue %s: %s", path, e)
+
+    def _work(self):
+        set_log_context(**self._log_context)
+        while not self._stop.is_set():
+            job = self.queue.claim()
+            if job is None:
+                with self._wakeup:
+                    self._wakeup.wait(self.poll_interval)
+                continue
+            set_log_context(job_id=Path(job.path).stem)
+            self.logger.info("Generating document for %s (attempt %d)", os.path.basename(job.path), job.attempts)
+            try:
+                job.docx_path = self.handler(Path(job.path))
+            except Exception as e:
+                job.error = str(e) or type(e).__name__
+            job.finished_at = time.time()
+            set_log_context(job_id=None)
+            if job.error is not None and self.stopped():
+                # Durch stop() abgebrochen: bleibt "running", recover() reiht ihn beim nächsten Start wieder ein
+                self.logger.info("Watch job %s interrupted, resumed at next start", os.path.basename(job.path))
+                continue
+            self.queue.finish(job)
+            if job.error is not None:
+                self.logger.error("Watch job %s failed: %s", os.path.basename(job.path), job.error)
+            else:
+                self.logger.info("Document for %s ready after %.1fs: %s", os.path.basename(job.path), job.latency, job.docx_path)
+            if self.on_job_done:
+                try:
+                    self.on_job_done(job)
+                except Exception as e:
+                    self.logger.warning("Progress callback failed: %s", e)
+
+    def start(self) -> "SpecWatcher":
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self._log_context = {name: value for name, value in get_log_context().items() if value is not None}
+        recovered = self.queue.recover()
+        if recovered:
+            self.logger.info("Requeued %d interrupted watch jobs", recovered)
+        self._observer = _watchdog_observer(self.folder, self.touch) if self.use_watchdog else None
+        self.observer_kind = "watchdog" if self._observer is not None else "polling"
+        if self._observer is None:
+            self._observer = _PollingObserver(self.folder, self.touch, self.poll_interval)
+        self._observer.start()
+        # Vorhandene Dateien: unveränderte fertige Spezifikationen filtert enqueue() über den Hash
+        for entry in os.scandir(self.folder):
+            if _is_spec_file(entry.name) and entry.is_file():
+                self.touch(entry.path)
+        self._threads = [threading.Thread(target=self._schedule, name="watch-debounce", daemon=True)]
+        self._threads += [threading.Thread(target=self._work, name=f"watch-worker-{n}", daemon=True)
+                          for n in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+        self.logger.info("Watching %s (%s, %d workers, debounce %.1fs)", self.folder, self.observer_kind,
+                         self.workers, self.debounce)
+        return self
+
+    def stop(self):
+        """Stop watching; running jobs are finished first."""
+        self._stop.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        if self._observer is not None:
+            self._observer.stop()
+            if hasattr(self._observer, "join"):
+                self._observer.join()
+        for thread in self._threads:
+            thread.join()
+        self.logger.info("Stopped watching %s", self.folder)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
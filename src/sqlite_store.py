@@ -0,0 +1,37 @@
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Union
+
+
+class SqliteDatabase:
+    """One SQLite file of the output folder (manifest, checkpoints, watch queue).
+
+    connect() opens a new connection per call, so instances can be shared
+    between threads. The first call creates the parent folder, switches the
+    file to WAL (readers do not block the writer, several processes can use
+    it) and runs the schema script.
+    """
+
+    def __init__(self, path: Union[str, Path], schema: str, timeout: float = 30):
+        self.path = Path(path)
+        self.schema = schema
+        self.timeout = timeout
+        self._initialized = False
+        self._lock = threading.Lock()
+
+    def connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            with self._lock:
+                if not self._initialized:
+                    # Vor dem connect: sqlite3 legt fehlende Ordner nicht an
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    with sqlite3.connect(str(self.path), timeout=self.timeout) as conn:
+                        conn.execute("PRAGMA journal_mode=WAL")
+                        conn.executescript(self.schema)
+                    conn.close()
+                    self._initialized = True
+        return sqlite3.connect(str(self.path), timeout=self.timeout)
+
+    def exists(self) -> bool:
+        return self.path.exists()
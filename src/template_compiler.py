@@ -0,0 +1,154 @@
+import copy
+import io
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from docx import Document
+from docx.parts.document import DocumentPart
+from docx.parts.hdrftr import FooterPart, HeaderPart
+
+from .docx_zip_renderer import UnsupportedTemplate, ZipTemplate
+from .placeholder_engine import PLACEHOLDER_PATTERN, W_P, PlaceholderEngine, paragraph_text_nodes
+
+# Parts rendering writes to; everything else (styles, numbering, theme, media, ...) is shared between clones
+MUTABLE_PART_TYPES = (DocumentPart, HeaderPart, FooterPart)
+
+
+def element_path(root, element) -> Tuple[int, ...]:
+    """Child indices leading from root to element."""
+    path = []
+    while element is not root:
+        parent = element.getparent()
+        path.append(parent.index(element))
+        element = parent
+    return tuple(reversed(path))
+
+
+@dataclass(frozen=True)
+class PlaceholderLocation:
+    part: str                   # partname, e.g. /word/document.xml or /word/header1.xml
+    path: Tuple[int, ...]       # child indices from the part's root element to the w:p
+    names: Tuple[str, ...]      # placeholders in this paragraph, in document order
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """Where each {{placeholder}} of a template sits, recorded once per template file."""
+
+    path: str
+    mtime_ns: int
+    size: int
+    locations: Tuple[PlaceholderLocation, ...]
+    placeholders: FrozenSet[str]
+
+    def resolve(self, root, location: PlaceholderLocation):
+        element = root
+        for index in location.path:
+            element = element[index]
+        return element
+
+    def render(self, document, values: Dict[str, str]) -> int:
+        """Fill the recorded locations in a copy of the template (body, headers, footers, text boxes).
+
+        Only the runs holding a placeholder are rewritten. Returns the number of replacements.
+        """
+        engine = PlaceholderEngine({name: value for name, value in values.items() if name in self.placeholders})
+        roots = {str(part.partname): part.element for part in mutable_parts(document)}
+        # Resolve first, so paths stay valid while runs are rewritten
+        targets = [self.resolve(roots[location.part], location) for location in self.locations if location.part in roots]
+        return sum(engine.substitute_paragraph(p) for p in targets)
+
+
+def mutable_parts(document) -> List:
+    return [part for part in document.part.package.iter_parts() if isinstance(part, MUTABLE_PART_TYPES)]
+
+
+def compile_document(document, path: str = "", mtime_ns: int = 0, size: int = 0) -> CompiledTemplate:
+    """Scan the document, header and footer parts once and record every paragraph that holds a placeholder."""
+    locations = []
+    names_seen = set()
+    for part in mutable_parts(document):
+        root = part.element
+        for p in root.iter(W_P):
+            text = ''.join(t.text or '' for t in paragraph_text_nodes(p))
+            if '{{' not in text:
+                continue
+            names = tuple(dict.fromkeys(PLACEHOLDER_PATTERN.findall(text)))
+            if names:
+                locations.append(PlaceholderLocation(str(part.partname), element_path(root, p), names))
+                names_seen.update(names)
+    return CompiledTemplate(path, mtime_ns, size, tuple(locations), frozenset(names_seen))
+
+
+class TemplateSnapshot:
+    """Parsed master copy of a template; clone() hands out independent documents.
+
+    Only the parts rendering writes to are deep-copied (lxml copies the XML
+    trees in C); all other parts, including media blobs, are shared with the
+    master, which must therefore never be modified or saved itself.
+    """
+
+    def __init__(self, master, compiled: CompiledTemplate, data: bytes):
+        self.master = master
+        self.compiled = compiled
+        self.data = data
+        self._shared = [part for part in master.part.package.iter_parts() if not isinstance(part, MUTABLE_PART_TYPES)]
+        self._zip_template: Optional[ZipTemplate] = None
+        self._zip_error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def clone(self):
+        memo = {id(part): part for part in self._shared}
+        return copy.deepcopy(self.master, memo)
+
+    def zip_template(self) -> Optional[ZipTemplate]:
+        """Fast-path renderer for this template, or None if the zip cannot be patched directly."""
+        with self._lock:
+            if self._zip_template is None and self._zip_error is None:
+                parts = {location.part for location in self.compiled.locations}
+                try:
+                    self._zip_template = ZipTemplate(self.data, parts)
+                except UnsupportedTemplate as e:
+                    self._zip_error = str(e)
+                    logging.getLogger(__name__).warning("Zip fast path not available for %s: %s", self.compiled.path, e)
+            return self._zip_template
+
+
+class TemplateCompiler:
+    """Caches the parsed master and the CompiledTemplate per template file, keyed by path and mtime."""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._cache: Dict[str, TemplateSnapshot] = {}
+        self._lock = threading.Lock()
+
+    def load(self, template_path: str) -> TemplateSnapshot:
+        path = os.path.abspath(template_path)
+        stat = os.stat(path)
+        with self._lock:
+            cached = self._cache.get(path)
+        if cached is not None and cached.compiled.mtime_ns == stat.st_mtime_ns and cached.compiled.size == stat.st_size:
+            return cached
+        with open(path, 'rb') as f:
+            data = f.read()
+        master = Document(io.BytesIO(data))
+        compiled = compile_document(master, path, stat.st_mtime_ns, stat.st_size)
+        snapshot = TemplateSnapshot(master, compiled, data)
+        self.logger.info("Compiled template %s: %d placeholder locations (%s)",
+                         path, len(compiled.locations), ", ".join(sorted(compiled.placeholders)))
+        with self._lock:
+            self._cache[path] = snapshot
+        return snapshot
+
+    def get(self, template_path: str) -> CompiledTemplate:
+        return self.load(template_path).compiled
+
+    def invalidate(self, template_path: Optional[str] = None):
+        with self._lock:
+            if template_path is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(os.path.abspath(template_path), None)
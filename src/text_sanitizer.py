@@ -0,0 +1,103 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+# Erste Zeile, die mit einer Ziffer beginnt, gilt als (nummerierte) Überschrift
+_HEADING_NUMBER_PREFIXES = tuple(str(i) for i in range(1, 10))
+
+# ```mermaid / ```dot / ```graph / ```digraph blocks in one pass
+_DIAGRAM_BLOCK = re.compile(r'```(?:mermaid|dot|graph|digraph)[\s\S]+?```', re.IGNORECASE)
+_DIAGRAM_LINE_PREFIXES = ('mermaid', 'graph', 'digraph')
+
+# Order matters: bold before italic, so **x** is not read as *(*x*)*
+_MARKDOWN_STEPS = (
+    (re.compile(r'^#+\s*', re.MULTILINE), ''),           # headers
+    (re.compile(r'\*\*(.*?)\*\*'), r'\1'),                # bold
+    (re.compile(r'__(.*?)__'), r'\1'),
+    (re.compile(r'\*(.*?)\*'), r'\1'),                    # italic
+    (re.compile(r'_(.*?)_'), r'\1'),
+    (re.compile(r'`(.*?)`'), r'\1'),                      # inline code
+    (re.compile(r'^[\s]*[-*+]\s+', re.MULTILINE), ''),    # bullets
+    (re.compile(r'\n\s*\n'), '\n\n'),                     # blank lines
+)
+
+
+def remove_section_heading(content: str, title: str) -> str:
+    """Drop the first line if it repeats the section title or is a numbered heading."""
+    if not content:
+        return ''
+    stripped = content.strip()
+    first, _, rest = stripped.partition('\n')
+    if title.lower() in first.lower() or first.strip().startswith(_HEADING_NUMBER_PREFIXES):
+        return rest.lstrip()
+    return content
+
+
+def remove_diagrams(text: str) -> str:
+    """Remove fenced diagram blocks and stray mermaid/graph/digraph lines."""
+    if not text:
+        return text
+    text = _DIAGRAM_BLOCK.sub('', text)
+    return '\n'.join(line for line in text.splitlines()
+                     if not line.strip().lower().startswith(_DIAGRAM_LINE_PREFIXES))
+
+
+def clean_markdown(text: str) -> str:
+    if not text:
+        return text
+    for pattern, replacement in _MARKDOWN_STEPS:
+        text = pattern.sub(replacement, text)
+    return text.strip()
+
+
+class TextSanitizer:
+    """Turns AI section text into the plain text that goes into the document.
+
+    heading removal -> diagram removal -> markdown cleanup, all with
+    precompiled patterns. Results are memoized by (title, content hash), so
+    the same section text is cleaned once no matter how many placeholders
+    or render paths use it.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Tuple[str, bytes], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(content: str, title: str) -> Tuple[str, bytes]:
+        return title, hashlib.blake2b(content.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+    def sanitize(self, content: Optional[str], title: str) -> str:
+        """Clean section text; empty or error results become the '(No information available ...)' text."""
+        key = self._key(content or '', title)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+        result = self._run(content, title)
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = result
+            if len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return result
+
+    @staticmethod
+    def _run(content: Optional[str], title: str) -> str:
+        text = remove_diagrams(remove_section_heading(content, title))
+        if text and not text.startswith("Section") and not text.startswith("Error"):
+            text = clean_markdown(text)
+            if text:
+                return text
+        return f"(No information available for {title})"
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
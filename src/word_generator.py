@@ -4,11 +4,30 @@ from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.style import WD_STYLE_TYPE
 from typing import Dict, Any, List, Optional
 from pathlib import Path
+from dataclasses import dataclass
+import io
 import os
 import re
 import logging
+import threading
 from datetime import datetime
-import tkinter.messagebox as messagebox
+
+from .document_manifest import DocumentManifest
+from .output_store import OutputStore
+from .template_compiler import TemplateCompiler
+from .text_sanitizer import TextSanitizer
+
+
+@dataclass
+class RenderedDocument:
+    """A filled document that is not written yet; picklable, so render workers can return it."""
+    folder_name: str
+    filename: str
+    data: bytes
+    project_name: Optional[str] = None
+    initiator: Optional[str] = None
+    upwork_link: Optional[str] = None
+    description: Optional[str] = None
 
 
 class WordDocumentGenerator:
@@ -16,83 +35,28 @@ class WordDocumentGenerator:
         self.output_dir = Path(output_directory)
         self.output_dir.mkdir(exist_ok=True)
         self.template_path = None  # Path to selected template
+        self.template_compiler = TemplateCompiler()
+        self.text_sanitizer = TextSanitizer()
+        # "auto": zip fast path when the template only needs text substitution, else python-docx; "docx": always python-docx
+        self.render_backend = "auto"
+        self._output_stores: Dict[str, OutputStore] = {}
+        self._manifests: Dict[str, DocumentManifest] = {}
+        self._output_stores_lock = threading.Lock()
         self.logger = logging.getLogger(__name__)
         self.logger.info("WordDocumentGenerator initialized")
         self.logger.info("Output directory: %s", self.output_dir)
     
     def set_template(self, template_path: Optional[str]):
         self.logger.info("Setting template: %s", template_path)
+        if self.template_path and template_path != self.template_path:
+            # Master-Kopie des alten Templates freigeben
+            self.template_compiler.invalidate(self.template_path)
         self.template_path = template_path
     
-    def _clean_markdown(self, text: str) -> str:
-        """Remove markdown formatting from text"""
-        self.logger.debug("Cleaning markdown from text")
-        self.logger.debug("Input text length: %d", len(text) if text else 0)
-        
-        if not text:
-            self.logger.debug("No text to clean")
-            return text
-        
-        # Remove markdown headers (# ## ### etc.)
-        text = re.sub(r'^#+\s*', '', text, flags=re.MULTILINE)
-        
-        # Remove bold formatting (**text** or __text__)
-        text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)
-        text = re.sub(r'__(.*?)__', r'\1', text)
-        
-        # Remove italic formatting (*text* or _text_)
-        text = re.sub(r'\*(.*?)\*', r'\1', text)
-        text = re.sub(r'_(.*?)_', r'\1', text)
-        
-        # Remove code formatting (`text`)
-        text = re.sub(r'`(.*?)`', r'\1', text)
-        
-        # Remove bullet points and dashes at the beginning of lines
-        text = re.sub(r'^[\s]*[-*+]\s+', '', text, flags=re.MULTILINE)
-        
-        # Clean up extra whitespace
-        text = re.sub(r'\n\s*\n', '\n\n', text)
-        text = text.strip()
-        
-        self.logger.debug("Cleaned text length: %d", len(text))
-        return text
-    
-    def _remove_mermaid_blocks(self, text: str) -> str:
-        self.logger.debug("Removing mermaid blocks from text")
-        self.logger.debug("Input text length: %d", len(text) if text else 0)
-        
-        if not text:
-            return text
-        # Entfernt ```mermaid ... ``` Blöcke
-        text = re.sub(r'```mermaid[\s\S]+?```', '', text, flags=re.IGNORECASE)
-        # Entfernt Zeilen, die mit 'mermaid' oder 'graph' beginnen
-        lines = text.splitlines()
-        cleaned_lines = [line for line in lines if not line.strip().lower().startswith(('mermaid', 'graph'))]
-        result = '\n'.join(cleaned_lines)
-        
-        self.logger.debug("Text after mermaid removal length: %d", len(result))
-        return result
-    
-    def _remove_section_heading(self, content: str, title: str) -> str:
-        """Remove the section heading/title from the AI content if present."""
-        self.logger.debug("Removing section heading for title: %s", title)
-        self.logger.debug("Content length: %d", len(content) if content else 0)
-        
-        if not content:
-            return ''
-        lines = content.strip().split('\n')
-        # Remove first line if it matches the title (with or without numbering)
-        if lines and (title.lower() in lines[0].lower() or lines[0].strip().startswith(tuple(str(i) for i in range(1, 10)))):
-            result = '\n'.join(lines[1:]).lstrip()
-            self.logger.debug("Removed heading, new length: %d", len(result))
-            return result
-        self.logger.debug("No heading removed, content unchanged")
-        return content
-
-    def _insert_single_section(self, doc, insert_after, key, title, ai_sections, heading_style, normal_style):
-        """Replace the placeholder in the paragraph/cell directly with content, keeping document order stable."""
-        self.logger.info("Inserting single section: %s", key)
-        self.logger.info("Section title: %s", title)
+    def _prepare_section_content(self, key, title, ai_sections) -> str:
+        """Section text as it goes into the placeholder paragraph (heading, diagrams and markdown removed)."""
+        self.logger.debug("Preparing section content: %s", key)
+        self.logger.debug("Section title: %s", title)
         
         # Hole Fließtext aus neuer Struktur
         value = ai_sections.get(key)
@@ -108,38 +72,13 @@ class WordDocumentGenerator:
                     else:
                         content = v
                     break
-        self.logger.info("Section %s: value length = %d", key, len(content) if content else 0)
+        self.logger.debug("Section %s: value length = %d", key, len(content) if content else 0)
         self.logger.debug("Section %s: value preview = %s", key, content[:100] if content else 'None')
         
-        # Remove heading/title from AI content
-        content = self._remove_section_heading(content, title)
-        content = self._remove_mermaid_blocks(content)
-        content = self._remove_dot_blocks(content)
-        
-        if content and not content.startswith("Section") and not content.startswith("Error"):
-            content = self._clean_markdown(content)
-            self.logger.info("Section %s: cleaned content length = %d", key, len(content))
-            self.logger.debug("Section %s: content preview = %s", key, content[:200])
-        else:
-            content = f"(No information available for {title})"
-            self.logger.info("Section %s: using fallback content", key)
-            
-        # Paragraph case
-        if insert_after is not None and hasattr(insert_after, 'text') and hasattr(insert_after, '_element'):
-            self.logger.info("Inserting content in paragraph/cell for section: %s", key)
-            # Ersetze nur den Text des Platzhalter-Absatzes
-            insert_after.text = content
-            self.logger.info("Replaced placeholder for section %s with content in paragraph/cell", key)
-            return
-        # Table cell case
-        elif hasattr(insert_after, 'text') and hasattr(insert_after, 'add_paragraph'):
-            self.logger.info("Inserting content in table cell for section: %s", key)
-            insert_after.text = content  # Platzhaltertext ersetzen
-            self.logger.info("Replaced placeholder for section %s with content in table cell", key)
-            return
-        else:
-            self.logger.warning("Unknown insert_after type for section %s: %s", key, type(insert_after))
-            return
+        # Überschrift, Diagramm-Blöcke und Markdown entfernen (gecacht pro Inhalt)
+        content = self.text_sanitizer.sanitize(content, title)
+        self.logger.debug("Section %s: cleaned content length = %d", key, len(content))
+        return content
 
     def _escape_xml_text(self, text: str) -> str:
         """Escape special characters for XML"""
@@ -210,32 +149,32 @@ class WordDocumentGenerator:
                     
                     # Prüfe Länge und retry falls nötig
                     if len(new_name) <= max_length:
-                        self.logger.info(f"KI-Namensgenerierung erfolgreich (Versuch {attempt + 1}): '{project_name}' -> '{new_name}' ({len(new_name)} Zeichen)")
+                        self.logger.info("KI-Namensgenerierung erfolgreich (Versuch %s): '%s' -> '%s' (%s Zeichen)", attempt + 1, project_name, new_name, len(new_name))
                         return new_name
                     else:
-                        self.logger.warning(f"KI-generierter Name zu lang (Versuch {attempt + 1}): {len(new_name)} > {max_length} Zeichen")
+                        self.logger.warning("KI-generierter Name zu lang (Versuch %s): %s > %s Zeichen", attempt + 1, len(new_name), max_length)
                         if attempt < max_retries - 1:
                             # Versuche es mit einem strikteren Prompt
                             continue
                         else:
                             # Letzter Versuch: Intelligente manuelle Namensgenerierung
                             new_name = self._manual_smart_name_generation(project_name, max_length)
-                            self.logger.info(f"Intelligente manuelle Namensgenerierung nach {max_retries} KI-Versuchen: '{project_name}' -> '{new_name}'")
+                            self.logger.info("Intelligente manuelle Namensgenerierung nach %s KI-Versuchen: '%s' -> '%s'", max_retries, project_name, new_name)
                             return new_name
                     
             except Exception as e:
-                self.logger.warning(f"KI-Namensgenerierung fehlgeschlagen (Versuch {attempt + 1}): {e}")
+                self.logger.warning("KI-Namensgenerierung fehlgeschlagen (Versuch %s): %s", attempt + 1, e)
                 if attempt < max_retries - 1:
                     continue  # Retry
                 else:
                     # Letzter Versuch: Intelligente manuelle Namensgenerierung
                     new_name = self._manual_smart_name_generation(project_name, max_length)
-                    self.logger.info(f"Intelligente manuelle Namensgenerierung nach {max_retries} fehlgeschlagenen KI-Versuchen: '{project_name}' -> '{new_name}'")
+                    self.logger.info("Intelligente manuelle Namensgenerierung nach %s fehlgeschlagenen KI-Versuchen: '%s' -> '%s'", max_retries, project_name, new_name)
                     return new_name
         
         # Fallback: Intelligente manuelle Namensgenerierung
         new_name = self._manual_smart_name_generation(project_name, max_length)
-        self.logger.info(f"Intelligente manuelle Namensgenerierung: '{project_name}' -> '{new_name}'")
+        self.logger.info("Intelligente manuelle Namensgenerierung: '%s' -> '%s'", project_name, new_name)
         return new_name
     
     def _manual_smart_name_generation(self, project_name: str, max_length: int) -> str:
@@ -346,19 +285,61 @@ class WordDocumentGenerator:
     
 
 
-    def _replace_placeholders_in_xml(self, doc, replacements: dict):
-        """Replace placeholders in XML elements (shapes, textboxes, etc.)"""
-        self.logger.info("Replacing placeholders in XML elements")
-        for element in doc.element.xpath('//w:t'):
-            if element.text:
-                for placeholder, replacement in replacements.items():
-                    if placeholder in element.text:
-                        # Kein XML-Escaping mehr, sondern roher Text
-                        element.text = element.text.replace(placeholder, replacement)
-                        self.logger.info("Replaced %s in XML element", placeholder)
+    def _get_output_store(self, directory: Path) -> OutputStore:
+        """One OutputStore (and version index) per output directory."""
+        key = os.path.abspath(directory)
+        with self._output_stores_lock:
+            store = self._output_stores.get(key)
+            if store is None:
+                store = self._output_stores[key] = OutputStore(directory)
+            return store
+
+    def _get_manifest(self, directory: Path) -> DocumentManifest:
+        key = os.path.abspath(directory)
+        with self._output_stores_lock:
+            manifest = self._manifests.get(key)
+            if manifest is None:
+                manifest = self._manifests[key] = DocumentManifest(directory)
+            return manifest
+
+    def _render_template(self, snapshot, values: Dict[str, str]) -> bytes:
+        """Fill the template and return the finished .docx as bytes.
+
+        Plain text substitution (all current templates) runs on the zip fast path,
+        which patches only the XML parts with placeholders; python-docx on a clone
+        of the master is the fallback.
+        """
+        if self.render_backend != "docx":
+            zip_template = snapshot.zip_template()
+            if zip_template is not None:
+                try:
+                    data = zip_template.render_bytes(values)
+                    self.logger.debug("Rendered template on zip fast path (%d bytes)", len(data))
+                    return data
+                except Exception as e:
+                    self.logger.warning("Zip fast path failed, falling back to python-docx: %s", e)
+        doc = snapshot.clone()
+        replaced = snapshot.compiled.render(doc, values)
+        self.logger.debug("Replaced %d placeholders (python-docx)", replaced)
+        return self._document_bytes(doc)
+
+    @staticmethod
+    def _document_bytes(doc) -> bytes:
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        return buffer.getvalue()
+
+    def create_document(self, concept: Dict[str, Any], project_name: Optional[str] = None, initiator: Optional[str] = None, upwork_link: Optional[str] = None, description: Optional[str] = None, skip_path_warnings: bool = False, output_dir: Optional[str] = None) -> str:
+        """Create a Word document from the concept data using template replacement. Speichert alles im Projektordner mit Versionierung.
+
+        output_dir overrides self.output_dir for this call only (bulk and render workers pass it per job).
+        """
+        rendered = self.render_document(concept, project_name=project_name, initiator=initiator,
+                                        upwork_link=upwork_link, description=description)
+        return self.write_document(rendered, output_dir=output_dir, skip_path_warnings=skip_path_warnings)
 
-    def create_document(self, concept: Dict[str, Any], project_name: Optional[str] = None, initiator: Optional[str] = None, upwork_link: Optional[str] = None, description: Optional[str] = None, skip_path_warnings: bool = False) -> str:
-        """Create a Word document from the concept data using template replacement. Speichert alles im Projektordner mit Versionierung."""
+    def render_document(self, concept: Dict[str, Any], project_name: Optional[str] = None, initiator: Optional[str] = None, upwork_link: Optional[str] = None, description: Optional[str] = None) -> RenderedDocument:
+        """Name and fill the document in memory; nothing is written yet (see write_document)."""
         self.logger.info("Starting document creation")
         
         # --- Namensgenerierung: KI nur wenn Limit überschritten ---
@@ -370,10 +351,10 @@ class WordDocumentGenerator:
         # Verwende KI nur wenn der ursprüngliche Name zu lang ist
         if len(original_safe_name) > max_name_len:
             safe_project_name = self._ai_shorten_project_name(project_name or "Technical_Concept", max_name_len)
-            self.logger.info(f"Projektname überschreitet Limit ({len(original_safe_name)} > {max_name_len}), verwende KI-Kürzung")
+            self.logger.info("Projektname überschreitet Limit (%s > %s), verwende KI-Kürzung", len(original_safe_name), max_name_len)
         else:
             safe_project_name = original_safe_name
-            self.logger.info(f"Projektname innerhalb des Limits ({len(original_safe_name)} <= {max_name_len}), verwende Original")
+            self.logger.info("Projektname innerhalb des Limits (%s <= %s), verwende Original", len(original_safe_name), max_name_len)
         
         # --- Veranlasser als Präfix hinzufügen ---
         safe_initiator = re.sub(r'[<>:"/\\|?*]', '_', initiator or "")
@@ -384,248 +365,138 @@ class WordDocumentGenerator:
             base_folder_name = f"{safe_initiator}_{safe_project_name}"
         else:
             base_folder_name = safe_project_name
-            
-        # Versionierung
-        version = 1
-        project_folder = self.output_dir / base_folder_name
-        while project_folder.exists():
-            version += 1
-            project_folder = self.output_dir / f"{base_folder_name}_v{version}"
-        
-        # Stelle sicher, dass der Ordner erstellt wird
-        try:
-            project_folder.mkdir(parents=True, exist_ok=True)
-            self.logger.info(f"Projektordner erstellt: {project_folder}")
-        except Exception as e:
-            self.logger.error(f"Fehler beim Erstellen des Projektordners: {e}")
-            # Fallback: Verwende einen einfacheren Pfad
-            fallback_folder = Path("output") / f"fallback_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            fallback_folder.mkdir(parents=True, exist_ok=True)
-            project_folder = fallback_folder
-            self.logger.info(f"Fallback-Ordner verwendet: {project_folder}")
-
-        # --- DOCX-Datei erzeugen (wie bisher, aber im Projektordner) ---
-        # (Kopiere bisherigen Code für Template/Platzhalterersetzung, aber speichere in project_folder)
+        
+        # Add initiator suffix if provided
+        initiator_suffix = f"_{initiator}" if initiator else ""
+        
         # Extract AI sections
         ai_sections = concept.get('sections', {})
         self.logger.info("Concept sections count: %d", len(ai_sections))
         
+        data = None
         # Use template if available
         if self.template_path and os.path.exists(self.template_path):
             self.logger.info("Template path: %s", self.template_path)
-            self.logger.info("Template exists: %s", os.path.exists(self.template_path))
             self.logger.info("Using existing template: %s", self.template_path)
             
-            # Load template
-            doc = Document(self.template_path)
+            # The template is read and parsed once per file (path + mtime)
+            snapshot = self.template_compiler.load(self.template_path)
+            compiled = snapshot.compiled
             
-            # Extract sections for logging
-            self.logger.info("Extracted ai_sections:")
-            for key, value in ai_sections.items():
-                if isinstance(value, dict):
-                    content = value.get('text', '')
-                else:
-                    content = value
-                self.logger.info("  %s: %s", key, content[:100] if content else 'None')
-            
-            # Check if template has placeholders
-            has_placeholders = False
-            found_placeholders = []
-            
-            # Check paragraphs for placeholders
-            self.logger.info("Checking paragraphs for placeholders")
-            for paragraph in doc.paragraphs:
-                for key in ai_sections.keys():
-                    placeholder = f"{{{{{key}}}}}"
-                    if placeholder in paragraph.text:
-                        has_placeholders = True
-                        found_placeholders.append(key)
-                        self.logger.info("Found placeholder %s in paragraph: %s...", placeholder, paragraph.text[:50])
-                        break
-            
-            # Check tables for placeholders
-            self.logger.info("Checking tables for placeholders")
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        for key in ai_sections.keys():
-                            placeholder = f"{{{{{key}}}}}"
-                            if placeholder in cell.text:
-                                has_placeholders = True
-                                if key not in found_placeholders:
-                                    found_placeholders.append(key)
-                                self.logger.info("Found placeholder %s in table cell: %s...", placeholder, cell.text[:50])
-                                break
+            # Extract sections for logging (nur wenn DEBUG aktiv ist)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Extracted ai_sections:")
+                for key, value in ai_sections.items():
+                    if isinstance(value, dict):
+                        content = value.get('text', '')
+                    else:
+                        content = value
+                    self.logger.debug("  %s: %s", key, content[:100] if content else 'None')
             
+            # Check if template has placeholders for the generated sections
+            found_placeholders = [key for key in ai_sections.keys() if key in compiled.placeholders]
+            has_placeholders = bool(found_placeholders)
             self.logger.info("Template has placeholders: %s", has_placeholders)
             
             if has_placeholders:
                 self.logger.info("Found placeholders: %s", found_placeholders)
                 self.logger.info("Replacing placeholders in existing template")
                 
-                # Process each placeholder
+                # Ein Wertesatz für alle Platzhalter; ersetzt wird nur in den betroffenen Runs
+                values = {
+                    "date": datetime.now().strftime("%Y-%m-%d"),
+                    "project_name": project_name or "Technical Concept",
+                    "project_name_safe": original_safe_name,
+                }
                 for key in found_placeholders:
-                    self.logger.info("Processing placeholder for section: %s", key)
-                    placeholder = f"{{{{{key}}}}}"
-                    
-                    # Find and replace in paragraphs
-                    for paragraph in doc.paragraphs:
-                        if placeholder in paragraph.text:
-                            self.logger.info("Found placeholder %s in paragraph. Inserting content.", placeholder)
-                            self._insert_single_section(doc, paragraph, key, key.replace('_', ' ').title(), ai_sections, None, None)
-                            break
-                    
-                    # Find and replace in table cells
-                    for table in doc.tables:
-                        for row in table.rows:
-                            for cell in row.cells:
-                                if placeholder in cell.text:
-                                    self.logger.info("Found placeholder %s in table cell. Inserting content.", placeholder)
-                                    self._insert_single_section(doc, cell, key, key.replace('_', ' ').title(), ai_sections, None, None)
-                                    break
-                            else:
-                                continue
-                            break
-                        else:
-                            continue
-                        break
-                
-                # Replace date and project name placeholders in paragraphs and table cells
-                timestamp = datetime.now().strftime("%Y-%m-%d")
-                safe_project_name = re.sub(r'[<>:"/\\|?*]', '_', project_name or "Technical_Concept")
-                safe_project_name = re.sub(r'\s+', '_', safe_project_name)
-                
-                # Replace in paragraphs
-                for paragraph in doc.paragraphs:
-                    if "{{date}}" in paragraph.text:
-                        paragraph.text = paragraph.text.replace("{{date}}", timestamp)
-                        self.logger.info("Replaced {{date}} in paragraph")
-                    if "{{project_name}}" in paragraph.text:
-                        paragraph.text = paragraph.text.replace("{{project_name}}", project_name or "Technical Concept")
-                        self.logger.info("Replaced {{project_name}} in paragraph")
-                    if "{{project_name_safe}}" in paragraph.text:
-                        paragraph.text = paragraph.text.replace("{{project_name_safe}}", safe_project_name)
-                        self.logger.info("Replaced {{project_name_safe}} in paragraph")
+                    values[key] = self._prepare_section_content(key, key.replace('_', ' ').title(), ai_sections)
                 
-                # Replace in table cells
-                for table in doc.tables:
-                    for row in table.rows:
-                        for cell in row.cells:
-                            if "{{date}}" in cell.text:
-                                cell.text = cell.text.replace("{{date}}", timestamp)
-                                self.logger.info("Replaced {{date}} in table cell")
-                            if "{{project_name}}" in cell.text:
-                                cell.text = cell.text.replace("{{project_name}}", project_name or "Technical Concept")
-                                self.logger.info("Replaced {{project_name}} in table cell")
-                            if "{{project_name_safe}}" in cell.text:
-                                cell.text = cell.text.replace("{{project_name_safe}}", safe_project_name)
-                                self.logger.info("Replaced {{project_name_safe}} in table cell")
-                
-                # Replace placeholders in XML elements (shapes, textboxes)
-                replacements = {}
-                for key, value in ai_sections.items():
-                    if isinstance(value, dict):
-                        content = value.get('text', '')
-                    else:
-                        content = value
-                    if content:
-                        content = self._clean_markdown(content)
-                        replacements[f"{{{{{key}}}}}"] = content
-                
-                # Add date and project name placeholders
-                timestamp = datetime.now().strftime("%Y-%m-%d")
-                safe_project_name = re.sub(r'[<>:"/\\|?*]', '_', project_name or "Technical_Concept")
-                safe_project_name = re.sub(r'\s+', '_', safe_project_name)
-                
-                replacements["{{date}}"] = timestamp
-                replacements["{{project_name}}"] = project_name or "Technical Concept"
-                replacements["{{project_name_safe}}"] = safe_project_name
-                
-                self._replace_placeholders_in_xml(doc, replacements)
-                
-                # Generate filename with retry logic (verwende gleichen KI-generierten Namen)
-                # Verwende den bereits generierten safe_project_name für den Dateinamen
-                
-                # Add initiator suffix if provided
-                initiator_suffix = f"_{initiator}" if initiator else ""
-                
-                # Try to save with versioning logic
-                # Verwende den gleichen KI-generierten Namen für den Dateinamen
-                base_filename = f"{safe_project_name}{initiator_suffix}.docx"
-                version = 1
-                
-                while True:
-                    try:
-                        if version == 1:
-                            filename = base_filename
-                        else:
-                            # Insert version before the extension
-                            name_part = base_filename[:-5]  # Remove .docx
-                            filename = f"{name_part}_v{version}.docx"
-                        
-                        docx_path = project_folder / filename
-                        
-                        # Ensure output directory exists
-                        project_folder.mkdir(parents=True, exist_ok=True)
-                        
-                        self.logger.info("Saving document to: %s (version %d)", docx_path, version)
-                        
-                        # Use absolute path and handle long paths
-                        abs_output_path = docx_path.resolve()
-                        self.logger.info("Absolute path: %s", abs_output_path)
-                        
-                        doc.save(str(abs_output_path))
-                        self.logger.info("Document saved successfully: %s", abs_output_path)
-                        self.logger.info("Word document created: %s", abs_output_path)
-                        break
-                        
-                    except PermissionError as e:
-                        self.logger.warning("Permission error on version %d: %s", version, str(e))
-                        version += 1
-                        if version > 100:  # Prevent infinite loop
-                            # Try to save to a simpler path as fallback
-                            try:
-                                fallback_path = Path("output") / f"fallback_{timestamp}_v{version}.docx"
-                                self.logger.info("Trying fallback path: %s", fallback_path)
-                                doc.save(str(fallback_path))
-                                self.logger.info("Document saved to fallback path: %s", fallback_path)
-                                return str(fallback_path)
-                            except Exception as fallback_e:
-                                self.logger.error("Fallback save also failed: %s", str(fallback_e))
-                                raise e
-                        
-                    except Exception as e:
-                        self.logger.error("Error saving document: %s", str(e))
-                        raise e
-                
-                docx_path = project_folder / filename
+                data = self._render_template(snapshot, values)
+                # Dateiname aus dem ungekürzten Namen, wie im Platzhalter project_name_safe
+                filename = f"{original_safe_name}{initiator_suffix}.docx"
             else:
                 self.logger.warning("No placeholders found in template, creating new document")
-                # Fallback to creating new document
-                docx_path = self._create_new_document(concept, project_name, initiator)
         else:
             self.logger.info("No template available, creating new document")
-            docx_path = self._create_new_document(concept, project_name, initiator)
+        
+        if data is None:
+            # Fallback to creating new document
+            data = self._create_new_document(concept)
+            filename = f"{safe_project_name}{initiator_suffix}.docx"
+        
+        return RenderedDocument(
+            folder_name=base_folder_name,
+            filename=filename,
+            data=data,
+            project_name=project_name,
+            initiator=initiator,
+            upwork_link=upwork_link,
+            description=description,
+        )
+
+    def write_document(self, rendered: RenderedDocument, output_dir: Optional[str] = None, skip_path_warnings: bool = False) -> str:
+        """Write a rendered document into the next free project folder, plus summary and url file."""
+        base_dir = Path(output_dir) if output_dir else self.output_dir
+        
+        # Versionierung: nächster freier Ordner aus dem Versionsindex, atomar per mkdir belegt
+        store = self._get_output_store(base_dir)
+        try:
+            project_folder = store.allocate_folder(rendered.folder_name)
+            self.logger.info("Projektordner erstellt: %s", project_folder)
+        except Exception as e:
+            self.logger.error("Fehler beim Erstellen des Projektordners: %s", e)
+            # Fallback: Verwende einen einfacheren Pfad
+            fallback_folder = Path("output") / f"fallback_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            fallback_folder.mkdir(parents=True, exist_ok=True)
+            project_folder = fallback_folder
+            self.logger.info("Fallback-Ordner verwendet: %s", project_folder)
+        
+        def save_document(path):
+            Path(path).write_bytes(rendered.data)
+        
+        # Temp-Datei + Umbenennen; bei gesperrter Datei wird _v2, _v3, ... verwendet
+        target_path = (project_folder / rendered.filename).resolve()
+        self.logger.info("Saving document to: %s", target_path)
+        try:
+            docx_path = store.write_atomic(target_path, save_document)
+            self.logger.info("Word document created: %s", docx_path)
+        except PermissionError as e:
+            self.logger.warning("Permission error: %s", e)
+            # Try to save to a simpler path as fallback
+            try:
+                fallback_path = Path("output") / f"fallback_{datetime.now().strftime('%Y-%m-%d')}.docx"
+                self.logger.info("Trying fallback path: %s", fallback_path)
+                fallback_path = store.write_atomic(fallback_path, save_document)
+                self.logger.info("Document saved to fallback path: %s", fallback_path)
+                return str(fallback_path)
+            except Exception as fallback_e:
+                self.logger.error("Fallback save also failed: %s", str(fallback_e))
+                raise e
+        except Exception as e:
+            self.logger.error("Error saving document: %s", str(e))
+            raise e
+
+        # --- Manifest für die Dokumentenübersicht aktualisieren ---
+        try:
+            self._get_manifest(base_dir).record(docx_path, project=rendered.project_name, initiator=rendered.initiator)
+        except Exception as e:
+            self.logger.warning("Could not update document manifest: %s", e)
 
         # --- TXT-Summary speichern ---
         try:
-            summary_txt = f"Project Name: {project_name}\nDescription: {description}\nUpwork Link: {upwork_link or ''}\n"
-            summary_path = project_folder / "summary.txt"
-            with open(summary_path, "w", encoding="utf-8") as f:
-                f.write(summary_txt)
-            self.logger.info(f"Summary gespeichert: {summary_path}")
+            summary_txt = f"Project Name: {rendered.project_name}\nDescription: {rendered.description}\nUpwork Link: {rendered.upwork_link or ''}\n"
+            summary_path = store.write_text(project_folder / "summary.txt", summary_txt)
+            self.logger.info("Summary gespeichert: %s", summary_path)
         except Exception as e:
-            self.logger.error(f"Fehler beim Speichern der Summary: {e}")
+            self.logger.error("Fehler beim Speichern der Summary: %s", e)
 
         # --- Upwork-Link als .url-Datei speichern (nur wenn Link vorhanden) ---
-        if upwork_link:
+        if rendered.upwork_link:
             try:
-                url_path = project_folder / "upwork_link.url"
-                with open(url_path, "w", encoding="utf-8") as f:
-                    f.write(f"[InternetShortcut]\nURL={upwork_link}\n")
-                self.logger.info(f"Upwork-Link gespeichert: {url_path}")
+                url_path = store.write_text(project_folder / "upwork_link.url", f"[InternetShortcut]\nURL={rendered.upwork_link}\n")
+                self.logger.info("Upwork-Link gespeichert: %s", url_path)
             except Exception as e:
-                self.logger.error(f"Fehler beim Speichern der Upwork-Link-Datei: {e}")
+                self.logger.error("Fehler beim Speichern der Upwork-Link-Datei: %s", e)
 
         # --- Pfadlängen-Prüfung ---
         max_path_length = 240
@@ -636,16 +507,18 @@ class WordDocumentGenerator:
             # Skip warning during bulk generation
             if not skip_path_warnings:
                 try:
+                    # Erst hier importieren: CLI und Render-Worker laden kein Tk
+                    import tkinter.messagebox as messagebox
                     messagebox.showerror("Pfad zu lang", warn_msg)
                 except Exception:
                     pass  # Falls kein GUI-Kontext vorhanden ist
                 raise OSError(warn_msg)
             else:
-                self.logger.warning(f"Pfadlängen-Warnung übersprungen (Bulk-Modus): {docx_path}")
+                self.logger.warning("Pfadlängen-Warnung übersprungen (Bulk-Modus): %s", docx_path)
 
         return str(docx_path)
 
-    def _create_new_document(self, concept: Dict[str, Any], project_name: Optional[str] = None, initiator: Optional[str] = None) -> str:
+    def _create_new_document(self, concept: Dict[str, Any]) -> bytes:
         """Create a new document from scratch (fallback method)"""
         self.logger.info("Creating new document from scratch")
         
@@ -673,53 +546,7 @@ class WordDocumentGenerator:
         # Add metadata
         self._add_metadata(doc, concept)
         
-        # Generate filename with versioning (KI nur wenn Limit überschritten)
-        max_name_len = 30  # Reduziert auf 30 für kürzere, prägnante Namen
-        # Bereinige den ursprünglichen Namen
-        original_safe_name = re.sub(r'[<>:"/\\|?*]', '_', project_name or "Technical_Concept")
-        original_safe_name = re.sub(r'\s+', '_', original_safe_name)
-        
-        # Verwende KI nur wenn der ursprüngliche Name zu lang ist
-        if len(original_safe_name) > max_name_len:
-            safe_project_name = self._ai_shorten_project_name(project_name or "Technical_Concept", max_name_len)
-        else:
-            safe_project_name = original_safe_name
-        
-        # Add initiator suffix if provided
-        initiator_suffix = f"_{initiator}" if initiator else ""
-        
-        base_filename = f"{safe_project_name}{initiator_suffix}.docx"
-        version = 1
-        
-        while True:
-            try:
-                if version == 1:
-                    filename = base_filename
-                else:
-                    # Insert version before the extension
-                    name_part = base_filename[:-5]  # Remove .docx
-                    filename = f"{name_part}_v{version}.docx"
-                
-                output_path = self.output_dir / filename
-                
-                # Ensure output directory exists
-                self.output_dir.mkdir(parents=True, exist_ok=True)
-                
-                self.logger.info("Saving new document to: %s (version %d)", output_path, version)
-                
-                # Use absolute path
-                abs_output_path = output_path.resolve()
-                doc.save(str(abs_output_path))
-                self.logger.info("New document created: %s", abs_output_path)
-                break
-                
-            except PermissionError as e:
-                self.logger.warning("Permission error on version %d: %s", version, str(e))
-                version += 1
-                if version > 100:  # Prevent infinite loop
-                    raise e
-        
-        return str(output_path)
+        return self._document_bytes(doc)
 
     def _setup_document_styles(self, doc):
         """Setup document styles"""
@@ -791,26 +618,3 @@ class WordDocumentGenerator:
         doc.add_paragraph("Metadata", style='CustomHeading')
         doc.add_paragraph(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", style='CustomNormal')
         doc.add_paragraph(f"AI Provider: {concept.get('provider', 'Unknown')}", style='CustomNormal')
-
-    def _remove_dot_blocks(self, text: str) -> str:
-        """Remove DOT code blocks from text"""
-        self.logger.debug("Removing DOT blocks from text")
-        self.logger.debug("Input text length: %d", len(text) if text else 0)
-        
-        if not text:
-            return text
-        
-        # Remove ```dot ... ``` blocks
-        text = re.sub(r'```dot[\s\S]+?```', '', text, flags=re.IGNORECASE)
-        # Remove ```graph ... ``` blocks
-        text = re.sub(r'```graph[\s\S]+?```', '', text, flags=re.IGNORECASE)
-        # Remove digraph blocks
-        text = re.sub(r'```digraph[\s\S]+?```', '', text, flags=re.IGNORECASE)
-        
-        # Remove lines that start with 'digraph' or 'graph'
-        lines = text.splitlines()
-        cleaned_lines = [line for line in lines if not line.strip().lower().startswith(('digraph', 'graph'))]
-        result = '\n'.join(cleaned_lines)
-        
-        self.logger.debug("Text after DOT removal length: %d", len(result))
-        return result 
\ No newline at end of file
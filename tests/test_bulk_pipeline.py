@@ -0,0 +1,192 @@
+import json
+import threading
+import time
+
+from src.bulk_pipeline import BulkGenerator, Pipeline
+
+DESCRIPTION = ("Build a customer portal with single sign-on, an order history, invoice downloads "
+               "and a support ticket form that integrates with the existing CRM system.")
+
+
+class StubAIService:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.generated = []
+        self._lock = threading.Lock()
+
+    def generate_technical_concept_sections(self, description, provider="openai", proposal_context="",
+                                            cancel_callback=None, section_checkpoint=None, adapt_from=None):
+        time.sleep(self.delay)
+        with self._lock:
+            self.generated.append(description)
+        return {"sections": {"system_scope": {"title": "Scope", "content": description}},
+                "metadata": {"provider_calls": 3}}
+
+
+class StubRenderService:
+    def render_bytes(self, job):
+        return job.project_name
+
+
+class StubWordGenerator:
+    def write_document(self, rendered, output_dir=None, skip_path_warnings=False):
+        return f"{output_dir}/{rendered}.docx"
+
+
+def write_spec(folder, name, description=DESCRIPTION, project=None):
+    path = folder / f"{name}.json"
+    path.write_text(json.dumps({"name": name if project is None else project, "description": description}), encoding="utf-8")
+    return path
+
+
+def make_generator(tmp_path, ai_service, **kwargs):
+    return BulkGenerator(ai_service, StubRenderService(), StubWordGenerator(), tmp_path / "out", **kwargs)
+
+
+def run_with_timeout(generator, files, timeout=10.0):
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault("report", generator.run(files)), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "bulk run did not finish (deadlock?)"
+    return result["report"]
+
+
+def test_duplicate_reuses_concept_of_representative(tmp_path):
+    files = [write_spec(tmp_path, "a_rep"), write_spec(tmp_path, "b_dup")]
+    ai = StubAIService(delay=0.2)
+    report = run_with_timeout(make_generator(tmp_path, ai), files)
+
+    assert len(report.successful) == 2
+    assert len(ai.generated) == 1
+    dup = next(item for item in report.items if item.json_file.name == "b_dup.json")
+    assert dup.reuse_mode == "reuse"
+    assert report.calls_saved == 3
+
+
+def test_duplicates_ahead_of_representative_do_not_deadlock(tmp_path, monkeypatch):
+    # Several load workers let the duplicates overtake their slowly loading representative;
+    # with a single generate worker they must not wait for it there
+    files = [write_spec(tmp_path, "a_rep"), write_spec(tmp_path, "b_dup"), write_spec(tmp_path, "c_dup")]
+    original_load = BulkGenerator._load
+
+    def slow_representative_load(self, item):
+        if item.json_file.name == "a_rep.json":
+            time.sleep(0.5)
+        original_load(self, item)
+
+    monkeypatch.setattr(BulkGenerator, "_load", slow_representative_load)
+    ai = StubAIService()
+    generator = make_generator(tmp_path, ai, stage_workers={"load": 3, "generate": 1}, duplicate_wait=0.2)
+    report = run_with_timeout(generator, files)
+
+    assert len(report.successful) == 3
+    assert len(ai.generated) == 3  # no representative in time: duplicates generated from scratch
+
+
+def test_representative_failing_in_load_releases_duplicates(tmp_path):
+    files = [write_spec(tmp_path, "a_rep", project=""), write_spec(tmp_path, "b_dup")]
+    ai = StubAIService()
+    generator = make_generator(tmp_path, ai, stage_workers={"load": 1, "generate": 1}, duplicate_wait=30.0)
+    start = time.monotonic()
+    report = run_with_timeout(generator, files)
+
+    assert time.monotonic() - start < 5.0
+    rep, dup = sorted(report.items, key=lambda item: item.json_file.name)
+    assert rep.failed_stage == "load"
+    assert dup.error is None and dup.reuse_mode is None
+    assert ai.generated == [DESCRIPTION]
+
+
+class Item:
+    def __init__(self, n):
+        self.n = n
+        self.error = None
+        self.failed_stage = None
+        self.skipped = False
+        self.stages = []
+
+    def __str__(self):
+        return f"item{self.n}"
+
+
+def run_pipeline(pipeline, items, timeout=10.0):
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault("items", pipeline.run(items)), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "pipeline did not finish (deadlock?)"
+    return result["items"]
+
+
+def record(name):
+    def stage(item):
+        item.stages.append(name)
+    return stage
+
+
+def test_pipeline_returns_every_item_and_stops_its_threads():
+    stages = [(name, record(name), 3) for name in ("load", "generate", "render", "write")]
+    items = [Item(n) for n in range(50)]
+    results = run_pipeline(Pipeline(stages, queue_size=1), items)
+
+    assert sorted(item.n for item in results) == list(range(50))
+    assert all(item.stages == ["load", "generate", "render", "write"] for item in results)
+    assert not [t for t in threading.enumerate() if t.name.startswith("bulk-")]
+
+
+def test_stage_error_skips_later_stages_but_keeps_the_item():
+    def generate(item):
+        if item.n % 2:
+            raise ValueError(f"bad spec {item.n}")
+        item.stages.append("generate")
+
+    stages = [("load", record("load"), 2), ("generate", generate, 2), ("write", record("write"), 1)]
+    pipeline = Pipeline(stages)
+    results = run_pipeline(pipeline, [Item(n) for n in range(6)])
+
+    failed = sorted((item.n, item.failed_stage, item.error, tuple(item.stages)) for item in results if item.error)
+    assert failed == [(n, "generate", f"bad spec {n}", ("load",)) for n in (1, 3, 5)]
+    assert all(item.stages == ["load", "generate", "write"] for item in results if item.error is None)
+    assert pipeline.stats["generate"].failed == 3
+    assert pipeline.stats["write"].processed == 3
+
+
+def test_exception_without_message_is_reported_by_type():
+    def fail(item):
+        raise RuntimeError()
+
+    results = run_pipeline(Pipeline([("load", fail, 1)]), [Item(0)])
+    assert results[0].error == "RuntimeError"
+
+
+def test_cancel_marks_remaining_items_cancelled():
+    cancelled = threading.Event()
+
+    def load(item):
+        item.stages.append("load")
+        if item.n == 2:
+            cancelled.set()
+
+    stages = [("load", load, 1), ("write", record("write"), 1)]
+    results = run_pipeline(Pipeline(stages, queue_size=1, cancel_callback=cancelled.is_set),
+                           [Item(n) for n in range(6)])
+
+    by_n = {item.n: item for item in results}
+    assert len(by_n) == 6
+    assert [by_n[n].error for n in range(3, 6)] == ["cancelled"] * 3
+    assert all(by_n[n].failed_stage == "load" and not by_n[n].stages for n in range(3, 6))
+    assert by_n[2].stages == ["load"] and by_n[2].error == "cancelled" and by_n[2].failed_stage == "write"
+
+
+def test_failing_progress_callback_does_not_stop_the_run():
+    done = []
+
+    def on_item_done(item):
+        done.append(item.n)
+        raise RuntimeError("progress window closed")
+
+    results = run_pipeline(Pipeline([("load", record("load"), 2)], on_item_done=on_item_done),
+                           [Item(n) for n in range(5)])
+    assert len(results) == 5
+    assert sorted(done) == list(range(5))
@@ -0,0 +1,134 @@
+from src import document_manifest as manifest_module
+from src.document_manifest import DocumentManifest
+
+
+def write_document(root, folder, name="concept.docx", content=b"docx"):
+    path = root / folder / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def test_filter_treats_like_wildcards_literally(tmp_path):
+    manifest = DocumentManifest(tmp_path)
+    for folder in ("shop_app", "shopXapp", "sales 100%", "sales 1000", "back\\slash"):
+        manifest.record(write_document(tmp_path, folder), project=folder)
+
+    assert [entry.project for entry in manifest.query("shop_")] == ["shop_app"]
+    assert [entry.project for entry in manifest.query("100%")] == ["sales 100%"]
+    assert [entry.project for entry in manifest.query("k\\s")] == ["back\\slash"]
+    assert manifest.count("_") == 1
+    assert manifest.count("shop") == 2
+
+
+def test_rescan_reconciles_added_changed_and_deleted_files(tmp_path):
+    manifest = DocumentManifest(tmp_path)
+    kept = write_document(tmp_path, "Kept")
+    changed = write_document(tmp_path, "Changed")
+    deleted = write_document(tmp_path, "Deleted")
+    for path in (kept, changed, deleted):
+        manifest.record(path, initiator="me")
+    changed.write_bytes(b"a longer document")
+    deleted.unlink()
+    write_document(tmp_path, "Added_v2")
+    write_document(tmp_path, "Added_v2", name="~$concept.docx")  # Word lock file
+
+    assert manifest.rescan() == (1, 1, 1)
+    entries = {entry.path: entry for entry in manifest.query(limit=10)}
+    assert set(entries) == {"Kept/concept.docx", "Changed/concept.docx", "Added_v2/concept.docx"}
+    assert entries["Changed/concept.docx"].size == len(b"a longer document")
+    assert (entries["Added_v2/concept.docx"].project, entries["Added_v2/concept.docx"].version) == ("Added", 2)
+    assert manifest.rescan() == (0, 0, 0)
+
+
+def test_rescan_keeps_documents_recorded_after_the_walk(tmp_path, monkeypatch):
+    manifest = DocumentManifest(tmp_path)
+    walk = manifest._walk
+
+    def walk_then_record():
+        found = walk()
+        manifest.record(write_document(tmp_path, "Late"), project="Late", initiator="me")
+        return found
+
+    monkeypatch.setattr(manifest, "_walk", walk_then_record)
+    manifest.rescan()
+
+    assert [(entry.path, entry.initiator) for entry in manifest.query()] == [("Late/concept.docx", "me")]
+
+
+class _RecordAfterSelect:
+    """Connection wrapper that lets record() run between rescan's SELECT and its INSERT."""
+
+    def __init__(self, conn, on_select):
+        self._conn = conn
+        self._on_select = on_select
+
+    def execute(self, sql, *args):
+        result = self._conn.execute(sql, *args)
+        if sql.startswith("SELECT path, created, size"):
+            result = result.fetchall()
+            self._on_select()
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._conn.__exit__(*exc)
+
+
+def test_rescan_insert_does_not_clash_with_concurrent_record(tmp_path, monkeypatch):
+    manifest = DocumentManifest(tmp_path)
+    path = write_document(tmp_path, "Proj")
+    connect = manifest._connect
+    calls = []
+
+    def connect_with_race():
+        conn = connect()
+        if calls:
+            return conn
+        calls.append(conn)
+        return _RecordAfterSelect(conn, lambda: manifest.record(path, project="Real name", initiator="me"))
+
+    monkeypatch.setattr(manifest, "_connect", connect_with_race)
+    assert manifest.rescan() == (1, 0, 0)
+
+    [entry] = manifest.query()
+    assert (entry.path, entry.project, entry.initiator) == ("Proj/concept.docx", "Real name", "me")
+
+
+def test_rescan_skips_files_that_vanish_during_the_walk(tmp_path, monkeypatch):
+    manifest = DocumentManifest(tmp_path)
+    # Same folder: the vanished file must not take its neighbours with it
+    write_document(tmp_path, "Proj", name="a_gone.docx")
+    write_document(tmp_path, "Proj", name="b_stays.docx")
+    real_scandir = manifest_module.os.scandir
+
+    class VanishingEntry:
+        def __init__(self, entry):
+            self._entry = entry
+
+        def __getattr__(self, name):
+            return getattr(self._entry, name)
+
+        def stat(self, *args, **kwargs):
+            raise FileNotFoundError(self._entry.path)
+
+    class Scandir:
+        def __init__(self, folder):
+            self._it = real_scandir(folder)
+
+        def __enter__(self):
+            entries = sorted(self._it.__enter__(), key=lambda e: e.name)
+            return [VanishingEntry(e) if e.name == "a_gone.docx" else e for e in entries]
+
+        def __exit__(self, *exc):
+            return self._it.__exit__(*exc)
+
+    monkeypatch.setattr(manifest_module.os, "scandir", Scandir)
+    assert manifest.rescan() == (1, 0, 0)
+    assert [entry.path for entry in manifest.query()] == ["Proj/b_stays.docx"]
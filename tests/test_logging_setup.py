@@ -0,0 +1,46 @@
+import io
+import json
+import logging
+import pickle
+import threading
+
+from src.logging_setup import DeferredQueueHandler, JsonLinesFormatter, QueueLogging, log_context
+
+
+def test_json_lines_keep_traceback_through_queue_logging():
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonLinesFormatter())
+    queue_logging = QueueLogging([handler]).start()
+    try:
+        def work():
+            with log_context(job_id="spec-1"):
+                try:
+                    raise ZeroDivisionError("boom")
+                except ZeroDivisionError:
+                    logging.getLogger("test").exception("job %s failed", "spec-1")
+
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+    finally:
+        queue_logging.stop()
+
+    entry = json.loads(stream.getvalue())
+    assert entry["message"] == "job spec-1 failed"
+    assert entry["job_id"] == "spec-1"
+    assert entry["exc"].splitlines()[-1] == "ZeroDivisionError: boom"
+
+
+def test_prepared_record_is_unformatted_and_picklable():
+    try:
+        raise ValueError("bad")
+    except ValueError as e:
+        record = logging.LogRecord("test", logging.ERROR, __file__, 1, "value %r", ("x",), (type(e), e, e.__traceback__))
+    prepared = DeferredQueueHandler(None).prepare(record)
+
+    assert prepared.msg == "value 'x'" and prepared.args is None
+    assert prepared.exc_info is None and "ValueError: bad" in prepared.exc_text
+    assert not hasattr(prepared, "message")  # formatting is left to the listener's handlers
+    assert record.exc_info is not None  # the original record is not modified
+    assert pickle.loads(pickle.dumps(prepared)).exc_text == prepared.exc_text
@@ -0,0 +1,102 @@
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+from src import output_store
+from src.output_store import OutputStore, split_version, versioned_name
+
+
+def test_version_names_round_trip():
+    assert split_version("Proj") == ("Proj", 1)
+    assert split_version("Proj_v3") == ("Proj", 3)
+    assert split_version("my_project_v12") == ("my_project", 12)
+    assert versioned_name("Proj", 1) == "Proj"
+    assert split_version(versioned_name("Proj", 7)) == ("Proj", 7)
+
+
+def test_allocate_folder_continues_after_existing_versions(tmp_path):
+    (tmp_path / "Proj").mkdir()
+    (tmp_path / "Proj_v4").mkdir()
+    store = OutputStore(tmp_path)
+
+    assert store.allocate_folder("Proj").name == "Proj_v5"
+    assert store.allocate_folder("Proj").name == "Proj_v6"
+    assert store.allocate_folder("Other").name == "Other"
+
+
+def test_allocate_folder_skips_folders_created_after_the_scan(tmp_path):
+    store = OutputStore(tmp_path)
+    assert store.allocate_folder("Proj").name == "Proj"
+    (tmp_path / "Proj_v2").mkdir()  # another process, unknown to this store's index
+
+    assert store.allocate_folder("Proj").name == "Proj_v3"
+
+
+def test_concurrent_stores_never_share_a_folder(tmp_path):
+    # Every store has its own index, like the render worker processes
+    stores = [OutputStore(tmp_path) for _ in range(4)]
+    barrier = threading.Barrier(8)
+    folders = []
+    lock = threading.Lock()
+
+    def allocate(store):
+        barrier.wait()
+        for _ in range(10):
+            folder = store.allocate_folder("Proj")
+            with lock:
+                folders.append(folder)
+
+    threads = [threading.Thread(target=allocate, args=(stores[i % len(stores)],)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(folders) == 80
+    assert len(set(folders)) == 80
+    assert sorted(split_version(folder.name)[1] for folder in folders) == list(range(1, 81))
+
+
+def test_write_atomic_replaces_target_and_leaves_no_temp_file(tmp_path):
+    store = OutputStore(tmp_path)
+    target = tmp_path / "summary.txt"
+    target.write_text("old", encoding="utf-8")
+
+    assert store.write_text(target, "new") == target
+    assert target.read_text(encoding="utf-8") == "new"
+    assert os.listdir(tmp_path) == ["summary.txt"]
+
+
+def test_write_atomic_failed_writer_keeps_target(tmp_path):
+    store = OutputStore(tmp_path)
+    target = tmp_path / "concept.docx"
+    target.write_bytes(b"old")
+
+    def failing_writer(path):
+        Path(path).write_bytes(b"half")
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        store.write_atomic(target, failing_writer)
+    assert target.read_bytes() == b"old"
+    assert os.listdir(tmp_path) == ["concept.docx"]
+
+
+def test_write_atomic_falls_back_to_next_version_when_target_is_locked(tmp_path, monkeypatch):
+    store = OutputStore(tmp_path)
+    target = tmp_path / "concept.docx"
+    real_replace = os.replace
+
+    def replace(src, dst):
+        if Path(dst) == target:
+            raise PermissionError("opened in Word")
+        real_replace(src, dst)
+
+    monkeypatch.setattr(output_store.os, "replace", replace)
+    final = store.write_atomic(target, lambda path: Path(path).write_bytes(b"new"))
+
+    assert final.name == "concept_v2.docx"
+    assert final.read_bytes() == b"new"
+    assert sorted(os.listdir(tmp_path)) == ["concept_v2.docx"]
@@ -0,0 +1,70 @@
+import threading
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+from src import render_service
+from src.render_service import RenderJob, RenderService
+
+
+class StubGenerator:
+    def render_document(self, concept, project_name=None, initiator=None, upwork_link=None, description=None):
+        return (project_name, threading.current_thread().name, self)
+
+
+class BrokenPool:
+    """Accepts jobs, then loses them like a pool whose worker was killed mid-render."""
+
+    def __init__(self):
+        self.submitted = 0
+
+    def submit(self, func, job):
+        self.submitted += 1
+        future = Future()
+        future.set_exception(BrokenProcessPool("worker terminated abruptly"))
+        return future
+
+    def shutdown(self, wait=True):
+        pass
+
+
+def test_job_lost_to_broken_pool_is_rendered_in_process(monkeypatch):
+    monkeypatch.setattr(render_service, "_make_generator", lambda template_path, output_directory: StubGenerator())
+    service = RenderService(workers=2)
+    pool = BrokenPool()
+    monkeypatch.setattr(service, "_ensure_pool", lambda: pool if service.workers else None)
+
+    name, _, _ = service.render_bytes(RenderJob({}, "out", project_name="A"))
+
+    assert name == "A"
+    assert pool.submitted == 1
+    assert service.workers == 0  # later jobs go straight to the in-process fallback
+    assert service.render_bytes(RenderJob({}, "out", project_name="B"))[0] == "B"
+    assert pool.submitted == 1
+
+
+def test_in_process_rendering_uses_one_generator_per_thread(monkeypatch):
+    monkeypatch.setattr(render_service, "_make_generator", lambda template_path, output_directory: StubGenerator())
+    service = RenderService(workers=0)
+    barrier = threading.Barrier(4)
+    results = []
+    lock = threading.Lock()
+
+    def render_twice():
+        for _ in range(2):
+            result = service.render_bytes(RenderJob({}, "out", project_name="P"))
+            with lock:
+                results.append(result)
+            barrier.wait()  # all threads render at the same time
+
+    threads = [threading.Thread(target=render_twice, name=f"render-{i}") for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    generators = {}
+    for _, thread_name, generator in results:
+        generators.setdefault(thread_name, set()).add(id(generator))
+    assert len(results) == 8
+    assert all(len(ids) == 1 for ids in generators.values())
+    assert len(set.union(*generators.values())) == 4
@@ -0,0 +1,91 @@
+import random
+
+import pytest
+
+from src import spec_similarity
+from src.spec_similarity import (
+    DEFAULT_ADAPT_THRESHOLD,
+    DEFAULT_REUSE_THRESHOLD,
+    MinHasher,
+    SpecSimilarityIndex,
+    cluster_near_duplicates,
+    estimate_similarity,
+    shingles,
+)
+
+WORDS = [f"word{n}" for n in range(2000)]
+
+
+def make_text(seed, length=100):
+    return " ".join(random.Random(seed).sample(WORDS, length))
+
+
+def replace_words(text, count, tag="changed"):
+    """Replace `count` words far apart from each other: each one changes 3 of the 98 shingles."""
+    words = text.split()
+    step = len(words) // (count + 1)
+    for n in range(1, count + 1):
+        words[n * step] = f"{tag}{n}"
+    return " ".join(words)
+
+
+def jaccard(a, b):
+    sa, sb = shingles(a), shingles(b)
+    return len(sa & sb) / len(sa | sb)
+
+
+def test_shingles_ignore_case_and_punctuation():
+    assert shingles("Cloud native, API Gateway!") == shingles("cloud NATIVE api gateway")
+    assert len(shingles("two words")) == 1
+    assert shingles("") == set()
+
+
+@pytest.mark.skipif(spec_similarity._numpy() is None, reason="NumPy not installed")
+def test_numpy_and_pure_python_signatures_agree(monkeypatch):
+    hashes = shingles(make_text(1))
+    with_numpy = MinHasher(64).signature(hashes)
+    monkeypatch.setattr(spec_similarity, "_numpy", lambda: None)
+    assert MinHasher(64).signature(hashes) == with_numpy
+
+
+@pytest.mark.parametrize("changed", [1, 4, 10])
+def test_estimate_tracks_jaccard_similarity(changed):
+    base = make_text(2)
+    variant = replace_words(base, changed)
+    index = SpecSimilarityIndex()
+    estimate = estimate_similarity(index.signature(base), index.signature(variant))
+    assert estimate == pytest.approx(jaccard(base, variant), abs=0.1)
+
+
+def test_clusters_by_reuse_and_adapt_thresholds():
+    base = make_text(3)
+    specs = [
+        ("base", base),
+        ("copy", base),
+        ("reuse", replace_words(base, 1)),   # Jaccard ~0.94
+        ("adapt", replace_words(base, 4)),   # Jaccard ~0.78
+        ("far", replace_words(base, 10)),    # Jaccard ~0.53
+        ("other", make_text(4)),
+    ]
+    duplicates = cluster_near_duplicates(specs)
+
+    assert set(duplicates) == {"copy", "reuse", "adapt"}
+    assert all(representative == "base" for representative, _ in duplicates.values())
+    assert duplicates["copy"][1] == 1.0
+    assert duplicates["reuse"][1] >= DEFAULT_REUSE_THRESHOLD
+    assert DEFAULT_ADAPT_THRESHOLD <= duplicates["adapt"][1] < DEFAULT_REUSE_THRESHOLD
+
+
+def test_duplicates_never_become_representatives():
+    # b is close to a and c is close to b, but c is too far from a: c starts its own cluster
+    a = make_text(8)
+    b = replace_words(a, 3)               # Jaccard(a, b) ~0.83
+    c = replace_words(b, 4, tag="other")  # Jaccard(b, c) ~0.78, Jaccard(a, c) ~0.65
+    index = SpecSimilarityIndex()
+    sig_a, sig_b, sig_c = (index.signature(text) for text in (a, b, c))
+    assert estimate_similarity(sig_b, sig_c) >= DEFAULT_ADAPT_THRESHOLD
+    assert estimate_similarity(sig_a, sig_c) < DEFAULT_ADAPT_THRESHOLD
+    duplicates = cluster_near_duplicates([("a", a), ("b", b), ("c", c)])
+
+    assert duplicates.keys() == {"b"}
+    assert duplicates["b"][0] == "a"
@@ -0,0 +1,124 @@
+import json
+import threading
+import time
+
+import pytest
+
+from src import spec_watcher
+from src.spec_watcher import SpecWatcher, WatchQueue
+
+
+@pytest.fixture
+def watch_queue(tmp_path):
+    return WatchQueue.for_directory(tmp_path / "out")
+
+
+def finish(queue, job, error=None):
+    job.error, job.finished_at = error, time.time()
+    queue.finish(job)
+
+
+def test_claims_oldest_first_even_within_one_clock_tick(watch_queue, monkeypatch):
+    monkeypatch.setattr(spec_watcher.time, "time", lambda: 1000.0)
+    for name in ("c.json", "a.json", "b.json"):
+        watch_queue.enqueue(name, f"hash-{name}")
+
+    assert [watch_queue.claim().path for _ in range(3)] == ["c.json", "a.json", "b.json"]
+    assert watch_queue.claim() is None
+
+
+def test_unchanged_content_is_not_queued_again(watch_queue):
+    assert watch_queue.enqueue("a.json", "h1")
+    assert not watch_queue.enqueue("a.json", "h1")
+    finish(watch_queue, watch_queue.claim())
+    assert not watch_queue.enqueue("a.json", "h1")
+    assert watch_queue.enqueue("a.json", "h2")
+    assert watch_queue.counts() == {"pending": 1}
+
+
+def test_change_while_running_survives_finish_of_old_job(watch_queue):
+    watch_queue.enqueue("a.json", "h1")
+    old = watch_queue.claim()
+    watch_queue.enqueue("a.json", "h2")
+    finish(watch_queue, old)
+
+    job = watch_queue.claim()
+    assert (job.path, job.spec_hash) == ("a.json", "h2")
+
+
+def test_recover_requeues_jobs_of_a_stopped_daemon(tmp_path):
+    queue = WatchQueue.for_directory(tmp_path)
+    queue.enqueue("a.json", "h1")
+    assert queue.claim().attempts == 1
+
+    restarted = WatchQueue.for_directory(tmp_path)
+    assert restarted.recover() == 1
+    job = restarted.claim()
+    assert (job.path, job.attempts) == ("a.json", 2)
+
+
+def test_retry_failed(watch_queue):
+    watch_queue.enqueue("a.json", "h1")
+    finish(watch_queue, watch_queue.claim(), error="provider down")
+    assert watch_queue.claim() is None
+
+    assert watch_queue.retry_failed() == 1
+    assert watch_queue.claim().path == "a.json"
+
+
+def test_each_job_is_claimed_once_across_instances(tmp_path):
+    queues = [WatchQueue.for_directory(tmp_path) for _ in range(3)]
+    for n in range(30):
+        queues[0].enqueue(f"{n}.json", f"h{n}")
+    claimed = []
+    lock = threading.Lock()
+
+    def drain(queue):
+        while True:
+            job = queue.claim()
+            if job is None:
+                return
+            with lock:
+                claimed.append(job.path)
+
+    threads = [threading.Thread(target=drain, args=(queues[n % 3],)) for n in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == sorted(f"{n}.json" for n in range(30))
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.05)
+
+
+def test_watcher_generates_new_specs_and_requeues_interrupted_jobs(tmp_path):
+    folder, out = tmp_path / "specs", tmp_path / "out"
+    folder.mkdir()
+    (folder / "done.json").write_text(json.dumps({"name": "Done"}), encoding="utf-8")
+    (folder / "slow.json").write_text(json.dumps({"name": "Slow"}), encoding="utf-8")
+    done_jobs = []
+    started = threading.Event()
+
+    def handler(path):
+        if path.name == "slow.json":
+            started.set()
+            wait_for(watcher.stopped)
+            raise RuntimeError("cancelled")
+        return str(out / f"{path.stem}.docx")
+
+    watcher = SpecWatcher(folder, handler, WatchQueue.for_directory(out), workers=2, debounce=0.1,
+                          poll_interval=0.1, use_watchdog=False, on_job_done=done_jobs.append)
+    with watcher:
+        wait_for(lambda: done_jobs and started.is_set())
+    assert [job.path for job in done_jobs] == [str(folder.resolve() / "done.json")]
+
+    # Abgebrochen statt fehlgeschlagen: der nächste Start nimmt den Job wieder auf
+    queue = WatchQueue.for_directory(out)
+    assert queue.counts() == {"done": 1, "running": 1}
+    assert queue.recover() == 1
@@ -0,0 +1,45 @@
+import sqlite3
+import threading
+from contextlib import closing
+
+from src.sqlite_store import SqliteDatabase
+
+SCHEMA = "CREATE TABLE IF NOT EXISTS items (key TEXT PRIMARY KEY, value INTEGER);"
+
+
+def test_connect_creates_missing_folders_and_schema(tmp_path):
+    db = SqliteDatabase(tmp_path / "a" / "b" / "store.sqlite3", SCHEMA)
+    assert not db.exists()
+
+    with closing(db.connect()) as conn, conn:
+        conn.execute("INSERT INTO items VALUES ('x', 1)")
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    assert db.exists()
+    with closing(db.connect()) as conn:
+        assert conn.execute("SELECT value FROM items").fetchall() == [(1,)]
+
+
+def test_concurrent_first_connects_of_several_instances(tmp_path):
+    path = tmp_path / "nested" / "store.sqlite3"
+    databases = [SqliteDatabase(path, SCHEMA) for _ in range(4)]
+    barrier = threading.Barrier(16)
+    errors = []
+
+    def insert(n):
+        barrier.wait()
+        try:
+            with closing(databases[n % len(databases)].connect()) as conn, conn:
+                conn.execute("INSERT INTO items VALUES (?, ?)", (f"k{n}", n))
+        except sqlite3.Error as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=insert, args=(n,)) for n in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with closing(databases[0].connect()) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 16
@@ -16,8 +16,16 @@ if not exist "Zeta_Proposer_v*.zip" (
 )
 
 echo.
-echo 1. Building new executable...
+echo 1. Checking startup import budget...
 call venv\Scripts\activate
+python benchmarks\bench_startup.py --check
+if errorlevel 1 (
+    echo Startup import budget exceeded! Exiting.
+    exit /b 1
+)
+
+echo.
+echo 1.1. Building new executable...
 pyinstaller zeta_proposer.spec
 
 echo.
@@ -23,8 +23,15 @@ else {
 }
 
 if (-not $SkipBuild) {
-    Write-Host "`n1. Building new executable..." -ForegroundColor Yellow
+    Write-Host "`n1. Checking startup import budget..." -ForegroundColor Yellow
     & venv\Scripts\Activate.ps1
+    python benchmarks\bench_startup.py --check
+    if ($LASTEXITCODE -ne 0) {
+        Write-Host "Startup import budget exceeded! Exiting." -ForegroundColor Red
+        exit 1
+    }
+
+    Write-Host "`n1.1. Building new executable..." -ForegroundColor Yellow
     pyinstaller zeta_proposer.spec
     
     if ($LASTEXITCODE -ne 0) {